@@ -3,46 +3,102 @@ FastAPI 路由定义
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 import sys
 import os
+import json
+import math
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from mathforge_core import parse, simplify, diff, integrate, solve, to_latex, Symbol
+from mathforge_core import (
+    parse, simplify, diff, integrate, solve, to_latex,
+    Symbol, Number, Add, Mul, Pow, Function
+)
+from mathforge_core.nsolve import DEFAULT_INTERVAL
+from mathforge_core.quadrature import definite_integral, DEFAULT_TOL
+from mathforge_core.traversal import Dispatcher, fold
+from mathforge_core.equivalence import equivalent, DEFAULT_CONFIDENCE
+from mathforge_core.precision import eval_precise
+from mathforge_core.sampling import (
+    adaptive_sample, DEFAULT_POINTS, DEFAULT_MAX_POINTS, DEFAULT_SAMPLE_TOL
+)
 
 router = APIRouter()
 
 
+# 可按需渲染的结果字段；请求未指定 fields 时全部返回
+RESULT_FIELDS = ("result", "latex", "ast")
+
+# 采样点数超过该值时流式返回，每块包含的数值个数
+STREAM_THRESHOLD = 5000
+STREAM_CHUNK = 2000
+
+
 class ExpressionRequest(BaseModel):
     expression: str
     variable: Optional[str] = 'x'
+    fields: Optional[List[str]] = None
 
 
 class SimplifyRequest(BaseModel):
     expression: str
+    fields: Optional[List[str]] = None
 
 
 class DiffRequest(BaseModel):
     expression: str
     variable: str = 'x'
+    fields: Optional[List[str]] = None
 
 
 class IntegrateRequest(BaseModel):
     expression: str
     variable: str = 'x'
+    fields: Optional[List[str]] = None
+
+
+class DefiniteIntegralRequest(BaseModel):
+    expression: str
+    variable: str = 'x'
+    lower: float  # 可为 "inf" / "-inf"
+    upper: float
+    tolerance: float = DEFAULT_TOL
+    method: str = 'auto'  # auto / symbolic / gauss-kronrod / tanh-sinh
 
 
 class SolveRequest(BaseModel):
     expression: str
     variable: str = 'x'
+    fields: Optional[List[str]] = None
+    numeric: bool = False  # 无闭式解时在 interval 内数值求根
+    interval: Optional[List[float]] = None
+
+
+class SampleRequest(BaseModel):
+    expression: str
+    variable: str = 'x'
+    lower: float
+    upper: float
+    points: int = DEFAULT_POINTS  # 初始均匀网格点数
+    max_points: int = DEFAULT_MAX_POINTS
+    tolerance: float = DEFAULT_SAMPLE_TOL  # 相对于 y 取值范围的容差
+    values: Dict[str, float] = {}  # 其他符号的取值
 
 
 class EvalRequest(BaseModel):
     expression: str
     values: Dict[str, float] = {}
+    precision: Optional[int] = None  # 有效数字位数；给出时用高精度求值
+
+
+class EquivalentRequest(BaseModel):
+    expression: str
+    other: str
+    confidence: float = DEFAULT_CONFIDENCE
 
 
 @router.post("/simplify")
@@ -51,11 +107,7 @@ async def simplify_expression(request: SimplifyRequest):
     try:
         expr = parse(request.expression)
         simplified = simplify(expr)
-        return {
-            "result": str(simplified),
-            "latex": to_latex(simplified),
-            "ast": _ast_to_dict(simplified)
-        }
+        return _render(simplified, request.fields)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -66,11 +118,7 @@ async def to_latex_endpoint(request: SimplifyRequest):
     try:
         expr = parse(request.expression)
         simplified = simplify(expr)
-        return {
-            "result": str(simplified),
-            "latex": to_latex(simplified),
-            "ast": _ast_to_dict(simplified)
-        }
+        return _render(simplified, request.fields)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -83,11 +131,7 @@ async def differentiate(request: DiffRequest):
         var = Symbol(request.variable)
         derivative = diff(expr, var)
         simplified = simplify(derivative)
-        return {
-            "result": str(simplified),
-            "latex": to_latex(simplified),
-            "ast": _ast_to_dict(simplified)
-        }
+        return _render(simplified, request.fields)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -100,10 +144,23 @@ async def integrate_endpoint(request: IntegrateRequest):
         var = Symbol(request.variable)
         integral = integrate(expr, var)
         simplified = simplify(integral)
+        return _render(simplified, request.fields)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/integrate/definite")
+async def definite_integral_endpoint(request: DefiniteIntegralRequest):
+    """定积分：能求出原函数时精确计算，否则数值积分"""
+    try:
+        expr = parse(request.expression)
+        var = Symbol(request.variable)
+        result = definite_integral(expr, var, request.lower, request.upper,
+                                   tol=request.tolerance, method=request.method)
         return {
-            "result": str(simplified),
-            "latex": to_latex(simplified),
-            "ast": _ast_to_dict(simplified)
+            "value": result.value,
+            "error": result.error,
+            "method": result.method
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -115,22 +172,31 @@ async def solve_endpoint(request: SolveRequest):
     try:
         expr = parse(request.expression)
         var = Symbol(request.variable)
-        solutions = solve(expr, var)
-        return {
-            "result": [str(sol) for sol in solutions],
-            "latex": [to_latex(sol) for sol in solutions],
-            "count": len(solutions),
-            "ast": [_ast_to_dict(sol) for sol in solutions]
-        }
+        if request.interval is not None and len(request.interval) != 2:
+            raise ValueError("interval 需要两个端点 [a, b]")
+        interval = tuple(request.interval) if request.interval else DEFAULT_INTERVAL
+        solutions = solve(expr, var, numeric=request.numeric, interval=interval)
+        response = _render_many(solutions, request.fields)
+        response["count"] = len(solutions)
+        return response
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/eval")
 async def evaluate(request: EvalRequest):
-    """数值求值"""
+    """数值求值；给出 precision 时高精度求值，result 为该位数的十进制字符串"""
     try:
         expr = parse(request.expression)
+        if request.precision is not None:
+            # 不化简：化简时的浮点常量折叠会引入舍入误差
+            value = eval_precise(expr, request.values, request.precision)
+            return {
+                "result": str(value),
+                "value": float(value),
+                "latex": str(value),
+                "precision": request.precision
+            }
         simplified = simplify(expr)
         result = simplified.eval(request.values)
         return {
@@ -142,29 +208,92 @@ async def evaluate(request: EvalRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/equivalent")
+async def equivalent_endpoint(request: EquivalentRequest):
+    """判断两个表达式是否恒等（随机点求值，不做化简）"""
+    try:
+        expr = parse(request.expression)
+        other = parse(request.other)
+        return {"equivalent": equivalent(expr, other, request.confidence)}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/sample")
+async def sample_endpoint(request: SampleRequest):
+    """绘图采样：一次请求返回整条曲线的 (x, y)，点数多时流式返回"""
+    try:
+        expr = parse(request.expression)
+        xs, ys = adaptive_sample(expr, Symbol(request.variable), request.lower, request.upper,
+                                 points=request.points, max_points=request.max_points,
+                                 tol=request.tolerance, values=request.values)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(xs) > STREAM_THRESHOLD:
+        return StreamingResponse(_stream_samples(xs, ys), media_type="application/json")
+    return {"x": _json_floats(xs), "y": _json_floats(ys), "count": len(xs)}
+
+
+def _json_floats(values) -> List[Optional[float]]:
+    """JSON 不支持 nan/inf，定义域外和断开处输出 null"""
+    return [v if math.isfinite(v) else None for v in values.tolist()]
+
+
+def _stream_samples(xs, ys) -> Iterator[str]:
+    """分块输出与非流式响应相同结构的 JSON"""
+    def chunks(values) -> Iterator[str]:
+        for start in range(0, len(values), STREAM_CHUNK):
+            part = json.dumps(_json_floats(values[start:start + STREAM_CHUNK]))[1:-1]
+            yield part if start == 0 else ',' + part
+    
+    yield '{"x": ['
+    yield from chunks(xs)
+    yield '], "y": ['
+    yield from chunks(ys)
+    yield f'], "count": {len(xs)}}}'
+
+
+def _select_fields(fields: Optional[List[str]]) -> List[str]:
+    """校验请求的字段列表，未指定时返回全部字段"""
+    if fields is None:
+        return list(RESULT_FIELDS)
+    unknown = [name for name in fields if name not in RESULT_FIELDS]
+    if unknown:
+        raise ValueError(f"未知字段: {', '.join(unknown)}（可选: {', '.join(RESULT_FIELDS)}）")
+    return list(dict.fromkeys(fields))
+
+
+def _render(node, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """只渲染请求的字段，避免无用的字符串/LaTeX/AST 转换"""
+    return {name: _FIELD_RENDERERS[name](node) for name in _select_fields(fields)}
+
+
+def _render_many(nodes, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """_render 的列表版本，每个字段对应一个结果列表"""
+    return {
+        name: [_FIELD_RENDERERS[name](node) for node in nodes]
+        for name in _select_fields(fields)
+    }
+
+
 def _ast_to_dict(node) -> Dict[str, Any]:
-    """将AST节点转换为字典（用于JSON序列化）"""
-    if isinstance(node, (Symbol, Number)):
-        return {
-            "type": type(node).__name__,
-            "value": node.name if isinstance(node, Symbol) else node.value
-        }
-    elif isinstance(node, (Add, Mul)):
-        return {
-            "type": type(node).__name__,
-            "children": [_ast_to_dict(child) for child in (node.terms if isinstance(node, Add) else node.factors)]
-        }
-    elif isinstance(node, Pow):
-        return {
-            "type": "Pow",
-            "base": _ast_to_dict(node.base),
-            "exponent": _ast_to_dict(node.exponent)
-        }
-    elif isinstance(node, Function):
-        return {
-            "type": type(node).__name__,
-            "name": node.name,
-            "arg": _ast_to_dict(node.arg)
-        }
-    else:
-        return {"type": "Unknown", "value": str(node)}
+    """将AST节点转换为字典（用于JSON序列化），显式栈遍历，任意深度都不会递归溢出"""
+    return fold(node, _AST_DICT)
+
+
+# 节点类型 -> 字典构造（子节点的字典已构造好）
+_AST_DICT = Dispatcher({
+    Symbol: lambda node, kids: {"type": type(node).__name__, "value": node.name},
+    Number: lambda node, kids: {"type": type(node).__name__, "value": node.value},
+    Add: lambda node, kids: {"type": type(node).__name__, "children": kids},
+    Mul: lambda node, kids: {"type": type(node).__name__, "children": kids},
+    Pow: lambda node, kids: {"type": "Pow", "base": kids[0], "exponent": kids[1]},
+    Function: lambda node, kids: {"type": type(node).__name__, "name": node.name, "arg": kids[0]},
+}, default=lambda node, kids: {"type": "Unknown", "value": str(node)})
+
+
+_FIELD_RENDERERS = {
+    "result": str,
+    "latex": to_latex,
+    "ast": _ast_to_dict,
+}
@@ -31,8 +31,11 @@ async def root():
             "POST /api/latex",
             "POST /api/diff",
             "POST /api/integrate",
+            "POST /api/integrate/definite",
             "POST /api/solve",
-            "POST /api/eval"
+            "POST /api/sample",
+            "POST /api/eval",
+            "POST /api/equivalent"
         ]
     }
 
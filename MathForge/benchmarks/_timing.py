@@ -0,0 +1,28 @@
+"""
+基准测试脚本共用的计时函数
+"""
+
+import gc
+import time
+
+
+def time_call(func, *args, repeat: int = 3, setup=None) -> float:
+    """
+    返回多次调用 func(*args) 中的最短耗时（秒）
+
+    setup 在每次计时前调用（不计入耗时），用于清空缓存等；与 timeit 一样在计时期间
+    关闭垃圾回收，避免回收时机造成的抖动。
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func(*args)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = min(best, elapsed)
+    return best
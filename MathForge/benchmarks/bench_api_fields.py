@@ -0,0 +1,32 @@
+"""
+API 结果字段按需渲染的基准测试
+比较渲染全部字段与只渲染 LaTeX 字段的耗时
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, Add
+from _timing import time_call
+from backend.api.routes import _render
+
+
+def build_expression(n_terms: int):
+    """构造一个含 n_terms 项的扁平加法结果（与化简后的结果结构相同）"""
+    return Add(*[parse(f"{i + 1}*x^{i}*sin(y)") for i in range(n_terms)])
+
+
+def main():
+    print(f"{'项数':>8} {'全部字段(ms)':>14} {'仅latex(ms)':>14} {'节省':>8}")
+    for n_terms in (10, 100, 1000, 3000):
+        node = build_expression(n_terms)
+        full = time_call(lambda: _render(node), repeat=5)
+        latex_only = time_call(lambda: _render(node, ["latex"]), repeat=5)
+        saved = 1 - latex_only / full
+        print(f"{n_terms:>8} {full * 1000:>14.2f} {latex_only * 1000:>14.2f} {saved:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+规范序的基准测试
+测量构造后首次规范化（展开与排序）、以不同顺序构造的同构和式/积式的相等判断、
+散列以及用集合去重的耗时
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import Symbol, Number, Add, Mul, Pow, Sin
+from _timing import time_call
+
+
+def random_terms(n_terms: int, seed: int):
+    """n_terms 个形如 c*x^k*sin(y) 的项，按给定种子打乱顺序"""
+    x, y = Symbol('x'), Symbol('y')
+    terms = [Mul(Number(k + 1), Pow(x, Number(k % 7)), Sin(Add(y, Number(k)))) for k in range(n_terms)]
+    random.Random(seed).shuffle(terms)
+    return terms
+
+
+def nested(terms):
+    """解析器风格的左结合链"""
+    node = terms[0]
+    for term in terms[1:]:
+        node = Add(node, term)
+    return node
+
+
+def main():
+    print(f"{'项数':>8} {'规范化(ms)':>12} {'相等(ms)':>10} {'散列(ms)':>10} {'集合去重(ms)':>14} {'相等':>6}")
+    for n_terms in (100, 1000, 10000):
+        # 规范化只在第一次访问操作数时发生，每次计时取一棵新构造的树
+        fresh = [nested(random_terms(n_terms, 1)) for _ in range(3)]
+        canonical = time_call(lambda: fresh.pop().terms)
+        a = nested(random_terms(n_terms, 1))
+        b = nested(random_terms(n_terms, 2))
+        a.terms, b.terms
+        equal = time_call(lambda: a == b)
+        hashing = time_call(lambda: (hash(a), hash(b)))
+        copies = [nested(random_terms(n_terms, seed)) for seed in range(5)]
+        for node in copies:
+            node.terms
+        dedupe = time_call(lambda: len(set(copies)))
+        print(f"{n_terms:>8} {canonical * 1000:>12.1f} {equal * 1000:>10.3f} {hashing * 1000:>10.4f} "
+              f"{dedupe * 1000:>14.3f} {str(a == b):>6}")
+
+
+if __name__ == "__main__":
+    main()
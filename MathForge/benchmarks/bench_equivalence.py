@@ -0,0 +1,56 @@
+"""
+概率等价判定的基准测试
+比较 equivalent（随机点求值）与化简后做结构比较的耗时和判定结果，
+并测量积分时等价但结构不同的被积函数命中缓存的效果
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, simplify, equivalent, Symbol
+from mathforge_core.integration import antiderivative, _MEMO
+from _timing import time_call
+
+
+# (a, b, 是否恒等)
+PAIRS = [
+    ("(x + 1)^2", "x^2 + 2*x + 1", True),
+    ("(x - y)*(x + y)", "x^2 - y^2", True),
+    ("(x + y)^8", "(x + y)^4*(x^2 + 2*x*y + y^2)^2", True),
+    ("(x^2 - 1)/(x - 1)", "x + 1", True),
+    ("sin(x)^2", "1 - cos(x)^2", True),
+    ("exp(x + y)", "exp(x)*exp(y)", True),
+    ("sqrt(x^2)", "x", False),
+    ("(x + 1)^20", "(x + 1)^19*(x + 2)", False),
+    ("x^3 - x", "x*(x - 1)*(x + 2)", False),
+]
+
+
+def main():
+    print(f"{'a':<20} {'b':<34} {'恒等':>4} {'equivalent':>10} {'(ms)':>8} {'化简比较':>8} {'(ms)':>8}")
+    for text_a, text_b, expected in PAIRS:
+        a, b = parse(text_a), parse(text_b)
+        by_points = equivalent(a, b)
+        by_simplify = simplify(a) == simplify(b)
+        print(f"{text_a:<20} {text_b:<34} {str(expected):>4} {str(by_points):>10} "
+              f"{time_call(lambda: equivalent(a, b), repeat=20) * 1000:>8.3f} {str(by_simplify):>8} "
+              f"{time_call(lambda: simplify(a) == simplify(b), repeat=20) * 1000:>8.3f}")
+    
+    # 先积分一种写法，再积分等价的另一种写法：后者复用缓存的原函数（只归并整数系数的有理被积函数）
+    print()
+    print(f"{'先积分':<24} {'再积分（等价写法）':<32} {'首次(ms)':>10} {'等价命中(ms)':>12}")
+    x = Symbol('x')
+    for first, second in [("(x^2 + 1)/(x^3 - x)", "(1 + x^2)/(x*(x - 1)*(x + 1))"),
+                          ("1/((x - 1)^2*(x + 2))", "1/((x^2 - 2*x + 1)*(x + 2))"),
+                          ("x^3/(x^2 + 1)", "x*x^2/(1 + x^2)")]:
+        a, b = parse(first), parse(second)
+        _MEMO.clear()
+        cold = time_call(lambda: antiderivative(a, x), repeat=1)
+        warm = time_call(lambda: antiderivative(b, x), repeat=1)
+        print(f"{first:<24} {second:<32} {cold * 1000:>10.3f} {warm * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+最大公因式、因式分解与有理式约分的基准测试
+比较默认化简与加上 'cancel' 遍后在大有理式上的节点数和耗时，
+比较启发式 GCD 与本原伪余式序列，并测量整数上的完全分解
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, simplify, diff, factor, node_size, Symbol
+from mathforge_core.simplify import DEFAULT_PASSES
+from mathforge_core.factor import _generators, _integer_polynomial, _heu_gcd, _prs_gcd, _variables
+from mathforge_core.groebner import _poly_mul
+from _timing import time_call
+
+WITH_CANCEL = DEFAULT_PASSES + ('cancel',)
+
+
+def fraction_sum(n_terms: int) -> str:
+    """n 个部分分式之和：sum k/(x - k)"""
+    return " + ".join(f"{k}/(x - {k})" for k in range(1, n_terms + 1))
+
+
+RATIONAL = [
+    "(x^2 - 1)/(x - 1)",
+    "(x + 1)^12*(x - 2)^8/((x + 1)^10*(x^2 - 4))",
+    "(x + y)^10/(x^2 - y^2)",
+    "(x + y + z)^6*(x - z)/((x + y + z)^4*(x^2 - z^2))",
+    "(x^6 - 1)/(x^4 + x^2 + 1) - (x^2 - 1)",
+    fraction_sum(6),
+]
+
+
+def random_polynomial(rng: random.Random, names, n_terms: int, degree: int) -> str:
+    terms = []
+    for _ in range(n_terms):
+        powers = "*".join(f"{name}^{rng.randint(0, degree)}" for name in names)
+        terms.append(f"{rng.randint(-9, 9)}*{powers}")
+    return " + ".join(terms) + " + 1"
+
+
+def main():
+    print(f"{'有理式':<44} {'节点数':>6} {'默认化简':>8} {'(ms)':>8} {'加约分':>6} {'(ms)':>8}")
+    for text in RATIONAL:
+        node = parse(text)
+        plain = simplify(node)
+        reduced = simplify(node, WITH_CANCEL)
+        label = text if len(text) <= 44 else text[:41] + "..."
+        print(f"{label:<44} {node_size(node):>6} {node_size(plain):>8} "
+              f"{time_call(lambda: simplify(node)) * 1000:>8.2f} {node_size(reduced):>6} "
+              f"{time_call(lambda: simplify(node, WITH_CANCEL)) * 1000:>8.2f}")
+    
+    # 反复求导：不约分时表达式逐阶膨胀，约分后保持为一个 p/q
+    print()
+    print(f"{'阶数':>4} {'默认化简节点数':>14} {'加约分节点数':>12}")
+    x = Symbol('x')
+    plain = reduced = parse("(x^2 + 1)/(x^2 - 1)")
+    for order in range(1, 7):
+        plain = simplify(diff(plain, x))
+        reduced = simplify(diff(reduced, x), WITH_CANCEL)
+        print(f"{order:>4} {node_size(plain):>14} {node_size(reduced):>12}")
+    
+    # GCD：两个随机多项式各乘上同一个公因式
+    print()
+    print(f"{'变量':<8} {'次数':>4} {'启发式 GCD(ms)':>14} {'伪余式序列(ms)':>14}")
+    rng = random.Random(0)
+    for names, degree in ((("x",), 10), (("x",), 30), (("x", "y"), 4), (("x", "y", "z"), 2)):
+        common, a, b = (parse(random_polynomial(rng, names, 5, degree)) for _ in range(3))
+        generators = _generators([common, a, b])
+        pc, pa, pb = (_integer_polynomial(node, generators) for node in (common, a, b))
+        f, g = _poly_mul(pc, pa, None), _poly_mul(pc, pb, None)
+        variables = _variables(f, g)
+        print(f"{','.join(names):<8} {degree:>4} {time_call(lambda: _heu_gcd(f, g, variables)) * 1000:>14.2f} "
+              f"{time_call(lambda: _prs_gcd(f, g, variables), repeat=1) * 1000:>14.2f}")
+    
+    print()
+    print(f"{'因式分解':<36} {'因式数':>6} {'耗时(ms)':>10}")
+    for text in ("x^30 - 1", "x^4 + 4", "(x^2 - 2)*(x^3 - 3)*(x^5 - 5)",
+                 "(x^2 + x + 1)^3*(x - 7)^2", "x^4 - 10*x^2 + 1",
+                 "x^3 - x^2*y - x*y^2 + y^3", "(x^2 + y^2 + 1)*(x*y - 1)*(x + y)^2",
+                 "x^6 - y^6", "x^4*y^4 - z^4"):
+        node = parse(text)
+        result = factor(node)
+        count = len(result.factors) if result.__class__.__name__ == 'Mul' else 1
+        print(f"{text:<36} {count:>6} {time_call(lambda: factor(node)) * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Gröbner 基计算的基准测试
+在标准测试方程组 cyclic-n 和 katsura-n 上，分别用 grevlex / lex 序、
+有理数域和有限域 GF(32003) 计算约化 Gröbner 基
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import Symbol, Number, Add, Mul, Pow
+from mathforge_core.groebner import groebner
+
+
+PRIME = 32003
+
+
+def cyclic(n: int):
+    """cyclic-n：x0 + ... + x(n-1), x0 x1 + x1 x2 + ..., ..., x0 ... x(n-1) - 1"""
+    x = [Symbol(f'x{i}') for i in range(n)]
+    equations = []
+    for k in range(1, n):
+        equations.append(Add(*[Mul(*[x[(i + j) % n] for j in range(k)]) for i in range(n)]))
+    equations.append(Add(Mul(*x), Number(-1)))
+    return equations, [s.name for s in x]
+
+
+def katsura(n: int):
+    """katsura-n：sum_l u|l| u|m-l| = u_m（m = 0..n-1），u0 + 2 (u1 + ... + un) = 1"""
+    u = [Symbol(f'u{i}') for i in range(n + 1)]
+    
+    def var(i):
+        i = abs(i)
+        return u[i] if i <= n else None
+    
+    equations = []
+    for m in range(n):
+        terms = []
+        for l in range(-n, n + 1):
+            a, b = var(l), var(m - l)
+            if a is not None and b is not None:
+                terms.append(Pow(a, Number(2)) if a is b else Mul(a, b))
+        terms.append(Mul(Number(-1), u[m]))
+        equations.append(Add(*terms))
+    equations.append(Add(u[0], *[Mul(Number(2), s) for s in u[1:]], Number(-1)))
+    return equations, [s.name for s in u]
+
+
+def main():
+    cases = [
+        (cyclic, 4, 'grevlex', None),
+        (cyclic, 4, 'lex', None),
+        (cyclic, 5, 'grevlex', None),
+        (cyclic, 5, 'grevlex', PRIME),
+        (cyclic, 6, 'grevlex', PRIME),
+        (katsura, 3, 'grevlex', None),
+        (katsura, 3, 'lex', None),
+        (katsura, 4, 'grevlex', None),
+        (katsura, 5, 'grevlex', None),
+        (katsura, 5, 'grevlex', PRIME),
+        (katsura, 6, 'grevlex', PRIME),
+    ]
+    print(f"{'方程组':<12} {'单项式序':<8} {'系数域':<8} {'基的大小':>8} {'耗时(ms)':>10}")
+    for build, n, order, modulus in cases:
+        equations, names = build(n)
+        start = time.perf_counter()
+        basis = groebner(equations, names, order=order, modulus=modulus)
+        elapsed = time.perf_counter() - start
+        field = f'GF({modulus})' if modulus else 'Q'
+        print(f"{build.__name__ + '-' + str(n):<12} {order:<8} {field:<8} {len(basis):>8} {elapsed * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
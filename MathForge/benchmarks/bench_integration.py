@@ -0,0 +1,53 @@
+"""
+符号积分的基准测试
+对一组覆盖积分表、线性换元、分部积分和部分分式的被积函数，
+分别测量首次求解（清空缓存）和缓存命中时的耗时
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, Symbol
+from mathforge_core.integration import antiderivative, _MEMO
+from _timing import time_call
+
+
+CASES = [
+    "3*x^4 - 2*x + 7",
+    "cos(3*x + 1)",
+    "exp(2*x) + 2^x",
+    "x^2*sin(x)",
+    "x^6*exp(2*x)",
+    "x^3*log(x)",
+    "x*atan(x)",
+    "(x^3 + 1)/(x^2 - 3*x + 2)",
+    "1/((x - 1)^2*(x + 2))",
+    "(2*x + 3)/(x^2 + x + 1)",
+    "1/(x^4 + 1)",
+    "exp(x)*sin(x)",
+    "exp(x^2)",
+]
+
+
+def main():
+    x = Symbol('x')
+    print(f"{'被积函数':<28} {'结果':<6} {'首次(ms)':>10} {'缓存(ms)':>10}")
+    for text in CASES:
+        node = parse(text)
+        
+        def cold():
+            _MEMO.clear()
+            return antiderivative(node, x)
+        
+        found = cold() is not None
+        cold_time = time_call(cold, repeat=5)
+        antiderivative(node, x)
+        warm_time = time_call(lambda: antiderivative(node, x), repeat=5)
+        status = '成功' if found else '失败'
+        print(f"{text:<28} {status:<6} {cold_time * 1000:>10.3f} {warm_time * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
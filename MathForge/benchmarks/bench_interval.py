@@ -0,0 +1,61 @@
+"""
+区间算术的基准测试
+比较整批向量化区间求值与逐个区间求值的耗时，
+并给出 nsolve 在区间剪枝前后的耗时和实际求值的采样点数
+"""
+
+import sys
+import os
+import importlib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import numpy as np
+
+from mathforge_core import parse, Symbol
+from mathforge_core.interval import eval_interval, eval_intervals
+from _timing import time_call
+
+# 包里的 nsolve 名字是函数，这里需要模块本身
+nsolve_module = importlib.import_module('mathforge_core.nsolve')
+
+
+CASES = [
+    "cos(x) - x",
+    "x^4 - 10*x^2 + 9",
+    "exp(x) + 1",
+    "sin(10*x)*exp(0-x)",
+    "log(x) - 1",
+    "tan(x) - x",
+    "x^2*sin(1/x)",
+]
+
+CELLS = 2000
+
+
+def main():
+    x = Symbol('x')
+    edges = np.linspace(-10.0, 10.0, CELLS + 1)
+    lows, highs = edges[:-1], edges[1:]
+    print(f"{'表达式':<22} {'整批(ms)':>9} {'逐个(ms)':>9} {'候选格子':>8} "
+          f"{'nsolve剪枝':>11} {'nsolve全采样':>12} {'根数':>5}")
+    for text in CASES:
+        node = parse(text)
+        batch_time = time_call(lambda: eval_intervals(node, {'x': (lows, highs)}), repeat=5)
+        single_time = time_call(lambda: [eval_interval(node, {'x': (a, b)}) for a, b in zip(lows, highs)], repeat=1)
+        cells = nsolve_module._candidate_cells(node, x, edges.tolist())
+        
+        pruned_time = time_call(lambda: nsolve_module.nsolve(node, x), repeat=5)
+        roots = nsolve_module.nsolve(node, x)
+        numpy_module = nsolve_module.np
+        nsolve_module.np = None  # 关闭剪枝作对照
+        try:
+            full_time = time_call(lambda: nsolve_module.nsolve(node, x), repeat=5)
+        finally:
+            nsolve_module.np = numpy_module
+        print(f"{text:<22} {batch_time * 1000:>9.2f} {single_time * 1000:>9.2f} {len(cells):>8} "
+              f"{pruned_time * 1000:>11.2f} {full_time * 1000:>12.2f} {len(roots):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+线性方程组求解的基准测试
+在三对角（一维泊松）和随机稀疏方程组上测量精确模式与浮点模式的耗时
+"""
+
+import sys
+import os
+import random
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import Symbol, Number, Add, Mul, solve_linear_system
+
+
+def tridiagonal(n: int, rng: random.Random):
+    """-u[i-1] + 2 u[i] - u[i+1] = 1"""
+    u = [Symbol(f'u{i}') for i in range(n)]
+    equations = []
+    for i in range(n):
+        terms = [Mul(Number(2), u[i])]
+        if i > 0:
+            terms.append(Mul(Number(-1), u[i - 1]))
+        if i < n - 1:
+            terms.append(Mul(Number(-1), u[i + 1]))
+        terms.append(Number(-1))
+        equations.append(Add(*terms))
+    return equations, [s.name for s in u]
+
+
+def random_sparse(n: int, rng: random.Random):
+    """每行含对角元和 3 个随机非零元的整数系数方程组"""
+    v = [Symbol(f'v{i}') for i in range(n)]
+    equations = []
+    for i in range(n):
+        cols = {i} | {rng.randrange(n) for _ in range(3)}
+        terms = [Mul(Number(rng.choice([-1, 1]) * rng.randint(1, 9)), v[j]) for j in sorted(cols)]
+        terms.append(Number(rng.randint(-9, 9)))
+        equations.append(Add(*terms))
+    return equations, [s.name for s in v]
+
+
+def main():
+    rng = random.Random(0)
+    cases = [
+        (tridiagonal, (100, 1000, 5000), (100, 1000, 5000)),
+        (random_sparse, (100, 300, 1000), (100, 300)),
+    ]
+    print(f"{'方程组':<14} {'未知量数':>8} {'模式':<6} {'耗时(ms)':>10}")
+    for build, float_sizes, exact_sizes in cases:
+        for n in sorted(set(float_sizes) | set(exact_sizes)):
+            equations, names = build(n, rng)
+            for exact in (False, True):
+                if n not in (exact_sizes if exact else float_sizes):
+                    continue
+                start = time.perf_counter()
+                solve_linear_system(equations, names, exact=exact)
+                elapsed = time.perf_counter() - start
+                mode = 'exact' if exact else 'float'
+                print(f"{build.__name__:<14} {n:>8} {mode:<6} {elapsed * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
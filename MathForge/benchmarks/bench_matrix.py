@@ -0,0 +1,136 @@
+"""
+符号矩阵的基准测试
+测量 Bareiss 行列式、LU 分解和求逆随阶数（到 100×100）的耗时，
+比较共享元素乘积的矩阵乘法与逐项新建节点的朴素乘法，
+以及稀疏的雅可比矩阵组装与逐元素求导化简
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, simplify, diff, Symbol, Add, Mul, Matrix, jacobian
+from mathforge_core.ast import children
+from _timing import time_call
+
+
+def integer_matrix(rng: random.Random, n: int) -> Matrix:
+    """元素为 [-9, 9] 内随机整数的稠密矩阵"""
+    return Matrix([[rng.randint(-9, 9) for _ in range(n)] for _ in range(n)])
+
+
+def tridiagonal(n: int) -> Matrix:
+    """对角线为 x、次对角线为 1 的三对角矩阵（行列式是 x 的 n 次多项式）"""
+    x = Symbol('x')
+    entries = {(i, i): x for i in range(n)}
+    for i in range(n - 1):
+        entries[i, i + 1] = entries[i + 1, i] = 1
+    return Matrix.sparse((n, n), entries)
+
+
+def dense_symbolic(rng: random.Random, n: int) -> Matrix:
+    """约一半元素为 x + c、其余为整数的稠密矩阵"""
+    return Matrix([[parse(f"x + {rng.randint(-5, 5)}") if rng.random() < 0.5 else rng.randint(-5, 5)
+                    for _ in range(n)] for _ in range(n)])
+
+
+# (名称, 构造函数, 各操作允许的最大阶数)
+FAMILIES = [
+    ("整数稠密", lambda rng, n: integer_matrix(rng, n), {'det': 100, 'lu': 100, 'inv': 100}),
+    ("符号三对角", lambda rng, n: tridiagonal(n), {'det': 100, 'lu': 100, 'inv': 25}),
+    ("符号稠密", dense_symbolic, {'det': 10, 'lu': 10, 'inv': 10}),
+]
+
+
+def naive_product(a: Matrix, b: Matrix) -> Matrix:
+    """逐项新建 Mul / Add 节点的稠密矩阵乘法（对照）"""
+    left, right = a.tolist(), b.tolist()
+    rows = []
+    for row in left:
+        line = []
+        for j in range(b.shape[1]):
+            terms = [Mul(row[k], right[k][j]) for k in range(a.shape[1])]
+            line.append(Add(*terms))
+        rows.append(line)
+    return Matrix(rows)
+
+
+def distinct_nodes(matrix: Matrix) -> int:
+    """结果中不同的节点对象个数"""
+    seen = set()
+    stack = [item for _, item in matrix.nonzeros()]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        stack.extend(children(node))
+    return len(seen)
+
+
+def banded(rng: random.Random, n: int, width: int, pool) -> Matrix:
+    """带宽为 width 的带状矩阵，元素从 pool 中随机选取"""
+    entries = {}
+    for i in range(n):
+        for j in range(max(0, i - width), min(n, i + width + 1)):
+            entries[i, j] = rng.choice(pool)
+    return Matrix.sparse((n, n), entries)
+
+
+def discretized_system(n: int):
+    """一维非线性边值问题的差分方程组 u_{i-1} - 2u_i + u_{i+1} + h^2 exp(u_i) sin(u_i) = 0"""
+    names = [f"u{i}" for i in range(n)]
+    exprs = []
+    for i in range(n):
+        left = names[i - 1] if i > 0 else "0"
+        right = names[i + 1] if i < n - 1 else "0"
+        exprs.append(parse(f"{left} - 2*{names[i]} + {right} + 0.0001*exp({names[i]})*sin({names[i]})"))
+    return exprs, names
+
+
+def main():
+    rng = random.Random(0)
+    sizes = (10, 25, 50, 100)
+    print(f"{'矩阵':<10} {'阶数':>4} {'det(ms)':>10} {'lu(ms)':>10} {'inv(ms)':>10}")
+    for name, build, limits in FAMILIES:
+        for n in sizes:
+            if n > max(limits.values()):
+                continue
+            matrix = build(rng, n)
+            cells = []
+            for op in ('det', 'lu', 'inv'):
+                if n <= limits[op]:
+                    cells.append(f"{time_call(getattr(matrix, op), repeat=1) * 1000:>10.1f}")
+                else:
+                    cells.append(f"{'-':>10}")
+            print(f"{name:<10} {n:>4} " + " ".join(cells))
+    
+    # 元素取自少数几个表达式时，结构相同的乘积在整个矩阵乘法中只建一次节点
+    print()
+    print(f"{'乘积':<18} {'共享(ms)':>10} {'节点数':>8} {'朴素(ms)':>10} {'节点数':>8}")
+    pool = [parse(text) for text in ("x", "y", "sin(x)", "x*y + 1", "exp(y)", "2", "-1")]
+    for label, n, width in (("带状 100×100", 100, 3), ("稠密 30×30", 30, 30), ("稠密 60×60", 60, 60)):
+        a, b = banded(rng, n, width, pool), banded(rng, n, width, pool)
+        shared = a @ b
+        naive = naive_product(a, b)
+        print(f"{label:<18} {time_call(lambda: a @ b) * 1000:>10.1f} {distinct_nodes(shared):>8} "
+              f"{time_call(lambda: naive_product(a, b), repeat=1) * 1000:>10.1f} {distinct_nodes(naive):>8}")
+    
+    # 雅可比矩阵：每个方程只含三个变量，稀疏组装只求 3n 个导数
+    print()
+    print(f"{'方程数':>6} {'jacobian(ms)':>13} {'非零元':>6} {'逐元素求导(ms)':>14} {'LU(ms)':>10}")
+    for n in (10, 25, 50, 100):
+        exprs, names = discretized_system(n)
+        matrix = jacobian(exprs, names)
+        symbols = [Symbol(name) for name in names]
+        elementwise = time_call(lambda: [[simplify(diff(e, s)) for s in symbols] for e in exprs], repeat=1)
+        # 在一个数值点上做 LU（符号 LU 的规模随生成元个数指数增长）
+        point = Matrix(matrix.eval({name: 0.5 for name in names}))
+        print(f"{n:>6} {time_call(lambda: jacobian(exprs, names)) * 1000:>13.1f} {len(matrix.nonzeros()):>6} "
+              f"{elementwise * 1000:>14.1f} {time_call(point.lu, repeat=1) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
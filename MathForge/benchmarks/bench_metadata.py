@@ -0,0 +1,90 @@
+"""
+节点元数据缓存的基准测试
+比较每次重新遍历整棵树（自由符号、节点数、深度、多项式次数）与查询节点上
+缓存的元数据：第一次查询需要遍历并写入缓存，之后的查询只是属性读取
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import (parse, solve, free_symbols, node_size, node_depth,
+                            polynomial_degree, Symbol, Add)
+from mathforge_core.ast import children, Symbol as SymbolNode
+from mathforge_core.polynomial import poly_coefficient_nodes
+
+
+def walk_symbols(node):
+    """每次遍历整棵树收集符号名（缓存之前的做法）"""
+    names = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, SymbolNode):
+            names.add(current.name)
+        stack.extend(children(current))
+    return names
+
+
+def walk_size_depth(node):
+    """每次遍历整棵树计算节点数和深度"""
+    size, depth = 0, 0
+    stack = [(node, 1)]
+    while stack:
+        current, level = stack.pop()
+        size += 1
+        depth = max(depth, level)
+        stack.extend((kid, level + 1) for kid in children(current))
+    return size, depth
+
+
+def walk_degree(node, var):
+    """展开符号系数求次数（缓存之前求解器判断二次以内多项式的做法）"""
+    coeffs = poly_coefficient_nodes(node, var)
+    return None if coeffs is None else len(coeffs) - 1
+
+
+def workload(n_terms: int):
+    """含参数的多项式与若干非多项式项之和"""
+    terms = [parse(f"a{k % 13}*x^{k % 3} + sin(y*{k})") for k in range(n_terms)]
+    return Add(*terms)
+
+
+def time_repeated(func, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    x = Symbol('x')
+    repeats = 20
+    print(f"{'项数':>6} {'查询':<10} {'遍历(ms)':>10} {'首次缓存(ms)':>14} {'再次查询(ms)':>14}")
+    for n_terms in (100, 1000, 10000):
+        node = workload(n_terms)
+        queries = [
+            ("符号集合", lambda: walk_symbols(node), lambda n: free_symbols(n)),
+            ("节点数/深度", lambda: walk_size_depth(node), lambda n: (node_size(n), node_depth(n))),
+            ("次数", lambda: walk_degree(node, x), lambda n: polynomial_degree(n, x)),
+        ]
+        for label, walk, cached in queries:
+            walk_time = time_repeated(walk, repeats)
+            fresh = workload(n_terms)  # 尚未缓存的同一表达式
+            walk_size_depth(fresh)  # 规范化各节点的子节点顺序（第一次访问时进行），不计入首次缓存
+            first = time_repeated(lambda: cached(fresh), 1)
+            again = time_repeated(lambda: cached(fresh), repeats)
+            print(f"{n_terms:>6} {label:<10} {walk_time * 1000:>10.3f} {first * 1000:>14.3f} {again * 1000:>14.5f}")
+    
+    # 求解器：先按缓存的次数判断能否用线性/二次公式，不再展开符号系数
+    print()
+    print(f"{'方程':<28} {'求解(ms)':>10}")
+    for text in ("a*x^2 + b*x + c", "x^2 - 4", "sin(x) + x - 2"):
+        equation = parse(text)
+        print(f"{text:<28} {time_repeated(lambda: solve(equation, x), repeats) * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
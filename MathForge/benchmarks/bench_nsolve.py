@@ -0,0 +1,39 @@
+"""
+数值求根的基准测试
+测量几类超越方程在默认区间上求出全部实根的耗时，并检查根处的残差
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, Symbol, nsolve, compile_function
+from _timing import time_call
+
+
+CASES = [
+    "cos(x) - x",
+    "sin(x)",
+    "sin(x)^2",
+    "exp(x) - 3*x^2",
+    "tan(x) - 1",
+    "log(x) + x - 2",
+    "sin(10*x) + cos(3*x)",
+]
+
+
+def main():
+    x = Symbol('x')
+    print(f"{'方程':<24} {'根数':>6} {'最大残差':>12} {'耗时(ms)':>10}")
+    for text in CASES:
+        equation = parse(text)
+        roots = nsolve(equation, x)
+        f = compile_function(equation, ['x'])
+        residual = max((abs(f(root)) for root in roots), default=0.0)
+        elapsed = time_call(lambda: nsolve(equation, x))
+        print(f"{text:<24} {len(roots):>6} {residual:>12.2e} {elapsed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+多项式求根的基准测试
+在 10 到 1000 次的多项式上测量 solve() 的耗时（含系数提取）
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import Symbol, Number, Add, Mul, Pow, solve
+from mathforge_core import polynomial
+from _timing import time_call
+
+
+def build_polynomial(coeffs):
+    """由系数（从常数项到最高次项）构造扁平加法形式的多项式"""
+    x = Symbol('x')
+    terms = []
+    for degree, c in enumerate(coeffs):
+        if c:
+            terms.append(Mul(Number(c), Pow(x, Number(degree))))
+    return Add(*terms)
+
+
+def random_integer(degree: int, rng: random.Random):
+    """随机整数系数（大多为无理根，走数值路径）"""
+    return [rng.randint(-9, 9) for _ in range(degree)] + [rng.randint(1, 9)]
+
+
+def with_rational_roots(degree: int, rng: random.Random):
+    """(x-1)(x+2)(2x-1) 乘以随机整数系数多项式（有理根走精确路径）"""
+    coeffs = random_integer(degree - 3, rng)
+    for p, q in ((1, 1), (-2, 1), (1, 2)):
+        # 乘以 (q*x - p)
+        shifted = [0] + [q * c for c in coeffs]
+        coeffs = [s - p * c for s, c in zip(shifted, coeffs + [0])]
+    return coeffs
+
+
+def roots_of_unity(degree: int, rng: random.Random):
+    """x^n - 1"""
+    return [-1] + [0] * (degree - 1) + [1]
+
+
+def main():
+    x = Symbol('x')
+    rng = random.Random(0)
+    backends = [('numpy', polynomial.np), ('aberth', None)] if polynomial.np is not None else [('aberth', None)]
+    
+    print(f"{'后端':<8} {'多项式':<20} {'次数':>6} {'耗时(ms)':>10} {'实根数':>8}")
+    for backend, module in backends:
+        saved, polynomial.np = polynomial.np, module
+        try:
+            for build in (random_integer, with_rational_roots, roots_of_unity):
+                for degree in (10, 50, 100, 200, 500, 1000):
+                    node = build_polynomial(build(degree, rng))
+                    elapsed = time_call(lambda: solve(node, x), repeat=1 if degree >= 500 else 3)
+                    print(f"{backend:<8} {build.__name__:<20} {degree:>6} {elapsed * 1000:>10.1f} {len(solve(node, x)):>8}")
+        finally:
+            polynomial.np = saved
+
+
+if __name__ == "__main__":
+    main()
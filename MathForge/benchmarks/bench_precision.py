@@ -0,0 +1,71 @@
+"""
+高精度求值的基准测试
+比较浮点求值与不同有效数字位数的 eval_precise 的耗时，
+并在相消严重的点上比较两者的误差（以 200 位的结果为参考值）
+"""
+
+import sys
+import os
+from decimal import Decimal, localcontext, Context
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, eval_precise
+from mathforge_core.precision import mpmath
+from _timing import time_call
+
+
+EXPRESSIONS = [
+    ("x^5 - 3*x^3 + 2*x - 7", {'x': 1.3}),
+    ("sin(x)*exp(-1*x) + log(x + 1)", {'x': 0.7}),
+    ("atan(x)^2 + sqrt(x^2 + 1)*cos(x)", {'x': 2.5}),
+    ("tan(sin(x) + cos(y))/(x^2 + y^2)", {'x': 0.3, 'y': 1.1}),
+]
+
+# 浮点求值因相消失去全部或大部分有效数字的例子
+CANCELLATION = [
+    ("(1 - cos(x))/x^2", {'x': 1e-8}),
+    ("(exp(x) - 1 - x)/x^2", {'x': 1e-9}),
+    ("sqrt(x^2 + 1) - x", {'x': 1e9}),
+    ("(x + 1)^6 - x^6 - 6*x^5", {'x': 1e4}),
+    ("log(1 + x)/x", {'x': 1e-17}),
+    # 恒为 0；相邻两种工作精度会以同样的方式舍掉被相消暴露的 1
+    ("(x + 1)^2 - x^2 - 2*x - 1", {'x': 1e15}),
+    ("(x + 1)^2 - x^2 - 2*x - 1", {'x': 1e30}),
+]
+
+
+def relative_error(value, reference: Decimal) -> str:
+    with localcontext(Context(prec=50)):
+        if not reference:
+            return f"{float(abs(Decimal(value))):.1e}"
+        return f"{float(abs((Decimal(value) - reference) / reference)):.1e}"
+
+
+def main():
+    backends = ['decimal'] + (['mpmath'] if mpmath is not None else [])
+    digit_counts = (15, 30, 100, 1000)
+    print(f"{'表达式':<36} {'后端':<8} {'float(ms)':>10} "
+          + " ".join(f"{f'{d}位(ms)':>10}" for d in digit_counts))
+    for text, values in EXPRESSIONS:
+        node = parse(text)
+        float_time = time_call(lambda: node.eval(values), repeat=5)
+        for backend in backends:
+            times = [time_call(lambda: eval_precise(node, values, digits, backend), repeat=5) for digits in digit_counts]
+            print(f"{text:<36} {backend:<8} {float_time * 1000:>10.4f} "
+                  + " ".join(f"{t * 1000:>10.3f}" for t in times))
+    
+    print()
+    print(f"{'相消':<30} {'float':>24} {'float 相对误差':>14} {'30 位':>34} {'30 位相对误差':>14} {'(ms)':>8}")
+    for text, values in CANCELLATION:
+        node = parse(text)
+        reference = eval_precise(node, values, 200)
+        by_float = node.eval(values)
+        precise = eval_precise(node, values, 30)
+        elapsed = time_call(lambda: eval_precise(node, values, 30), repeat=5)
+        print(f"{text:<30} {by_float:>24.17g} {relative_error(by_float, reference):>14} "
+              f"{str(precise):>34} {relative_error(precise, reference):>14} {elapsed * 1000:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
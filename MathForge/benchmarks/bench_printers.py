@@ -0,0 +1,58 @@
+"""
+字符串与 LaTeX 输出的基准测试
+在约 10 万节点的表达式树上测量 str() 与 to_latex() 的耗时（每次清空渲染缓存）
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import Symbol, Number, Add, Mul, Pow, Sin, Exp, to_latex
+from mathforge_core.ast import STR_CACHE
+from mathforge_core.latex import LATEX_CACHE
+from _timing import time_call
+
+
+def deep_chain(n_nodes: int):
+    """解析器风格的左结合加法链：((x+1)+2)+...，深度约为 n_nodes/2"""
+    x = Symbol('x')
+    node = x
+    for i in range(n_nodes // 2):
+        node = Add(node, Number(i + 1))
+    return node
+
+
+def deep_nesting(n_nodes: int):
+    """交替嵌套的函数与幂次：sin(exp(...)^2)，深度约为 n_nodes/3"""
+    node = Symbol('x')
+    for i in range(n_nodes // 3):
+        node = Sin(node) if i % 2 else Pow(Exp(node), Number(2))
+    return node
+
+
+def wide_sum(n_nodes: int):
+    """扁平的大加法：sum(k*x^k)，每项约 5 个节点"""
+    x = Symbol('x')
+    return Add(*[Mul(Number(-k if k % 3 == 0 else k), Pow(x, Number(k))) for k in range(n_nodes // 5)])
+
+
+def clear_caches():
+    """清空渲染缓存，每次都测冷缓存的耗时"""
+    STR_CACHE.clear()
+    LATEX_CACHE.clear()
+
+
+def main():
+    print(f"{'树形':<14} {'节点数':>8} {'str(ms)':>10} {'latex(ms)':>10} {'输出长度':>10}")
+    for build in (deep_chain, deep_nesting, wide_sum):
+        for n_nodes in (1000, 10000, 100000):
+            node = build(n_nodes)
+            str_time = time_call(lambda: str(node), setup=clear_caches)
+            latex_time = time_call(lambda: to_latex(node), setup=clear_caches)
+            print(f"{build.__name__:<14} {n_nodes:>8} {str_time * 1000:>10.1f} "
+                  f"{latex_time * 1000:>10.1f} {len(to_latex(node)):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+渲染缓存的基准测试
+比较冷缓存渲染、重复渲染同一结果、渲染结构相同的新对象以及渲染重叠表达式的耗时
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, diff, to_latex, Symbol, Add
+from mathforge_core.latex import LATEX_CACHE
+from _timing import time_call
+
+
+def build_derivative(order: int):
+    """对含复合函数的表达式多次求导，结果中含大量重复子树"""
+    x = Symbol('x')
+    node = parse("sin(x^2 + 1) * exp(x) / (x + 1)")
+    for _ in range(order):
+        node = diff(node, x)
+    return node
+
+
+def main():
+    print(f"{'求导阶数':>8} {'冷缓存(ms)':>12} {'同一对象(ms)':>14} {'同构新对象(ms)':>16} {'重叠表达式(ms)':>16}")
+    for order in (1, 2, 3, 4):
+        node = build_derivative(order)
+        fresh = build_derivative(order)
+        overlapping = Add(node, Symbol('y'))
+        cold = time_call(lambda: to_latex(node), setup=LATEX_CACHE.clear, repeat=5)
+        to_latex(node)
+        warm = time_call(lambda: to_latex(node), repeat=5)
+        same_shape = time_call(lambda: to_latex(fresh), repeat=5)
+        overlap = time_call(lambda: to_latex(overlapping), repeat=5)
+        print(f"{order:>8} {cold * 1000:>12.2f} {warm * 1000:>14.3f} "
+              f"{same_shape * 1000:>16.3f} {overlap * 1000:>16.3f}")
+    print(f"缓存条目: {len(LATEX_CACHE)}, 命中: {LATEX_CACHE.hits}, 未命中: {LATEX_CACHE.misses}")
+
+
+if __name__ == "__main__":
+    main()
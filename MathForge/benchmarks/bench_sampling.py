@@ -0,0 +1,51 @@
+"""
+绘图采样的基准测试
+比较一次自适应采样与逐点求值（每个点都像 /api/eval 那样解析、化简再求值）
+得到同样多个点的耗时，并给出自适应采样的点数
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, simplify, Symbol
+from mathforge_core.sampling import adaptive_sample
+from _timing import time_call
+
+
+CASES = [
+    ("sin(x)", 0.0, 6.28),
+    ("tan(x)", -5.0, 5.0),
+    ("sin(1/x)", 0.01, 1.0),
+    ("exp(0-x^2)*cos(20*x)", -3.0, 3.0),
+    ("sqrt(x)*log(x)", -1.0, 5.0),
+    ("x^5 - 3*x^3 + x", -2.0, 2.0),
+]
+
+
+def pointwise(text, xs):
+    """逐点请求的对照实现"""
+    ys = []
+    for x in xs:
+        try:
+            ys.append(simplify(parse(text)).eval({'x': float(x)}))
+        except (ValueError, ArithmeticError):
+            ys.append(None)
+    return ys
+
+
+def main():
+    x = Symbol('x')
+    print(f"{'表达式':<24} {'点数':>6} {'自适应(ms)':>11} {'逐点(ms)':>10} {'加速比':>8}")
+    for text, a, b in CASES:
+        node = parse(text)
+        xs, _ = adaptive_sample(node, x, a, b)
+        adaptive_time = time_call(lambda: adaptive_sample(parse(text), x, a, b))
+        pointwise_time = time_call(lambda: pointwise(text, xs), repeat=1)
+        print(f"{text:<24} {len(xs):>6} {adaptive_time * 1000:>11.2f} {pointwise_time * 1000:>10.1f} "
+              f"{pointwise_time / adaptive_time:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+泰勒级数的基准测试
+测量惰性系数递推在不同阶数（直到 1000 阶）下的耗时，
+并在低阶时与反复调用 diff 再代入展开点的做法对比
+"""
+
+import sys
+import os
+import math
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, Symbol, diff, taylor
+from _timing import time_call
+
+
+CASES = [
+    "exp(sin(x))",
+    "sqrt(1+x)*cos(x)",
+    "log(1+x)/(1-x)",
+    "tan(x) + atan(2*x)",
+    "(1+x)^x",
+    "exp(sin(x))*sqrt(1+x)/(2-cos(x))",
+]
+
+ORDERS = [10, 100, 500, 1000]
+DIFF_ORDER = 4
+
+
+def by_diff(node, x, order):
+    """反复求导得到前 order+1 个系数的对照实现"""
+    coefficients = []
+    current = node
+    for k in range(order + 1):
+        coefficients.append(current.eval({'x': 0.0}) / math.factorial(k))
+        current = diff(current, x)
+    return coefficients
+
+
+def main():
+    x = Symbol('x')
+    header = ' '.join(f"{f'n={n}(ms)':>12}" for n in ORDERS)
+    print(f"{'表达式':<36} {header} {f'diff n={DIFF_ORDER}':>12} {f'级数 n={DIFF_ORDER}':>12}")
+    for text in CASES:
+        node = parse(text)
+        timings = [time_call(lambda: taylor(node, x).coefficients(n)) for n in ORDERS]
+        diff_time = time_call(lambda: by_diff(node, x, DIFF_ORDER), repeat=1)
+        series_time = time_call(lambda: taylor(node, x).coefficients(DIFF_ORDER))
+        columns = ' '.join(f"{t * 1000:>12.2f}" for t in timings)
+        print(f"{text:<36} {columns} {diff_time * 1000:>12.2f} {series_time * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+化简遍的基准测试
+在几类表达式上运行化简到不动点，输出每一遍的执行次数、耗时和节点数变化，
+用于找出在各类负载上占主导的遍
+"""
+
+import sys
+import os
+import random
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, diff, Symbol, Number, Add, Mul, Pow, Sin, Cos
+from mathforge_core.simplify import PassManager
+
+
+def derivative(order: int):
+    """含复合函数的高阶导数（未化简的求导结果有大量常数和同类项）"""
+    x = Symbol('x')
+    node = parse("sin(x^2 + 1) * exp(x) / (x + 1)")
+    for _ in range(order):
+        node = diff(node, x)
+    return node
+
+
+def polynomial(n_terms: int):
+    """随机的、未合并同类项的多项式乘积项：c*x^i*x^j*y"""
+    rng = random.Random(0)
+    x, y = Symbol('x'), Symbol('y')
+    return Add(*[Mul(Number(rng.randint(-5, 5)), Pow(x, Number(rng.randint(0, 4))),
+                     Pow(x, Number(rng.randint(0, 4))), y) for _ in range(n_terms)])
+
+
+def trig_sum(n_terms: int):
+    """多组 sin(u)^2 + cos(u)^2 与普通项混合的和"""
+    x = Symbol('x')
+    terms = []
+    for k in range(n_terms):
+        u = Mul(Number(k + 1), x)
+        terms.extend([Pow(Sin(u), Number(2)), Pow(Cos(u), Number(2)), Mul(Number(k), u)])
+    return Add(*terms)
+
+
+def main():
+    workloads = [
+        ("derivative(3)", derivative(3)),
+        ("derivative(5)", derivative(5)),
+        ("polynomial(2000)", polynomial(2000)),
+        ("trig_sum(300)", trig_sum(300)),
+    ]
+    for name, node in workloads:
+        manager = PassManager(profile=True)
+        start = time.perf_counter()
+        manager.run(node)
+        elapsed = time.perf_counter() - start
+        print(f"== {name}: 总耗时 {elapsed * 1000:.1f} ms")
+        print(manager.report())
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+批量求解模板的基准测试
+比较逐组代入参数调用 solve() 与 SolveTemplate 一次向量化求解的耗时
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, solve, Symbol, Number, SolveTemplate
+
+
+EQUATIONS = {
+    'quadratic': ("a*x^2 + b*x + c", ['a', 'b', 'c']),
+    'cubic': ("a*x^3 + b*x^2 + c*x + d", ['a', 'b', 'c', 'd']),
+}
+
+
+def solve_each(equation, var, params, values, n):
+    """逐组代入参数并调用 solve()"""
+    for i in range(n):
+        substituted = equation.substitute({name: Number(values[name][i]) for name in params})
+        solve(substituted, var)
+
+
+def main():
+    x = Symbol('x')
+    rng = np.random.default_rng(0)
+    print(f"{'方程':<10} {'组数':>8} {'逐个solve(ms)':>15} {'模板构造(ms)':>14} {'模板求解(ms)':>14}")
+    for label, (text, params) in EQUATIONS.items():
+        equation = parse(text)
+        start = time.perf_counter()
+        template = SolveTemplate(equation, x, params)
+        build = time.perf_counter() - start
+        for n in (100, 1000, 10000, 1000000):
+            values = {name: rng.normal(size=n) for name in params}
+            if n <= 10000:
+                start = time.perf_counter()
+                solve_each(equation, x, params, values, n)
+                loop = f"{(time.perf_counter() - start) * 1000:>15.1f}"
+            else:
+                loop = f"{'-':>15}"
+            start = time.perf_counter()
+            template.solve(values)
+            batch = time.perf_counter() - start
+            print(f"{label:<10} {n:>8} {loop} {build * 1000:>14.2f} {batch * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+代入的基准测试
+比较逐节点重建整棵树的代入与结构共享的代入（只重建含被替换符号的路径），
+以及参数扫描时逐组调用 substitute 与 substitute_many 一次处理全部取值组
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, substitute_many, Number, Add
+from mathforge_core.ast import children, rebuild, Symbol
+from _timing import time_call
+
+
+def copy_substitute(node, substitutions):
+    """逐节点重建整棵树的代入（结构共享之前的做法），作为对照"""
+    done = {}
+    stack = [(node, False)]
+    while stack:
+        current, ready = stack.pop()
+        kids = children(current)
+        if kids and not ready:
+            stack.append((current, True))
+            stack.extend((kid, False) for kid in kids)
+            continue
+        if isinstance(current, Symbol):
+            done[id(current)] = substitutions.get(current.name, current)
+        elif kids:
+            done[id(current)] = rebuild(current, [done[id(kid)] for kid in kids])
+        else:
+            done[id(current)] = current
+    return done[id(node)]
+
+
+def model(n_terms: int):
+    """只有少数几项含参数 a 的大表达式"""
+    terms = [parse(f"{k % 5 + 1}*x^{k % 7}*sin(x + {k})") for k in range(n_terms)]
+    terms.append(parse("a*exp(-x^2)"))
+    return Add(*terms)
+
+
+def count_new_nodes(original, result) -> int:
+    """result 中不属于 original 的节点数"""
+    old = set()
+    stack = [original]
+    while stack:
+        current = stack.pop()
+        if id(current) not in old:
+            old.add(id(current))
+            stack.extend(children(current))
+    new = set()
+    stack = [result]
+    while stack:
+        current = stack.pop()
+        if id(current) not in old and id(current) not in new:
+            new.add(id(current))
+            stack.extend(children(current))
+    return len(new)
+
+
+def main():
+    print(f"{'项数':>6} {'整树重建(ms)':>14} {'结构共享(ms)':>14} {'新建节点(重建)':>16} {'新建节点(共享)':>16}")
+    for n_terms in (100, 1000, 10000):
+        node = model(n_terms)
+        node.substitute({'a': Number(0)})  # 预先计算并缓存各节点的符号集合
+        values = {'a': Number(2.5)}
+        copied = copy_substitute(node, values)
+        shared = node.substitute(values)
+        print(f"{n_terms:>6} {time_call(copy_substitute, node, values, repeat=1) * 1000:>14.2f} "
+              f"{time_call(node.substitute, values, repeat=1) * 1000:>14.3f} "
+              f"{count_new_nodes(node, copied):>16} {count_new_nodes(node, shared):>16}")
+    
+    print()
+    print(f"{'项数':>6} {'取值组数':>8} {'逐组 substitute(ms)':>20} {'substitute_many(ms)':>20}")
+    for n_terms in (1000, 10000):
+        node = model(n_terms)
+        for n_sets in (100, 1000):
+            value_sets = [{'a': 0.01 * i} for i in range(n_sets)]
+            loop = time_call(lambda: [node.substitute({'a': Number(values['a'])}) for values in value_sets], repeat=1)
+            batch = time_call(substitute_many, node, value_sets, repeat=1)
+            print(f"{n_terms:>6} {n_sets:>8} {loop * 1000:>20.2f} {batch * 1000:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
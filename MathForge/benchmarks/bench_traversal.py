@@ -0,0 +1,75 @@
+"""
+树遍历框架的基准测试
+在深层链、共享子树很多的高阶导数和宽和式上运行基于 traversal 的各遍
+（求导、LaTeX、重写、化简），并比较按对象身份与按结构记忆化的 fold
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, simplify, diff, rewrite, to_latex, fold, Symbol, Number, Add, Sin
+from mathforge_core.latex import LATEX_CACHE
+from _timing import time_call
+
+
+def deep_chain(depth: int):
+    """sin(sin(...(x + 1) + 1) + 1) 形式的深层链，递归实现会超出递归深度限制"""
+    node = Symbol('x')
+    for _ in range(depth):
+        node = Sin(Add(node, Number(1)))
+    return node
+
+
+def shared_derivative(order: int):
+    """未化简的高阶导数：乘积法则让同一子树在结果中出现很多次"""
+    x = Symbol('x')
+    node = parse("sin(x^2 + 1) * exp(x) / (x + 1)")
+    for _ in range(order):
+        node = diff(node, x)
+    return node
+
+
+def wide_sum(n_terms: int):
+    """n_terms 项的多项式"""
+    return parse(" + ".join(f"{k % 7 + 1}*x^{k % 9}" for k in range(n_terms)))
+
+
+def main():
+    x = Symbol('x')
+    workloads = [
+        ("deep_chain(20000)", deep_chain(20000)),
+        ("shared_derivative(4)", shared_derivative(4)),
+        ("wide_sum(5000)", wide_sum(5000)),
+    ]
+    operations = [
+        ("diff", lambda node: diff(node, x)),
+        ("to_latex", lambda node: (LATEX_CACHE.clear(), to_latex(node))),
+        ("rewrite", rewrite),
+        ("simplify", simplify),
+    ]
+    print(f"{'表达式':<22} " + " ".join(f"{name + '(ms)':>14}" for name, _ in operations))
+    for label, node in workloads:
+        times = []
+        for _, operation in operations:
+            try:
+                times.append(f"{time_call(operation, node, repeat=1) * 1000:>14.1f}")
+            except RecursionError:
+                times.append(f"{'递归溢出':>14}")
+        print(f"{label:<22} " + " ".join(times))
+    
+    # 按对象身份记忆化只合并同一对象；按结构记忆化连结构相同的不同对象也只处理一次
+    print()
+    print(f"{'表达式':<22} {'节点数':>10} {'身份记忆(ms)':>14} {'结构记忆(ms)':>14} {'不同子树':>10}")
+    count = lambda node, results: 1 + sum(results)
+    for label, node in workloads[1:]:
+        size = fold(node, count)
+        by_identity = time_call(fold, node, count, repeat=1)
+        memo = {}
+        by_structure = time_call(lambda: fold(node, count, memo=memo), repeat=1)
+        print(f"{label:<22} {size:>10} {by_identity * 1000:>14.1f} {by_structure * 1000:>14.1f} {len(memo):>10}")
+
+
+if __name__ == "__main__":
+    main()
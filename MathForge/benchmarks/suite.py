@@ -0,0 +1,323 @@
+"""
+核心入口的基准测试套件
+用固定种子生成的表达式语料（随机多项式、深层三角复合、长和式、高阶导数），
+对 parse、simplify、diff、integrate、solve、rewrite、to_latex 和 eval 在不同规模下计时，
+并在全新的解释器进程中测量冷启动（导入包、第一次请求）的耗时；结果写成 JSON，并与保存的基线比较以发现热点路径的性能回退
+
+用法:
+    python benchmarks/suite.py                      # 运行并与基线比较
+    python benchmarks/suite.py --output result.json # 同时保存本次结果
+    python benchmarks/suite.py --save-baseline      # 把本次结果保存为新的基线
+"""
+
+import sys
+import os
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from mathforge_core import parse, simplify, diff, integrate, solve, rewrite, to_latex, Symbol
+from mathforge_core.ast import STR_CACHE, children
+from mathforge_core.latex import LATEX_CACHE
+from mathforge_core import integration
+
+
+SEED = 20240601
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'suite_baseline.json')
+
+# 最短耗时与中位数都超过基线的这个倍数（且绝对差超过 MIN_DELTA_MS）才算回退
+DEFAULT_THRESHOLD = 2.0
+MIN_DELTA_MS = 0.05
+
+EVAL_POINT = {'x': 0.37}
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
+
+# 冷启动计时：每项在新的解释器里执行，只计 import 语句之后的部分（不含解释器自身启动）
+STARTUP_PROBES = [
+    ("import", "import mathforge_core"),
+    ("first-simplify", "import mathforge_core as m\nm.simplify(m.parse('x^2 + 2*x + x + 3'))"),
+    ("first-diff", "import mathforge_core as m\nm.to_latex(m.simplify(m.diff(m.parse('sin(x^2)*exp(x)'), m.Symbol('x'))))"),
+    ("first-solve", "import mathforge_core as m\nm.solve(m.parse('x^2 - 4'), m.Symbol('x'))"),
+]
+STARTUP_TEMPLATE = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+"""
+
+
+def random_polynomial(n_terms: int, rng: random.Random) -> str:
+    """n_terms 个随机整系数单项式之和（次数不超过 8，不合并同类项）"""
+    terms = []
+    for _ in range(n_terms):
+        coefficient = rng.randint(1, 9)
+        degree = rng.randint(0, 8)
+        sign = '-' if rng.random() < 0.4 else '+'
+        terms.append(f"{sign} {coefficient}*x^{degree}")
+    return " ".join(terms).lstrip('+ ')
+
+
+def trig_composition(depth: int, rng: random.Random) -> str:
+    """深度为 depth 的三角/指数函数复合，每层带一个线性项"""
+    text = "x"
+    for _ in range(depth):
+        func = rng.choice(["sin", "cos", "exp"])
+        text = f"{func}({rng.randint(1, 3)}*{text} + {rng.randint(0, 2)})" if func != "exp" \
+            else f"exp({text}/{rng.randint(2, 5)})"
+    return text
+
+
+def long_sum(n_terms: int, rng: random.Random) -> str:
+    """混合幂次、三角函数和对数的长和式"""
+    atoms = ["x^{k}", "sin({k}*x)", "cos(x + {k})", "log(x + {k})", "{k}*x*exp(x)"]
+    return " + ".join(rng.choice(atoms).format(k=rng.randint(1, 9)) for _ in range(n_terms))
+
+
+def derivative_base(order: int, rng: random.Random) -> str:
+    """高阶导数语料的原函数；实际的表达式是它对 x 求 order 阶导数（见 build_node）"""
+    return "sin(x^2 + 1)*exp(x)/(x + 1)"
+
+
+# 语料：(名称, 生成函数, 规模参数列表)
+CORPORA = [
+    ("polynomial", random_polynomial, (10, 100, 1000)),
+    ("trig", trig_composition, (5, 20, 80)),
+    ("sum", long_sum, (10, 100, 1000)),
+    ("derivative", derivative_base, (1, 2, 3)),
+]
+
+# 计时的入口（求导、积分和求解都对 x）
+OPERATIONS = ("parse", "simplify", "diff", "integrate", "solve", "rewrite", "to_latex", "eval")
+
+
+def build_cases(quick: bool = False):
+    """按固定种子生成全部语料，返回 [(名称, 表达式字符串, 求导阶数)]"""
+    cases = []
+    for name, generate, sizes in CORPORA:
+        for size in (sizes[:2] if quick else sizes):
+            rng = random.Random(f"{SEED}-{name}-{size}")
+            order = size if name == "derivative" else 0
+            cases.append((f"{name}-{size}", generate(size, rng), order))
+    return cases
+
+
+def build_node(text: str, order: int):
+    """解析表达式，需要时求 order 阶导数（高阶导数语料）"""
+    x = Symbol('x')
+    node = parse(text)
+    for _ in range(order):
+        node = diff(node, x)
+    return node
+
+
+def count_nodes(node) -> int:
+    count = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        count += 1
+        stack.extend(children(current))
+    return count
+
+
+def reset_caches() -> None:
+    """清空渲染缓存与积分缓存，每次计时都从冷缓存开始"""
+    STR_CACHE.clear()
+    LATEX_CACHE.clear()
+    integration._MEMO.clear()
+
+
+def operation(name: str, text: str, order: int):
+    """
+    返回 (setup, run)：setup 在计时外准备输入（每次都重新构造，节点上的惰性缓存也是冷的），
+    run 执行被计时的入口
+    """
+    x = Symbol('x')
+    if name == "parse":
+        # 高阶导数语料解析的是导数的字符串形式
+        source = str(build_node(text, order)) if order else text
+        return (lambda: source), parse
+    runners = {
+        "simplify": simplify,
+        "diff": lambda node: diff(node, x),
+        "integrate": lambda node: integrate(node, x),
+        "solve": lambda node: solve(node, x),
+        "rewrite": rewrite,
+        "to_latex": to_latex,
+        "eval": lambda node: node.eval(EVAL_POINT),
+    }
+    return (lambda: build_node(text, order)), runners[name]
+
+
+def measure(setup, run, repeat: int, budget: float):
+    """
+    多次冷缓存运行，返回各次耗时（秒）
+    
+    至少运行 repeat 次；单次很快时在 budget 秒内继续补充样本（最多 10*repeat 次）。
+    与 timeit 一样在计时期间关闭垃圾回收，避免回收时机造成的大幅抖动。
+    """
+    times = []
+    spent = 0.0
+    while len(times) < repeat or (spent < budget and len(times) < 10 * repeat):
+        argument = setup()
+        reset_caches()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(argument)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        times.append(elapsed)
+        spent += elapsed
+    return times
+
+
+def measure_startup(code: str, repeat: int):
+    """在 repeat 个新的解释器进程里执行 code，返回各次耗时（秒）"""
+    script = STARTUP_TEMPLATE.format(root=ROOT, code=code)
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True,
+                                text=True, check=True).stdout
+        times.append(float(output.split()[-1]))
+    return times
+
+
+def run_suite(repeat: int = 5, budget: float = 0.2, quick: bool = False):
+    """运行冷启动探针、全部语料与入口，返回 JSON 可序列化的结果"""
+    results = []
+    for name, code in STARTUP_PROBES:
+        times = measure_startup(code, repeat)
+        results.append({"case": "startup", "operation": name, "nodes": 0, "status": "ok",
+                        "runs": len(times), "best_ms": round(min(times) * 1000, 4),
+                        "median_ms": round(statistics.median(times) * 1000, 4)})
+    for case, text, order in build_cases(quick):
+        size = count_nodes(build_node(text, order))
+        for name in OPERATIONS:
+            setup, run = operation(name, text, order)
+            entry = {"case": case, "operation": name, "nodes": size}
+            try:
+                measure(setup, run, 1, 0.0)  # 预热：导入延迟加载的模块、稳定 CPU 频率
+                times = measure(setup, run, repeat, budget)
+            except Exception as error:  # 入口不支持该输入（如找不到原函数）
+                entry.update(status=f"error: {type(error).__name__}")
+            else:
+                entry.update(status="ok", runs=len(times),
+                             best_ms=round(min(times) * 1000, 4),
+                             median_ms=round(statistics.median(times) * 1000, 4))
+            results.append(entry)
+    return {
+        "meta": {
+            "seed": SEED,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold: float):
+    """
+    与基线逐项比较耗时
+    
+    Returns:
+        (比较行列表, 回退项列表)；每行为 (case, operation, 基线ms, 当前ms, 比值)
+    """
+    previous = {(entry["case"], entry["operation"]): entry for entry in baseline["results"]}
+    rows = []
+    regressions = []
+    for entry in current["results"]:
+        old = previous.get((entry["case"], entry["operation"]))
+        if old is None or entry["status"] != "ok" or old["status"] != "ok":
+            row = (entry["case"], entry["operation"], old and old.get("best_ms"), entry.get("best_ms"), None)
+            rows.append(row)
+            if old is not None and old["status"] == "ok" and entry["status"] != "ok":
+                regressions.append(row)  # 基线能运行的入口现在出错
+            continue
+        ratio = entry["best_ms"] / old["best_ms"] if old["best_ms"] > 0 else float('inf')
+        row = (entry["case"], entry["operation"], old["best_ms"], entry["best_ms"], ratio)
+        rows.append(row)
+        # 最短耗时和中位数都变慢才算回退，减少单次抖动造成的误报
+        slower_median = entry["median_ms"] > threshold * old["median_ms"]
+        if ratio > threshold and slower_median and entry["best_ms"] - old["best_ms"] > MIN_DELTA_MS:
+            regressions.append(row)
+    return rows, regressions
+
+
+def print_table(current, rows=None):
+    if rows is None:
+        print(f"{'语料':<16} {'入口':<14} {'节点数':>8} {'最短(ms)':>10} {'中位数(ms)':>11}  状态")
+        for entry in current["results"]:
+            if entry["status"] == "ok":
+                print(f"{entry['case']:<16} {entry['operation']:<14} {entry['nodes']:>8} "
+                      f"{entry['best_ms']:>10.3f} {entry['median_ms']:>11.3f}  ok")
+            else:
+                print(f"{entry['case']:<16} {entry['operation']:<14} {entry['nodes']:>8} "
+                      f"{'-':>10} {'-':>11}  {entry['status']}")
+        return
+    print(f"{'语料':<16} {'入口':<14} {'基线(ms)':>10} {'当前(ms)':>10} {'比值':>8}")
+    for case, name, old, new, ratio in rows:
+        old_text = f"{old:.3f}" if old is not None else "-"
+        new_text = f"{new:.3f}" if new is not None else "-"
+        ratio_text = f"{ratio:.2f}" if ratio is not None else "-"
+        print(f"{case:<16} {name:<14} {old_text:>10} {new_text:>10} {ratio_text:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MathForge 核心入口基准测试套件")
+    parser.add_argument("--output", help="把本次结果写入该 JSON 文件")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线 JSON 文件")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--repeat", type=int, default=5, help="每项至少运行的次数")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="判定回退的耗时比值")
+    parser.add_argument("--quick", action="store_true", help="只运行较小的两档规模")
+    args = parser.parse_args()
+    
+    current = run_suite(repeat=args.repeat, quick=args.quick)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(current, handle, ensure_ascii=False, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(current, handle, ensure_ascii=False, indent=1)
+        print_table(current)
+        print(f"基线已保存到 {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print_table(current)
+        print(f"没有基线文件 {args.baseline}，用 --save-baseline 生成")
+        return 0
+    
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    rows, regressions = compare(current, baseline, args.threshold)
+    print_table(current, rows)
+    if regressions:
+        print(f"\n{len(regressions)} 项比基线慢 {args.threshold} 倍以上或出错:")
+        for case, name, old, new, ratio in regressions:
+            if ratio is None:
+                print(f"  {case} {name}: 出错（基线 {old:.3f} ms）")
+            else:
+                print(f"  {case} {name}: {old:.3f} ms -> {new:.3f} ms ({ratio:.2f}x)")
+        return 1
+    print("\n没有发现性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
 
 from mathforge_core import parse, simplify, diff, integrate, solve, to_latex, Symbol
+from mathforge_core.profiling import Profile
 
 
 def print_help():
@@ -23,6 +24,9 @@ MathForge 符号数学系统 CLI
   integrate <expr> [var] - 积分（默认变量: x）
   solve <expr> [var]   - 求解方程（默认变量: x）
   eval <expr> [var=val] - 数值求值
+  profile <cmd> <expr> [var] [--stacks 文件]
+                       - 剖析 simplify/latex/diff/integrate/solve 命令，
+                         打印热点函数；--stacks 把调用栈写成 flamegraph 折叠格式
   help                 - 显示此帮助
   exit                 - 退出
 
@@ -32,6 +36,7 @@ MathForge 符号数学系统 CLI
   integrate x^2 x
   solve x^2 - 4 x
   eval x^2 + 1 x=2
+  profile diff sin(x^2)*exp(x) x --stacks diff.folded
 """)
 
 
@@ -48,6 +53,46 @@ def parse_eval_args(args):
     return expr, values
 
 
+# 可剖析的命令：命令名 -> (表达式, 变量) 上执行的计算
+PROFILED_COMMANDS = {
+    'simplify': lambda expr, var: simplify(expr),
+    'latex': lambda expr, var: to_latex(simplify(expr)),
+    'diff': lambda expr, var: simplify(diff(expr, var)),
+    'integrate': lambda expr, var: simplify(integrate(expr, var)),
+    'solve': lambda expr, var: solve(expr, var),
+}
+
+
+def run_profile(args):
+    """执行 profile 命令：剖析一次计算并打印热点函数"""
+    stacks_path = None
+    if '--stacks' in args:
+        index = args.index('--stacks')
+        if index + 1 >= len(args):
+            print("错误: --stacks 需要文件名")
+            return
+        stacks_path = args[index + 1]
+        args = args[:index] + args[index + 2:]
+    if len(args) < 2 or args[0] not in PROFILED_COMMANDS:
+        print(f"用法: profile <{'|'.join(PROFILED_COMMANDS)}> <expr> [var] [--stacks 文件]")
+        return
+    
+    cmd, expr_str = args[0], args[1]
+    var = Symbol(args[2] if len(args) > 2 else 'x')
+    with Profile() as prof:
+        result = PROFILED_COMMANDS[cmd](parse(expr_str), var)
+    
+    if isinstance(result, list):
+        print(f"结果: {', '.join(str(s) for s in result)}")
+    else:
+        print(f"结果: {result}")
+    print(prof.report())
+    if stacks_path:
+        with open(stacks_path, 'w', encoding='utf-8') as handle:
+            handle.write(prof.folded())
+        print(f"调用栈已写入 {stacks_path}")
+
+
 def main():
     """主函数"""
     print("MathForge CLI v1.0.0")
@@ -134,6 +179,9 @@ def main():
                 else:
                     print("无解或无法求解")
             
+            elif cmd == "profile":
+                run_profile(args)
+            
             elif cmd == "eval":
                 if not args:
                     print("错误: 需要表达式")
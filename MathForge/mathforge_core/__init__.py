@@ -3,19 +3,62 @@ MathForge 符号数学核心引擎
 纯Python实现的符号数学系统
 """
 
+import importlib
+
 from .ast import (
     Node, Symbol, Number, Add, Mul, Pow, Function,
-    Sin, Cos, Tan, Exp, Log, Sqrt
+    Sin, Cos, Tan, Exp, Log, Sqrt, Atan, sort_key, free_symbols, substitute_many,
+    node_size, node_depth, polynomial_degree, is_polynomial
 )
 from .parser import parse
-from .simplify import simplify
+from .simplify import simplify, PassManager
 from .calculus import diff, integrate
-from .solve import solve
 from .latex import to_latex
 from .rewrite import rewrite
+from .profiling import Profile
+from .traversal import Dispatcher, transform, fold
+
+# 依赖 numpy 的数值模块在第一次访问时才导入，让 import mathforge_core 保持轻量
+_LAZY_EXPORTS = {
+    'solve': 'solve', 'SolveTemplate': 'solve',
+    'compile_function': 'codegen',
+    'solve_linear_system': 'systems',
+    'nsolve': 'nsolve',
+    'groebner': 'groebner',
+    'definite_integral': 'quadrature',
+    'taylor': 'series', 'PowerSeries': 'series',
+    'Interval': 'interval', 'eval_interval': 'interval', 'eval_intervals': 'interval',
+    'adaptive_sample': 'sampling',
+    'equivalent': 'equivalence', 'is_zero': 'equivalence', 'EquivalenceIndex': 'equivalence',
+    'factor': 'factor', 'factor_list': 'factor', 'square_free_decomposition': 'factor',
+    'polynomial_gcd': 'factor', 'cancel': 'factor', 'together': 'factor',
+    'eval_precise': 'precision',
+    'Matrix': 'matrix', 'jacobian': 'matrix',
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
 
 __all__ = [
     'Node', 'Symbol', 'Number', 'Add', 'Mul', 'Pow', 'Function',
-    'Sin', 'Cos', 'Tan', 'Exp', 'Log', 'Sqrt',
-    'parse', 'simplify', 'diff', 'integrate', 'solve', 'to_latex', 'rewrite'
+    'Sin', 'Cos', 'Tan', 'Exp', 'Log', 'Sqrt', 'Atan', 'sort_key', 'free_symbols', 'substitute_many',
+    'node_size', 'node_depth', 'polynomial_degree', 'is_polynomial',
+    'parse', 'simplify', 'diff', 'integrate', 'solve', 'to_latex', 'rewrite',
+    'SolveTemplate', 'compile_function', 'solve_linear_system', 'nsolve',
+    'groebner', 'definite_integral', 'taylor', 'PowerSeries',
+    'Interval', 'eval_interval', 'eval_intervals', 'adaptive_sample', 'PassManager',
+    'Profile', 'Dispatcher', 'transform', 'fold', 'equivalent', 'is_zero', 'EquivalenceIndex',
+    'factor', 'factor_list', 'square_free_decomposition', 'polynomial_gcd', 'cancel', 'together',
+    'eval_precise', 'Matrix', 'jacobian'
 ]
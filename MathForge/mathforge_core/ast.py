@@ -2,16 +2,737 @@
 抽象语法树（AST）节点定义
 """
 
+import math
+import zlib
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, FrozenSet, Sequence, Union
+
+
+# 渲染片段中的加法分隔标记：TERM_SEP 放在项之前，TERM_END 放在项之后
+TERM_SEP = object()
+TERM_END = object()
+
+
+# 子表达式驻留表：结构键 -> 编号。结构相同的子树得到相同编号，
+# 编号缓存在节点的 _intern 属性上（节点构造后视为不可变）
+_INTERN_TABLE: Dict[tuple, int] = {}
+_INTERN_LIMIT = 500000
+_intern_generation = 0
+_INTERN_PINNED: List['Node'] = []  # 以对象身份驻留的未知节点类型，防止 id 被复用
+
+
+# 节点类型 -> 种类，避免对抽象基类反复做 isinstance 检查
+_KINDS: Dict[type, str] = {}
+
+
+def _kind(cls: type) -> str:
+    kind = _KINDS.get(cls)
+    if kind is None:
+        if issubclass(cls, Number):
+            kind = 'number'
+        elif issubclass(cls, Symbol):
+            kind = 'symbol'
+        elif issubclass(cls, Add):
+            kind = 'add'
+        elif issubclass(cls, Mul):
+            kind = 'mul'
+        elif issubclass(cls, Pow):
+            kind = 'pow'
+        elif issubclass(cls, Function):
+            kind = 'function'
+        else:
+            kind = 'other'
+        _KINDS[cls] = kind
+    return kind
+
+
+# 规范全序中各节点种类的先后
+_ORDER_RANKS = {'number': 0, 'symbol': 1, 'pow': 2, 'mul': 3, 'add': 4, 'function': 5, 'other': 6}
+
+
+def _name_hash(name: str) -> int:
+    """与进程无关的名字散列（str 的 hash 每次运行随机化，会让排序结果不确定）"""
+    return zlib.crc32(name.encode('utf-8'))
+
+
+def sort_key(node: 'Node') -> tuple:
+    """
+    节点在规范全序中的键
+    
+    键由节点自身、子节点和孙节点的种类与名字/数值组成，最后以结构散列区分
+    更深处的差异，因此比较的开销有界且与进程无关。Add/Mul 的操作数按此键
+    排列：结构相同的表达式不论构造顺序如何，操作数顺序与输出都相同。
+    乘积的数值系数只作为最后的比较依据，x、2*x、-x 在和中相邻。
+    
+    Args:
+        node: AST节点
+        
+    Returns:
+        可比较的元组
+    """
+    key = getattr(node, '_key', None)
+    if key is None:
+        if _kind(type(node)) == 'other':
+            return (_ORDER_RANKS['other'], type(node).__name__, str(node))
+        _canonicalize(node)
+        key = node._key
+    return key
+
+
+def _leaf(node: 'Node') -> tuple:
+    """节点自身的种类与名字/数值"""
+    kind = _KINDS.get(type(node)) or _kind(type(node))
+    if kind == 'number':
+        return (0, node.value)
+    if kind == 'symbol':
+        return (1, node.name)
+    if kind == 'function':
+        return (5, node.name)
+    if kind == 'other':
+        return (6, type(node).__name__)
+    return (_ORDER_RANKS[kind],)
+
+
+def _structure_hash(node: 'Node') -> int:
+    cached = getattr(node, '_hash', None)
+    if cached is not None:
+        return cached
+    try:
+        return hash(node)
+    except TypeError:
+        return id(node)
+
+
+def _canonicalize(node: 'Node') -> None:
+    """
+    用显式栈为 node 及其尚未处理的子孙节点计算规范形式
+    
+    Add/Mul 在这里才展开嵌套的同类节点并排序操作数（构造时只记录参数），
+    因此逐个构造左结合的长链只在最终被访问的根节点上展开一次；
+    同时计算排序键 _key、截断的结构描述 _head 和结构散列 _hash。
+    """
+    stack = [node]
+    while stack:
+        current = stack[-1]
+        if getattr(current, '_key', None) is not None:
+            stack.pop()
+            continue
+        cls = type(current)
+        kind = _KINDS.get(cls) or _kind(cls)
+        if kind == 'add' or kind == 'mul':
+            items = getattr(current, '_flat', None)
+            if items is None:
+                items = current._flat = _flatten(current, cls)
+        elif kind == 'pow':
+            items = (current.base, current.exponent)
+        elif kind == 'function':
+            items = (current.arg,)
+        else:
+            items = ()
+        pending = [item for item in items
+                   if getattr(item, '_key', None) is None and _kind(type(item)) != 'other']
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        
+        if kind == 'add':
+            items.sort(key=lambda item: (isinstance(item, Number), sort_key(item)))
+        elif kind == 'mul':
+            items.sort(key=sort_key)
+        if kind == 'add' or kind == 'mul':
+            # 排好序后才公开为 terms/factors，外层展开时可直接取用
+            current._items = items
+            del current._flat
+        leaf = _leaf(current)
+        heads = []
+        leaves = []
+        hashes = []
+        for item in items:
+            head = getattr(item, '_head', None)
+            if head is None:
+                # 数字和符号的键就是其 _leaf
+                head = getattr(item, '_key', None) or _leaf(item)
+                leaves.append(head)
+            else:
+                leaves.append(head[:-1])
+            heads.append(head)
+            hashes.append(_structure_hash(item))
+        heads = tuple(heads)
+        current._head = leaf + (tuple(leaves),)
+        name = _name_hash(leaf[1]) if kind == 'function' else 0
+        current._hash = hash((leaf[0], name) + tuple(hashes))
+        if kind == 'mul':
+            current._key = _mul_key(items, heads, current._hash)
+        else:
+            current._key = leaf + (heads, current._hash)
+
+
+def _mul_key(factors: List['Node'], heads: tuple, digest: int) -> tuple:
+    """乘积的键：去掉数值系数后的键，再以系数比较"""
+    count = 0
+    while count < len(factors) and isinstance(factors[count], Number):
+        count += 1
+    if not count or count == len(factors):
+        return (_ORDER_RANKS['mul'], heads, digest)
+    rest = factors[count:]
+    if len(rest) == 1:
+        base = sort_key(rest[0])
+    else:
+        rest_digest = hash((_ORDER_RANKS['mul'], 0) + tuple(_structure_hash(item) for item in rest))
+        base = (_ORDER_RANKS['mul'], heads[count:], rest_digest)
+    return base + (tuple(factor.value for factor in factors[:count]),)
+
+
+def _flatten(node: 'Node', cls: type) -> List['Node']:
+    """展开嵌套的同类节点（显式栈，已规范化的子节点直接取其操作数）"""
+    flat: List[Node] = []
+    stack = list(reversed(node._args))
+    while stack:
+        item = stack.pop()
+        if type(item) is cls:
+            if item._items is not None:
+                flat.extend(item._items)
+            else:
+                stack.extend(reversed(item._args))
+        else:
+            flat.append(item)
+    return flat
+
+
+def children(node: 'Node') -> tuple:
+    """返回节点的直接子节点"""
+    kind = _KINDS.get(type(node)) or _kind(type(node))
+    if kind == 'add':
+        return tuple(node.terms)
+    elif kind == 'mul':
+        return tuple(node.factors)
+    elif kind == 'pow':
+        return (node.base, node.exponent)
+    elif kind == 'function':
+        return (node.arg,)
+    return ()
+
+
+def _equal(a: 'Node', b: 'Node') -> bool:
+    """
+    结构相等（显式栈，不受深度限制）
+    
+    复合节点先比较缓存的结构散列，不同时直接判定不等；相同时再逐个比较子节点
+    （散列可能碰撞）。Add、Mul 的子节点已按规范序排列，按位置比较即可。
+    """
+    stack = [(a, b)]
+    while stack:
+        x, y = stack.pop()
+        if x is y:
+            continue
+        kind = _KINDS.get(type(x)) or _kind(type(x))
+        if kind != (_KINDS.get(type(y)) or _kind(type(y))):
+            return False
+        if kind in ('number', 'symbol', 'other'):
+            if not x == y:
+                return False
+            continue
+        if hash(x) != hash(y):
+            return False
+        if kind == 'function' and x.name != y.name:
+            return False
+        kids_x, kids_y = children(x), children(y)
+        if len(kids_x) != len(kids_y):
+            return False
+        stack.extend(zip(kids_x, kids_y))
+    return True
+
+
+def rebuild(node: 'Node', kids: List['Node']) -> 'Node':
+    """用新的子节点构造同类节点"""
+    kind = _KINDS.get(type(node)) or _kind(type(node))
+    if kind == 'add':
+        return Add(*kids)
+    elif kind == 'mul':
+        return Mul(*kids)
+    elif kind == 'pow':
+        return Pow(*kids)
+    elif kind == 'function':
+        return type(node)(kids[0])
+    return node
+
+
+_NO_SYMBOLS: FrozenSet[str] = frozenset()
+
+
+def free_symbols(node: 'Node') -> FrozenSet[str]:
+    """
+    表达式中出现的符号名集合
+    
+    用显式栈后序计算，结果缓存在各节点的 _free 属性上（节点构造后视为不可变），
+    之后的查询是一次属性读取。未知的节点类型视为不含符号。
+    
+    Args:
+        node: AST节点
+        
+    Returns:
+        符号名的 frozenset
+    """
+    cached = getattr(node, '_free', None)
+    if cached is not None:
+        return cached
+    stack: List[Any] = [node]
+    while stack:
+        current = stack.pop()
+        if current.__class__ is tuple:
+            # 子节点都已计算
+            current, kids = current
+            if len(kids) == 1:
+                current._free = kids[0]._free
+            else:
+                current._free = frozenset().union(*[kid._free for kid in kids])
+            continue
+        if getattr(current, '_free', None) is not None:
+            continue
+        kids = children(current)
+        if kids:
+            stack.append((current, kids))
+            stack.extend(kids)
+        elif (_KINDS.get(type(current)) or _kind(type(current))) == 'symbol':
+            current._free = frozenset((current.name,))
+        else:
+            current._free = _NO_SYMBOLS
+    return node._free
+
+
+def _dependent_order(node: 'Node', names: FrozenSet[str]) -> List[tuple]:
+    """
+    含 names 中符号的节点按后序排列为 [(节点, 子节点, 含这些符号的子节点下标)]，
+    不含这些符号的子树不下探
+    """
+    order: List[tuple] = []
+    seen = set()
+    stack: List[Any] = [node]
+    while stack:
+        current = stack.pop()
+        if current.__class__ is tuple:
+            order.append(current)
+            continue
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        kids = children(current)
+        dependent = [i for i, kid in enumerate(kids) if not free_symbols(kid).isdisjoint(names)]
+        stack.append((current, kids, dependent))
+        stack.extend(kids[i] for i in dependent)
+    return order
+
+
+def _substitute_order(order: List[tuple], substitutions: Dict[str, 'Node']) -> Dict[int, 'Node']:
+    """沿后序的依赖节点代入一组取值，返回 节点 id -> 结果（未改变的节点原样复用）"""
+    done: Dict[int, Node] = {}
+    for current, kids, dependent in order:
+        if not kids:
+            done[id(current)] = substitutions.get(current.name, current) \
+                if isinstance(current, Symbol) else current
+            continue
+        new_kids = None
+        for i in dependent:
+            new = done[id(kids[i])]
+            if new is not kids[i]:
+                if new_kids is None:
+                    new_kids = list(kids)
+                new_kids[i] = new
+        done[id(current)] = current if new_kids is None else rebuild(current, new_kids)
+    return done
+
+
+def substitute(node: 'Node', substitutions: Dict[str, 'Node']) -> 'Node':
+    """
+    把符号替换为表达式（显式栈，结构共享）
+    
+    不含被替换符号的子树（由 free_symbols 判断）原样返回、不再下探，
+    只重建从被替换的符号到根的路径；没有任何符号被替换时返回 node 本身。
+    
+    Args:
+        node: AST节点
+        substitutions: 符号名 -> 替换成的节点
+        
+    Returns:
+        替换后的节点
+    """
+    names = frozenset(substitutions)
+    if free_symbols(node).isdisjoint(names):
+        return node
+    order = _dependent_order(node, names)
+    return _substitute_order(order, substitutions)[id(node)]
+
+
+def substitute_many(node: 'Node', value_sets: Sequence[Dict[str, Union['Node', float]]]) -> List['Node']:
+    """
+    把多组取值分别代入同一表达式（参数扫描）
+    
+    依赖被替换符号的节点只查找、排序一次，之后每组取值只沿这条路径重建，
+    不含这些符号的子树在全部结果之间共享，不会为每组取值复制整棵树。
+    
+    Args:
+        node: AST节点
+        value_sets: 每组为 符号名 -> 节点或数值（数值转换为 Number）
+        
+    Returns:
+        与 value_sets 一一对应的替换结果
+        
+    Examples:
+        >>> substitute_many(parse("a*x^2 + sin(y)"), [{'a': 1}, {'a': 2}, {'a': 3}])
+    """
+    names = frozenset().union(*value_sets) if value_sets else _NO_SYMBOLS
+    if free_symbols(node).isdisjoint(names):
+        return [node for _ in value_sets]
+    order = _dependent_order(node, names)
+    results = []
+    for values in value_sets:
+        substitutions = {name: value if isinstance(value, Node) else Number(value)
+                         for name, value in values.items()}
+        results.append(_substitute_order(order, substitutions)[id(node)])
+    return results
+
+
+def _measure(node: 'Node') -> None:
+    """
+    用显式栈后序计算节点数与深度，缓存在各节点的 _size、_depth 属性上，
+    已缓存的子树不再下探
+    """
+    stack: List[Any] = [node]
+    while stack:
+        current = stack.pop()
+        if current.__class__ is tuple:
+            current, kids = current
+            size, depth = 1, 0
+            for kid in kids:
+                size += kid._size
+                if kid._depth > depth:
+                    depth = kid._depth
+            current._size = size
+            current._depth = depth + 1
+            continue
+        if getattr(current, '_size', None) is not None:
+            continue
+        kids = children(current)
+        if kids:
+            stack.append((current, kids))
+            stack.extend(kids)
+        else:
+            current._size = current._depth = 1
+
+
+def node_size(node: 'Node') -> int:
+    """
+    树的节点数（重复出现的子树按出现次数计），缓存在各节点的 _size 属性上
+    
+    Examples:
+        >>> node_size(parse("x*y + 1"))
+        5
+    """
+    size = getattr(node, '_size', None)
+    if size is None:
+        _measure(node)
+        size = node._size
+    return size
+
+
+def node_depth(node: 'Node') -> int:
+    """
+    树的深度（叶子为 1），缓存在各节点的 _depth 属性上
+    
+    Examples:
+        >>> node_depth(parse("sin(x + 1)"))
+        3
+    """
+    depth = getattr(node, '_depth', None)
+    if depth is None:
+        _measure(node)
+        depth = node._depth
+    return depth
+
+
+# 多项式次数缓存中表示"不是多项式"的值
+_NOT_POLYNOMIAL = -1
+
+# 次数上限，与 polynomial.MAX_DEGREE 一致
+_MAX_DEGREE = 10000
+
+
+def polynomial_degree(node: 'Node', var: 'Symbol') -> Optional[int]:
+    """
+    表达式作为 var 的多项式（系数可含其他符号）的次数
+    
+    按结构计算、不展开，也不考虑相消（x - x 的次数为 1）：不含 var 的子树次数为 0，
+    加法取各项最大值，乘法求和，幂要求指数为非负整数常量。各节点按变量名
+    缓存在 _degrees 属性上，之后的查询是一次字典查找。
+    
+    Args:
+        node: AST节点
+        var: 多项式变量
+        
+    Returns:
+        次数；不是 var 的多项式（如 sin(x)、1/x、x^y）时返回 None
+        
+    Examples:
+        >>> polynomial_degree(parse("a*x^2 + x*y + 1"), Symbol('x'))
+        2
+        >>> polynomial_degree(parse("x + sin(x)"), Symbol('x')) is None
+        True
+    """
+    name = var.name
+    stack = [node]
+    while stack:
+        current = stack[-1]
+        degrees = current.__dict__.get('_degrees')
+        if degrees is None:
+            degrees = current._degrees = {}
+        if name in degrees:
+            stack.pop()
+            continue
+        if name not in free_symbols(current):
+            degrees[name] = 0
+            stack.pop()
+            continue
+        kind = _KINDS.get(type(current)) or _kind(type(current))
+        if kind not in ('add', 'mul', 'pow'):
+            # 含 var 的叶子只能是 var 本身；函数的参数含 var 时不是多项式
+            degrees[name] = 1 if kind == 'symbol' else _NOT_POLYNOMIAL
+            stack.pop()
+            continue
+        kids = children(current)
+        if kind == 'pow':
+            # 只有底数的次数有意义；指数含 var 时不是多项式
+            kids = kids[:1] if name not in free_symbols(kids[1]) else ()
+        pending = [kid for kid in kids if name not in kid.__dict__.get('_degrees', ())]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        degrees[name] = _combine_degree(current, kind, [kid._degrees[name] for kid in kids])
+    degree = node._degrees[name]
+    return None if degree == _NOT_POLYNOMIAL else degree
+
+
+def _combine_degree(node: 'Node', kind: str, degrees: List[int]) -> int:
+    """由（含变量的）子节点次数计算节点的次数"""
+    if not degrees or _NOT_POLYNOMIAL in degrees:
+        return _NOT_POLYNOMIAL
+    if kind == 'add':
+        return max(degrees)
+    if kind == 'mul':
+        return sum(degrees)
+    if isinstance(node.exponent, Number):
+        exponent = node.exponent.value
+        if exponent < 0 or exponent != int(exponent) or degrees[0] * exponent > _MAX_DEGREE:
+            return _NOT_POLYNOMIAL
+        return degrees[0] * int(exponent)
+    return _NOT_POLYNOMIAL
+
+
+def is_polynomial(node: 'Node', var: 'Symbol') -> bool:
+    """表达式是否为 var 的多项式（系数可含其他符号），见 polynomial_degree"""
+    return polynomial_degree(node, var) is not None
+
+
+def intern(node: 'Node') -> int:
+    """
+    返回子表达式的驻留编号（hash-consing）
+    
+    结构相同的表达式（即使是不同对象）得到相同的编号，
+    整棵树的编号用显式栈后序计算，已驻留的子树直接复用。
+    
+    Args:
+        node: AST节点
+        
+    Returns:
+        驻留编号
+    """
+    global _intern_generation
+    if len(_INTERN_TABLE) > _INTERN_LIMIT:
+        _INTERN_TABLE.clear()
+        _INTERN_PINNED.clear()
+        _intern_generation += 1
+    generation = _intern_generation
+    table = _INTERN_TABLE
+    
+    stack: List[Any] = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, tuple):
+            # 子节点都已驻留，计算结构键
+            current, kids = current
+            key: tuple = (type(current),) + tuple([kid._intern[1] for kid in kids])
+        else:
+            cached = getattr(current, '_intern', None)
+            if cached is not None and cached[0] == generation:
+                continue
+            cls = type(current)
+            kind = _KINDS.get(cls) or _kind(cls)
+            if kind == 'number':
+                key = (Number, current.value)
+            elif kind == 'symbol':
+                key = (Symbol, current.name)
+            elif kind == 'other':
+                _INTERN_PINNED.append(current)
+                key = (cls, id(current))
+            else:
+                kids = children(current)
+                stack.append((current, kids))
+                stack.extend(kids)
+                continue
+        current._intern = (generation, table.setdefault(key, len(table)))
+    
+    return node._intern[1]
+
+
+class RenderCache:
+    """
+    渲染结果缓存：驻留编号 -> 渲染字符串
+    
+    按最近最少使用淘汰，缓存字符串的总长度不超过 max_chars。
+    """
+    
+    def __init__(self, max_chars: int = 4000000):
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[int, str]' = OrderedDict()
+        self._chars = 0
+        self._generation = _intern_generation
+    
+    def get(self, key: int) -> Optional[str]:
+        if self._generation != _intern_generation:
+            self.clear()
+        text = self._entries.get(key)
+        if text is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return text
+    
+    def put(self, key: int, text: str) -> None:
+        if len(text) > self.max_chars or key in self._entries:
+            return
+        self._entries[key] = text
+        self._chars += len(text)
+        while self._chars > self.max_chars:
+            _, evicted = self._entries.popitem(last=False)
+            self._chars -= len(evicted)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._chars = 0
+        self._generation = _intern_generation
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _repeated_subtrees(node: 'Node') -> Dict[int, int]:
+    """统计树中每个复合子表达式出现的次数（叶子不计，重复子树只下探一次）"""
+    counts: Dict[int, int] = {}
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        kids = children(current)
+        if not kids:
+            continue
+        key = current._intern[1]
+        seen = counts.get(key, 0)
+        counts[key] = seen + 1
+        if not seen:
+            stack.extend(kids)
+    return counts
+
+
+def render(node: 'Node', expand: Callable[['Node'], List[Any]], plus: str, minus: str,
+           cache: Optional[RenderCache] = None) -> str:
+    """
+    用显式栈把表达式树渲染为字符串
+    
+    每个子树只展开一次，所有片段写入同一个输出缓冲区，
+    因此耗时与节点数成线性关系，且不受递归深度限制。
+    给出 cache 时，根节点和树中重复出现的子表达式按驻留编号缓存，
+    结构相同的子树只渲染一次，之后的渲染直接复用。
+    
+    Args:
+        node: 要渲染的AST节点
+        expand: 返回节点片段列表的函数，片段可以是字符串、子节点或 TERM_SEP/TERM_END
+        plus: 下一项不以 '-' 开头时 TERM_SEP 输出的分隔符
+        minus: 下一项以 '-' 开头时 TERM_SEP 输出的分隔符
+        cache: 可选的渲染缓存
+        
+    Returns:
+        渲染结果
+    """
+    counts: Dict[int, int] = {}
+    if cache is not None:
+        text = cache.get(intern(node))
+        if text is not None:
+            return text
+        counts = _repeated_subtrees(node)
+    
+    out: List[str] = []
+    stack: List[Any] = [node]
+    pending = 0  # 尚未确定的 TERM_SEP 个数
+    
+    def flush(first: str) -> None:
+        # 由内到外决定分隔符：外层看到的是内层分隔符加上后续内容
+        seps = []
+        for _ in range(pending):
+            sep = minus if first.startswith('-') else plus
+            seps.append(sep)
+            first = sep + first
+        out.extend(reversed(seps))
+    
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            if not item:
+                continue
+            if pending:
+                flush(item)
+                pending = 0
+            out.append(item)
+        elif item is TERM_SEP:
+            pending += 1
+        elif item is TERM_END:
+            # 该项为空串，分隔符按非负项处理
+            if pending:
+                flush('')
+                pending = 0
+        elif isinstance(item, tuple):
+            # 子树渲染结束：跳过开始时尚未输出的外层分隔符后写入缓存
+            key, start = item
+            cache.put(key, ''.join(out[start:]))
+        else:
+            if cache is not None:
+                key = item._intern[1]
+                if item is node or counts.get(key, 0) > 1:
+                    text = cache.get(key)
+                    if text is not None:
+                        stack.append(text)
+                        continue
+                    stack.append((key, len(out) + pending))
+            stack.extend(reversed(expand(item)))
+    
+    if pending:
+        flush('')
+    return ''.join(out)
 
 
 class Node(ABC):
     """所有AST节点的基类"""
     
-    @abstractmethod
     def __str__(self) -> str:
         """字符串表示"""
+        return render(self, lambda node: node._str_parts(), '+', '', STR_CACHE)
+    
+    @abstractmethod
+    def _str_parts(self) -> List[Any]:
+        """字符串表示的片段（子节点保留为节点，由 render 展开）"""
         pass
     
     @abstractmethod
@@ -19,16 +740,25 @@ class Node(ABC):
         """相等性比较"""
         pass
     
-    @abstractmethod
     def substitute(self, substitutions: Dict[str, 'Node']) -> 'Node':
-        """替换变量"""
-        pass
+        """替换变量（不含被替换符号的子树原样复用，见 substitute 函数）"""
+        return substitute(self, substitutions)
     
     @abstractmethod
     def eval(self, values: Optional[Dict[str, float]] = None) -> float:
         """数值求值"""
         pass
     
+    def eval_interval(self, values: Optional[Dict[str, Any]] = None) -> Any:
+        """区间求值：values 中的变量可取数值或 (lo, hi)，返回包含全部取值的 Interval"""
+        from .interval import eval_interval
+        return eval_interval(self, values)
+    
+    def eval_precise(self, values: Optional[Dict[str, Any]] = None, precision: int = 30) -> Any:
+        """高精度求值：自动提高工作精度直到结果在 precision 位有效数字内稳定，返回 Decimal"""
+        from .precision import eval_precise
+        return eval_precise(self, values, precision)
+    
     def __add__(self, other):
         if isinstance(other, (int, float)):
             other = Number(other)
@@ -68,20 +798,29 @@ class Node(ABC):
         return Mul(Number(-1), self)
 
 
+# str() 的渲染缓存，跨调用复用
+STR_CACHE = RenderCache()
+
+
 class Symbol(Node):
     """符号变量"""
     
     def __init__(self, name: str):
         self.name = name
+        self._key = (_ORDER_RANKS['symbol'], name)
+        self._hash = _name_hash(name)
     
     def __str__(self) -> str:
         return self.name
     
+    def _str_parts(self) -> List[Any]:
+        return [self.name]
+    
     def __eq__(self, other) -> bool:
         return isinstance(other, Symbol) and self.name == other.name
     
     def __hash__(self):
-        return hash(self.name)
+        return self._hash
     
     def substitute(self, substitutions: Dict[str, Node]) -> Node:
         return substitutions.get(self.name, self)
@@ -97,21 +836,31 @@ class Symbol(Node):
 class Number(Node):
     """数值常量"""
     
+    _free = _NO_SYMBOLS
+    _size = 1
+    _depth = 1
+    
     def __init__(self, value: float):
         self.value = float(value)
+        self._key = (_ORDER_RANKS['number'], self.value)
+        self._hash = hash(self.value)
     
     def __str__(self) -> str:
         if self.value == int(self.value):
             return str(int(self.value))
         return str(self.value)
     
+    def _str_parts(self) -> List[Any]:
+        return [str(self)]
+    
     def __eq__(self, other) -> bool:
+        # 精确比较，与 __hash__（及以它为基础的结构散列）保持一致
         if isinstance(other, (int, float)):
-            return abs(self.value - float(other)) < 1e-10
-        return isinstance(other, Number) and abs(self.value - other.value) < 1e-10
+            return self.value == other
+        return isinstance(other, Number) and self.value == other.value
     
     def __hash__(self):
-        return hash(self.value)
+        return self._hash
     
     def substitute(self, substitutions: Dict[str, Node]) -> Node:
         return self
@@ -121,65 +870,88 @@ class Number(Node):
 
 
 class Add(Node):
-    """加法节点"""
+    """
+    加法节点
+    
+    terms 为展开嵌套加法后按规范序排列的各项（常数项在最后），
+    在第一次访问时计算。
+    """
+    
+    _items: Optional[List[Node]] = None
     
     def __init__(self, *args: Node):
-        self.terms: List[Node] = list(args)
+        self._args = args
     
-    def __str__(self) -> str:
+    @property
+    def terms(self) -> List[Node]:
+        items = self._items
+        if items is None:
+            _canonicalize(self)
+            items = self._items
+        return items
+    
+    def _str_parts(self) -> List[Any]:
         if not self.terms:
-            return "0"
-        result = []
-        for i, term in enumerate(self.terms):
-            term_str = str(term)
-            if i > 0 and not term_str.startswith('-'):
-                result.append('+')
-            result.append(term_str)
-        return ''.join(result)
+            return ["0"]
+        parts: List[Any] = [self.terms[0]]
+        for term in self.terms[1:]:
+            parts.extend((TERM_SEP, term, TERM_END))
+        return parts
     
     def __eq__(self, other) -> bool:
-        if not isinstance(other, Add):
-            return False
-        if len(self.terms) != len(other.terms):
-            return False
-        return set(self.terms) == set(other.terms)
+        # 各项已按规范序排列，逐项比较即可
+        return isinstance(other, Add) and _equal(self, other)
     
-    def substitute(self, substitutions: Dict[str, Node]) -> Node:
-        return Add(*[term.substitute(substitutions) for term in self.terms])
+    def __hash__(self):
+        if getattr(self, '_key', None) is None:
+            _canonicalize(self)
+        return self._hash
     
     def eval(self, values: Optional[Dict[str, float]] = None) -> float:
         return sum(term.eval(values) for term in self.terms)
 
 
 class Mul(Node):
-    """乘法节点"""
+    """
+    乘法节点
+    
+    factors 为展开嵌套乘法后按规范序排列的各因子（数值系数在最前），
+    在第一次访问时计算。
+    """
+    
+    _items: Optional[List[Node]] = None
     
     def __init__(self, *args: Node):
-        self.factors: List[Node] = list(args)
+        self._args = args
     
-    def __str__(self) -> str:
+    @property
+    def factors(self) -> List[Node]:
+        items = self._items
+        if items is None:
+            _canonicalize(self)
+            items = self._items
+        return items
+    
+    def _str_parts(self) -> List[Any]:
         if not self.factors:
-            return "1"
-        result = []
+            return ["1"]
+        parts: List[Any] = []
         for i, factor in enumerate(self.factors):
             if i > 0:
-                result.append('*')
-            factor_str = str(factor)
+                parts.append('*')
             if isinstance(factor, (Add, Pow)) or (isinstance(factor, Function)):
-                result.append(f'({factor_str})')
+                parts.extend(('(', factor, ')'))
             else:
-                result.append(factor_str)
-        return ''.join(result)
+                parts.append(factor)
+        return parts
     
     def __eq__(self, other) -> bool:
-        if not isinstance(other, Mul):
-            return False
-        if len(self.factors) != len(other.factors):
-            return False
-        return set(self.factors) == set(other.factors)
+        return isinstance(other, Mul) and _equal(self, other)
     
-    def substitute(self, substitutions: Dict[str, Node]) -> Node:
-        return Mul(*[factor.substitute(substitutions) for factor in self.factors])
+    def __hash__(self):
+        if getattr(self, '_key', None) is None:
+            _canonicalize(self)
+        return self._hash
     
     def eval(self, values: Optional[Dict[str, float]] = None) -> float:
         result = 1.0
@@ -195,20 +967,18 @@ class Pow(Node):
         self.base = base
         self.exponent = exponent
     
-    def __str__(self) -> str:
-        base_str = str(self.base)
-        exp_str = str(self.exponent)
-        
+    def _str_parts(self) -> List[Any]:
         if isinstance(self.base, (Add, Mul, Pow, Function)):
-            base_str = f'({base_str})'
-        
-        return f'{base_str}^{exp_str}'
+            return ['(', self.base, ')^', self.exponent]
+        return [self.base, '^', self.exponent]
     
     def __eq__(self, other) -> bool:
-        return isinstance(other, Pow) and self.base == other.base and self.exponent == other.exponent
+        return isinstance(other, Pow) and _equal(self, other)
     
-    def substitute(self, substitutions: Dict[str, Node]) -> Node:
-        return Pow(self.base.substitute(substitutions), self.exponent.substitute(substitutions))
+    def __hash__(self):
+        if getattr(self, '_key', None) is None:
+            _canonicalize(self)
+        return self._hash
     
     def eval(self, values: Optional[Dict[str, float]] = None) -> float:
         return self.base.eval(values) ** self.exponent.eval(values)
@@ -221,17 +991,18 @@ class Function(Node):
         self.name = name
         self.arg = arg
     
-    def __str__(self) -> str:
-        arg_str = str(self.arg)
+    def _str_parts(self) -> List[Any]:
         if isinstance(self.arg, (Add, Mul, Pow)):
-            arg_str = f'({arg_str})'
-        return f'{self.name}({arg_str})'
+            return [self.name, '((', self.arg, '))']
+        return [self.name, '(', self.arg, ')']
     
     def __eq__(self, other) -> bool:
-        return isinstance(other, Function) and self.name == other.name and self.arg == other.arg
+        return isinstance(other, Function) and _equal(self, other)
     
-    def substitute(self, substitutions: Dict[str, Node]) -> Node:
-        return type(self)(self.arg.substitute(substitutions))
+    def __hash__(self):
+        if getattr(self, '_key', None) is None:
+            _canonicalize(self)
+        return self._hash
     
     def eval(self, values: Optional[Dict[str, float]] = None) -> float:
         return self._eval_func(self.arg.eval(values))
@@ -249,7 +1020,6 @@ class Sin(Function):
         super().__init__('sin', arg)
     
     def _eval_func(self, x: float) -> float:
-        import math
         return math.sin(x)
 
 
@@ -260,7 +1030,6 @@ class Cos(Function):
         super().__init__('cos', arg)
     
     def _eval_func(self, x: float) -> float:
-        import math
         return math.cos(x)
 
 
@@ -271,7 +1040,6 @@ class Tan(Function):
         super().__init__('tan', arg)
     
     def _eval_func(self, x: float) -> float:
-        import math
         return math.tan(x)
 
 
@@ -282,7 +1050,6 @@ class Exp(Function):
         super().__init__('exp', arg)
     
     def _eval_func(self, x: float) -> float:
-        import math
         return math.exp(x)
 
 
@@ -293,7 +1060,6 @@ class Log(Function):
         super().__init__('log', arg)
     
     def _eval_func(self, x: float) -> float:
-        import math
         return math.log(x)
 
 
@@ -304,5 +1070,14 @@ class Sqrt(Function):
         super().__init__('sqrt', arg)
     
     def _eval_func(self, x: float) -> float:
-        import math
         return math.sqrt(x)
+
+
+class Atan(Function):
+    """反正切函数"""
+    
+    def __init__(self, arg: Node):
+        super().__init__('atan', arg)
+    
+    def _eval_func(self, x: float) -> float:
+        return math.atan(x)
@@ -2,113 +2,156 @@
 微积分模块：符号求导和积分
 """
 
-from .ast import Node, Number, Symbol, Add, Mul, Pow, Function, Sin, Cos, Tan, Exp, Log, Sqrt
+from typing import Any, Dict, List, Optional
 
+from .ast import Node, Number, Symbol, Add, Mul, Pow, Sin, Cos, Tan, Exp, Log, Sqrt, Atan
+from .traversal import Dispatcher, fold
 
-def diff(node: Node, var: Symbol) -> Node:
+
+def diff(node: Node, var: Symbol, memo: Optional[Dict[Any, Node]] = None) -> Node:
     """
     对表达式求导
     
+    按节点类型在 DIFF_RULES 中分派，自底向上（显式栈）计算：每条规则拿到
+    子节点的导数，不受递归深度限制，共享的子树只求一次导数。
+    
     Args:
         node: 要求导的AST节点
         var: 对哪个变量求导
+        memo: 可选的跨调用缓存（见 traversal.fold），对同一变量求多个表达式的
+            导数时，结构相同的子树只求一次导数
         
     Returns:
         导数表达式
     """
-    if isinstance(node, Number):
-        return Number(0)
-    
-    elif isinstance(node, Symbol):
-        if node == var:
-            return Number(1)
-        else:
-            return Number(0)
-    
-    elif isinstance(node, Add):
-        return Add(*[diff(term, var) for term in node.terms])
-    
-    elif isinstance(node, Mul):
-        # 乘积法则: (f*g)' = f'*g + f*g'
-        if len(node.factors) == 2:
-            f, g = node.factors
-            return Add(
-                Mul(diff(f, var), g),
-                Mul(f, diff(g, var))
-            )
-        else:
-            # 多个因子的乘积法则
-            result = Number(0)
-            for i in range(len(node.factors)):
-                terms = list(node.factors)
-                terms[i] = diff(terms[i], var)
-                result = Add(result, Mul(*terms))
-            return result
-    
-    elif isinstance(node, Pow):
-        base = node.base
-        exponent = node.exponent
-        
-        # 如果指数是常数
-        if isinstance(exponent, Number):
-            # (x^n)' = n*x^(n-1)
-            if isinstance(base, Symbol) and base == var:
-                if exponent.value == 1:
-                    return Number(1)
-                new_exp = Number(exponent.value - 1)
-                if abs(new_exp.value) < 1e-10:
-                    return Number(1)
-                return Mul(exponent, Pow(base, new_exp))
-            else:
-                # (f^n)' = n*f^(n-1)*f'
-                new_exp = Number(exponent.value - 1)
-                if abs(new_exp.value) < 1e-10:
-                    return Mul(exponent, diff(base, var))
-                return Mul(exponent, Mul(Pow(base, new_exp), diff(base, var)))
-        else:
-            # 一般情况: (f^g)' = f^g * (g*ln(f))'
-            # 简化处理：假设指数不依赖变量
-            if isinstance(exponent, Number):
-                return diff(Pow(base, exponent), var)
-            else:
-                # 复杂情况，简化处理
-                return Mul(node, Add(
-                    Mul(diff(exponent, var), Log(base)),
-                    Mul(exponent, Mul(Pow(base, Number(-1)), diff(base, var)))
-                ))
-    
-    elif isinstance(node, Sin):
-        # (sin(f))' = cos(f) * f'
-        return Mul(Cos(node.arg), diff(node.arg, var))
-    
-    elif isinstance(node, Cos):
-        # (cos(f))' = -sin(f) * f'
-        return Mul(Number(-1), Mul(Sin(node.arg), diff(node.arg, var)))
-    
-    elif isinstance(node, Tan):
-        # (tan(f))' = sec^2(f) * f' = (1 + tan^2(f)) * f'
-        return Mul(Add(Number(1), Pow(Tan(node.arg), Number(2))), diff(node.arg, var))
-    
-    elif isinstance(node, Exp):
-        # (e^f)' = e^f * f'
-        return Mul(Exp(node.arg), diff(node.arg, var))
-    
-    elif isinstance(node, Log):
-        # (ln(f))' = f' / f
-        return Mul(diff(node.arg, var), Pow(node.arg, Number(-1)))
-    
-    elif isinstance(node, Sqrt):
-        # (sqrt(f))' = f' / (2*sqrt(f))
-        return Mul(diff(node.arg, var), Mul(Number(0.5), Pow(node.arg, Number(-0.5))))
-    
-    else:
-        # 未知函数，返回未化简的导数形式
-        return node
+    return fold(node, DIFF_RULES, var, memo=memo)
+
+
+# 叶子的导数（节点不可变，所有导数共用这两个常数节点）
+_ZERO = Number(0)
+_ONE = Number(1)
+
+
+def _diff_number(node: Number, derivatives: List[Node], var: Symbol) -> Node:
+    return _ZERO
+
+
+def _diff_symbol(node: Symbol, derivatives: List[Node], var: Symbol) -> Node:
+    return _ONE if node.name == var.name else _ZERO
+
+
+def _diff_add(node: Add, derivatives: List[Node], var: Symbol) -> Node:
+    return Add(*derivatives)
+
+
+def _diff_mul(node: Mul, derivatives: List[Node], var: Symbol) -> Node:
+    # 乘积法则: (f*g)' = f'*g + f*g'
+    factors = node.factors
+    if len(factors) == 2:
+        f, g = factors
+        return Add(Mul(derivatives[0], g), Mul(f, derivatives[1]))
+    # 多个因子的乘积法则（数值因子的导数为0，对应项省略）
+    result = Number(0)
+    for i in range(len(factors)):
+        if isinstance(factors[i], Number):
+            continue
+        terms = list(factors)
+        terms[i] = derivatives[i]
+        result = Add(result, Mul(*terms))
+    return result
+
+
+def _diff_pow(node: Pow, derivatives: List[Node], var: Symbol) -> Node:
+    base = node.base
+    exponent = node.exponent
+    base_derivative, exponent_derivative = derivatives
+    
+    # 如果指数是常数
+    if isinstance(exponent, Number):
+        # (x^n)' = n*x^(n-1)
+        if isinstance(base, Symbol) and base == var:
+            if exponent.value == 1:
+                return Number(1)
+            new_exp = Number(exponent.value - 1)
+            if abs(new_exp.value) < 1e-10:
+                return Number(1)
+            return Mul(exponent, Pow(base, new_exp))
+        # (f^n)' = n*f^(n-1)*f'
+        new_exp = Number(exponent.value - 1)
+        if abs(new_exp.value) < 1e-10:
+            return Mul(exponent, base_derivative)
+        return Mul(exponent, Mul(Pow(base, new_exp), base_derivative))
+    
+    # 一般情况: (f^g)' = f^g * (g'*ln(f) + g*f'/f)
+    return Mul(node, Add(
+        Mul(exponent_derivative, Log(base)),
+        Mul(exponent, Mul(Pow(base, Number(-1)), base_derivative))
+    ))
+
+
+def _diff_sin(node: Sin, derivatives: List[Node], var: Symbol) -> Node:
+    # (sin(f))' = cos(f) * f'
+    return Mul(Cos(node.arg), derivatives[0])
+
+
+def _diff_cos(node: Cos, derivatives: List[Node], var: Symbol) -> Node:
+    # (cos(f))' = -sin(f) * f'
+    return Mul(Number(-1), Mul(Sin(node.arg), derivatives[0]))
+
+
+def _diff_tan(node: Tan, derivatives: List[Node], var: Symbol) -> Node:
+    # (tan(f))' = sec^2(f) * f' = (1 + tan^2(f)) * f'
+    return Mul(Add(Number(1), Pow(Tan(node.arg), Number(2))), derivatives[0])
+
+
+def _diff_exp(node: Exp, derivatives: List[Node], var: Symbol) -> Node:
+    # (e^f)' = e^f * f'
+    return Mul(Exp(node.arg), derivatives[0])
+
+
+def _diff_log(node: Log, derivatives: List[Node], var: Symbol) -> Node:
+    # (ln(f))' = f' / f
+    return Mul(derivatives[0], Pow(node.arg, Number(-1)))
+
+
+def _diff_sqrt(node: Sqrt, derivatives: List[Node], var: Symbol) -> Node:
+    # (sqrt(f))' = f' / (2*sqrt(f))
+    return Mul(derivatives[0], Mul(Number(0.5), Pow(node.arg, Number(-0.5))))
+
+
+def _diff_atan(node: Atan, derivatives: List[Node], var: Symbol) -> Node:
+    # (atan(f))' = f' / (1 + f^2)
+    return Mul(derivatives[0], Pow(Add(Number(1), Pow(node.arg, Number(2))), Number(-1)))
+
+
+def _diff_unknown(node: Node, derivatives: List[Node], var: Symbol) -> Node:
+    # 未知函数，返回未化简的导数形式
+    return node
+
+
+# 求导规则表：节点类型 -> 规则(节点, 子节点的导数, 变量)
+DIFF_RULES = Dispatcher({
+    Number: _diff_number,
+    Symbol: _diff_symbol,
+    Add: _diff_add,
+    Mul: _diff_mul,
+    Pow: _diff_pow,
+    Sin: _diff_sin,
+    Cos: _diff_cos,
+    Tan: _diff_tan,
+    Exp: _diff_exp,
+    Log: _diff_log,
+    Sqrt: _diff_sqrt,
+    Atan: _diff_atan,
+}, default=_diff_unknown)
 
 
 def integrate(node: Node, var: Symbol) -> Node:
     """
-    对表达式积分（基础多项式积分）
+    对表达式求不定积分（省略积分常数）
+    
+    支持基本初等函数（含线性换元）、多项式与有理函数（部分分式）、
+    分部积分可解的乘积，规则表见 integration 模块。
     
     Args:
         node: 要积分的AST节点
@@ -116,61 +159,13 @@ def integrate(node: Node, var: Symbol) -> Node:
         
     Returns:
         积分表达式
-    """
-    from .simplify import simplify
-    
-    # 常数积分
-    if isinstance(node, Number):
-        return Mul(node, var)
-    
-    # 变量积分
-    if isinstance(node, Symbol):
-        if node == var:
-            return Mul(Number(0.5), Pow(var, Number(2)))
-        else:
-            return Mul(node, var)
-    
-    # 加法积分
-    if isinstance(node, Add):
-        return Add(*[integrate(term, var) for term in node.terms])
-    
-    # 常数乘以函数
-    if isinstance(node, Mul):
-        # 检查是否有常数因子
-        constants = [f for f in node.factors if isinstance(f, Number)]
-        non_constants = [f for f in node.factors if not isinstance(f, Number)]
         
-        if constants:
-            const_value = 1.0
-            for c in constants:
-                const_value *= c.value
-            if non_constants:
-                return Mul(Number(const_value), integrate(Mul(*non_constants), var))
-            else:
-                return Mul(Number(const_value), var)
-    
-    # 幂次积分: x^n -> x^(n+1)/(n+1)
-    if isinstance(node, Pow):
-        if node.base == var and isinstance(node.exponent, Number):
-            exp_val = node.exponent.value
-            if abs(exp_val + 1) < 1e-10:
-                # 1/x 的积分是 ln(x)
-                return Log(var)
-            new_exp = Number(exp_val + 1)
-            return Mul(Pow(var, new_exp), Pow(new_exp, Number(-1)))
-    
-    # 简单函数积分
-    if isinstance(node, Sin):
-        if node.arg == var:
-            return Mul(Number(-1), Cos(var))
-    
-    if isinstance(node, Cos):
-        if node.arg == var:
-            return Sin(var)
-    
-    if isinstance(node, Exp):
-        if node.arg == var:
-            return Exp(var)
+    Raises:
+        ValueError: 找不到原函数
+    """
+    from .integration import antiderivative
     
-    # 无法积分的情况，返回原表达式（实际应用中应抛出异常）
-    return simplify(node)
+    result = antiderivative(node, var)
+    if result is None:
+        raise ValueError(f"无法求出 {node} 关于 {var} 的原函数")
+    return result
@@ -0,0 +1,150 @@
+"""
+表达式编译模块
+把AST编译为Python函数，支持标量（math）和向量化（numpy）两种后端
+"""
+
+import math
+from typing import Any, Callable, Dict, List, Sequence
+
+from .ast import Node, Number, Symbol, Add, Mul, Pow, Function, children, intern
+
+try:
+    import numpy as np
+except ImportError:  # numpy 可选，仅 numpy 后端需要
+    np = None
+
+
+# 函数名 -> 各后端中的实现名
+_FUNCTION_NAMES = {
+    'sin': 'sin',
+    'cos': 'cos',
+    'tan': 'tan',
+    'exp': 'exp',
+    'log': 'log',
+    'sqrt': 'sqrt',
+    'atan': 'atan',
+}
+
+# numpy 中名称不同的函数
+_NUMPY_NAMES = {
+    'atan': 'arctan',
+}
+
+
+def compile_function(node: Node, args: Sequence[str], backend: str = 'math') -> Callable:
+    """
+    把表达式编译为按位置接收变量值的Python函数
+    
+    生成的函数体为每个不同的子表达式一条赋值语句（结构相同的子树只计算一次），
+    没有嵌套，因此不受表达式深度限制。
+    
+    Args:
+        node: AST节点
+        args: 参数名（符号名）列表，决定生成函数的参数顺序
+        backend: 'math'（标量浮点）或 'numpy'（数组逐元素计算）
+        
+    Returns:
+        可调用对象 f(*values)
+        
+    Examples:
+        >>> f = compile_function(parse("x^2 + y"), ['x', 'y'])
+        >>> f(3.0, 1.0)
+        10.0
+    """
+    if backend == 'numpy':
+        if np is None:
+            raise ImportError("numpy 后端需要安装 numpy")
+        module: Any = np
+    elif backend == 'math':
+        module = math
+    else:
+        raise ValueError(f"未知的编译后端: {backend}")
+    
+    params = [f'_a{i}' for i in range(len(args))]
+    arg_index = {name: i for i, name in enumerate(args)}
+    namespace: Dict[str, Any] = {}
+    lines: List[str] = []
+    names: Dict[int, str] = {}  # 驻留编号 -> 临时变量名
+    
+    intern(node)
+    stack = [(node, False)]
+    while stack:
+        current, ready = stack.pop()
+        key = current._intern[1]
+        if key in names:
+            continue
+        kids = children(current)
+        if kids and not ready:
+            stack.append((current, True))
+            stack.extend((kid, False) for kid in kids if kid._intern[1] not in names)
+            continue
+        
+        expr = _statement(current, [names[kid._intern[1]] for kid in kids],
+                          arg_index, namespace, module, backend)
+        name = f't{len(names)}'
+        names[key] = name
+        lines.append(f'    {name} = {expr}')
+    
+    source = f"def _compiled({', '.join(params)}):\n" + '\n'.join(lines) + f"\n    return {names[node._intern[1]]}\n"
+    exec(compile(source, '<mathforge>', 'exec'), namespace)
+    function = namespace['_compiled']
+    function.source = source
+    return function
+
+
+def batched(function: Callable) -> Callable:
+    """
+    包装 numpy 后端编译出的函数，供整批求值使用
+    
+    浮点异常不告警；复数结果中虚部非零的元素记为 nan；常数表达式的结果
+    广播为与输入相同的形状。
+    
+    Args:
+        function: compile_function(..., backend='numpy') 的返回值（单个参数）
+        
+    Returns:
+        f(x)，x 为 numpy 数组，返回同形状的浮点数组
+    """
+    def evaluate(x):
+        with np.errstate(all='ignore'):
+            y = function(x)
+        y = np.asarray(y)
+        if np.iscomplexobj(y):
+            y = np.where(y.imag == 0, y.real, np.nan)
+        return np.broadcast_to(y.astype(float), np.shape(x))
+    return evaluate
+
+
+def _statement(node: Node, operands: List[str], arg_index: Dict[str, int],
+               namespace: Dict[str, Any], module: Any, backend: str) -> str:
+    """单个节点对应的表达式（子节点已赋给临时变量）"""
+    if isinstance(node, Number):
+        return repr(node.value)
+    
+    elif isinstance(node, Symbol):
+        if node.name not in arg_index:
+            raise ValueError(f"变量 {node.name} 不在参数列表中")
+        return f'_a{arg_index[node.name]}'
+    
+    elif isinstance(node, Add):
+        return ' + '.join(operands) if operands else '0.0'
+    
+    elif isinstance(node, Mul):
+        return ' * '.join(operands) if operands else '1.0'
+    
+    elif isinstance(node, Pow):
+        return f'{operands[0]} ** {operands[1]}'
+    
+    elif isinstance(node, Function):
+        func_name = _FUNCTION_NAMES.get(node.name)
+        if backend == 'numpy':
+            func_name = _NUMPY_NAMES.get(node.name, func_name)
+        impl = getattr(module, func_name, None) if func_name else None
+        if impl is None:
+            # 未知函数：标量后端直接调用节点自身的求值实现
+            impl = node._eval_func if backend == 'math' else np.vectorize(node._eval_func)
+        alias = f'_{node.name}_{id(impl)}'
+        namespace[alias] = impl
+        return f'{alias}({operands[0]})'
+    
+    raise ValueError(f"无法编译的节点类型: {type(node).__name__}")
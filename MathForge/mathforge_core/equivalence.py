@@ -0,0 +1,374 @@
+"""
+概率性的表达式等价判定
+在随机点上对两个表达式求值比较，代替化简后的结构比较：
+整数常数的有理表达式在两个素数域中精确求值，误判概率由 Schwartz–Zippel 引理给出上界；
+含函数或非整数常数时用编译的浮点求值器在随机实数点上按相对误差比较。
+EquivalenceIndex 按数值指纹分桶，把等价的表达式归并为同一个代表节点
+"""
+
+import math
+import random
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .ast import Node, Number, Symbol, Add, Mul, Pow, Function, free_symbols
+from .codegen import compile_function
+from .traversal import Dispatcher, fold
+
+
+# 有限域模数（梅森素数 2^61 - 1）
+PRIME = (1 << 61) - 1
+
+# 确认用的第二个模数：整数常数按模约化，差式的系数恰好都是 PRIME 的倍数时
+# （如 2^61 与 1），只在 GF(PRIME) 中比较会误判，须在两个域中都相等才判为等价
+SECOND_PRIME = (1 << 62) - 57
+
+# 默认置信度：判为等价而实际不等价的概率不超过 1 - DEFAULT_CONFIDENCE（有限域模式）
+DEFAULT_CONFIDENCE = 1 - 1e-12
+
+# 浮点模式的相对容差、随机点的取值范围和每个取值点最多的重新抽样次数
+FLOAT_RTOL = 1e-10
+SAMPLE_RANGE = (-2.0, 2.0)
+MAX_RESAMPLES = 20
+
+# 浮点模式至少比较的点数
+MIN_FLOAT_POINTS = 4
+
+
+def equivalent(a: Node, b: Node, confidence: float = DEFAULT_CONFIDENCE,
+               seed: Optional[int] = None) -> bool:
+    """
+    判断两个表达式是否（以高概率）恒等
+    
+    结构相同时直接返回 True。两者都只由整数常数（不限大小）、符号、加、乘和整数次幂
+    构成时，依次在素数域 GF(PRIME) 与 GF(SECOND_PRIME) 的随机点上精确求值：
+    不恒等时每个点误判的概率不超过 次数上界 / PRIME，取足够多的点使误判概率
+    不超过 1 - confidence。否则在 SAMPLE_RANGE 内的随机实数点上用编译的浮点函数
+    求值，按 FLOAT_RTOL 比较相对误差（两侧接近零时相对于求值中各项的量级）；
+    此时 confidence 只决定比较的点数，结果是启发式的。只在一侧有定义的点
+    （如 x < 0 时的 log(x^2) 与 2*log(x)）视为不相等，两侧都无定义的点重新抽样。
+    
+    Args:
+        a, b: 要比较的表达式
+        confidence: 置信度，0 < confidence < 1
+        seed: 随机数种子，None 时每次调用随机选点
+        
+    Returns:
+        判为恒等时返回 True
+        
+    Raises:
+        ValueError: confidence 不在 (0, 1) 内
+        
+    Examples:
+        >>> equivalent(parse("(x + 1)^2"), parse("x^2 + 2*x + 1"))
+        True
+        >>> equivalent(parse("sin(x)^2"), parse("1 - cos(x)^2"))
+        True
+        >>> equivalent(parse("sqrt(x^2)"), parse("x"))
+        False
+        >>> equivalent(parse("x + 0.000000001"), parse("x"))
+        False
+    """
+    if not 0 < confidence < 1:
+        raise ValueError(f"置信度必须在 (0, 1) 内: {confidence}")
+    if a == b:
+        return True
+    rng = random.Random(seed)
+    names = sorted(free_symbols(a) | free_symbols(b))
+    if fold(a, _FIELD_EXACT) and fold(b, _FIELD_EXACT):
+        bound = fold(a, _DEGREE_BOUND) + fold(b, _DEGREE_BOUND)
+        if bound < PRIME // 2:
+            return all(_field_equal(a, b, names, bound, confidence, rng, modulus)
+                       for modulus in (PRIME, SECOND_PRIME))
+    return _float_equal(a, b, names, confidence, rng)
+
+
+def is_zero(node: Node, confidence: float = DEFAULT_CONFIDENCE, seed: Optional[int] = None) -> bool:
+    """
+    判断表达式是否（以高概率）恒为零，即 equivalent(node, 0)
+    
+    Examples:
+        >>> is_zero(parse("(x - y)*(x + y) - x^2 + y^2"))
+        True
+    """
+    return equivalent(node, Number(0), confidence, seed)
+
+
+# ---------- 有限域模式 ----------
+
+def _field_equal(a: Node, b: Node, names: List[str], bound: int,
+                 confidence: float, rng: random.Random, modulus: int) -> bool:
+    """在 GF(modulus) 的随机点上比较；不恒等时每个点相等的概率不超过 bound / modulus"""
+    # a - b 化为通分后的分子，次数不超过 bound；分母在点上为零时重新抽样
+    per_point = max(bound, 1) / modulus
+    points = max(1, math.ceil(math.log(1 - confidence) / math.log(per_point)))
+    compared = 0
+    attempts = 0
+    while compared < points:
+        attempts += 1
+        if attempts > points * MAX_RESAMPLES:
+            return False
+        point = {name: rng.randrange(modulus) for name in names}
+        try:
+            value_a = fold(a, _FIELD_VALUE, point, modulus)
+            value_b = fold(b, _FIELD_VALUE, point, modulus)
+        except ZeroDivisionError:
+            continue
+        if value_a != value_b:
+            return False
+        compared += 1
+    return True
+
+
+def _field_pow(node: Pow, results: List[int], point: Dict[str, int], modulus: int) -> int:
+    exponent = int(node.exponent.value)
+    if exponent < 0 and results[0] == 0:
+        raise ZeroDivisionError("有限域中零没有逆元")
+    return pow(results[0], exponent, modulus)
+
+
+def _field_mul(node: Mul, results: List[int], point: Dict[str, int], modulus: int) -> int:
+    product = 1
+    for value in results:
+        product = product * value % modulus
+    return product
+
+
+# 素数域中的求值（子节点结果已按模约化）
+_FIELD_VALUE = Dispatcher({
+    Number: lambda node, results, point, modulus: int(node.value) % modulus,
+    Symbol: lambda node, results, point, modulus: point[node.name],
+    Add: lambda node, results, point, modulus: sum(results) % modulus,
+    Mul: _field_mul,
+    Pow: _field_pow,
+})
+
+
+def _is_integer(value: float) -> bool:
+    return math.isfinite(value) and value == int(value)
+
+
+def _field_exact_pow(node: Pow, results: List[bool]) -> bool:
+    return results[0] and isinstance(node.exponent, Number) and _is_integer(node.exponent.value)
+
+
+# 能否在素数域中精确求值：只含整数常数、符号、加、乘和整数常量次幂
+_FIELD_EXACT = Dispatcher({
+    Number: lambda node, results: _is_integer(node.value),
+    Symbol: lambda node, results: True,
+    Add: lambda node, results: all(results),
+    Mul: lambda node, results: all(results),
+    Pow: _field_exact_pow,
+}, default=lambda node, results: False)
+
+
+# 有理函数分子、分母次数的上界（通分时次数相加，因此加法也取和）
+_DEGREE_BOUND = Dispatcher({
+    Number: lambda node, results: 0,
+    Symbol: lambda node, results: 1,
+    Add: lambda node, results: sum(results),
+    Mul: lambda node, results: sum(results),
+    Pow: lambda node, results: results[0] * abs(int(node.exponent.value)),
+})
+
+
+# ---------- 浮点模式 ----------
+
+def _float_equal(a: Node, b: Node, names: List[str], confidence: float,
+                 rng: random.Random) -> bool:
+    """在随机实数点上用编译的求值器比较"""
+    points = max(MIN_FLOAT_POINTS, math.ceil(-math.log10(1 - confidence)))
+    compared = 0
+    attempts = 0
+    while compared < points:
+        attempts += 1
+        if attempts > points * MAX_RESAMPLES:
+            # 几乎处处无定义，无法确认
+            return False
+        point = {name: rng.uniform(*SAMPLE_RANGE) for name in names}
+        value_a = _real_value(a, point)
+        value_b = _real_value(b, point)
+        if value_a is None and value_b is None:
+            continue
+        if value_a is None or value_b is None or not _close(a, b, value_a, value_b, point):
+            return False
+        compared += 1
+    return True
+
+
+def _evaluator(node: Node) -> Tuple[List[str], Callable]:
+    """
+    节点的编译求值器 (参数名, 函数)，参数为节点自身的符号（按名字排序），
+    编译一次后缓存在节点的 _evaluator 属性上
+    """
+    cached = getattr(node, '_evaluator', None)
+    if cached is None:
+        names = sorted(free_symbols(node))
+        cached = node._evaluator = (names, compile_function(node, names))
+    return cached
+
+
+def _real_value(node: Node, point: Dict[str, float]) -> Optional[float]:
+    """表达式在点上的实数值；无定义、溢出或得到复数时返回 None"""
+    names, function = _evaluator(node)
+    try:
+        value = function(*[point[name] for name in names])
+    except (ArithmeticError, ValueError):
+        return None
+    if isinstance(value, complex) or not math.isfinite(value):
+        return None
+    return value
+
+
+def _close(a: Node, b: Node, x: float, y: float, point: Dict[str, float]) -> bool:
+    """
+    按相对误差比较两个值；不满足时（如 sin(x)^2 + cos(x)^2 - 1 的舍入残差与 0），
+    改为相对于两侧求值中各项的量级比较，量级只在这时遍历求得
+    """
+    difference = abs(x - y)
+    if difference <= FLOAT_RTOL * max(abs(x), abs(y)):
+        return True
+    try:
+        scale = max(fold(a, _FLOAT_MAGNITUDE, point)[1], fold(b, _FLOAT_MAGNITUDE, point)[1])
+    except (ArithmeticError, ValueError, TypeError):
+        return False
+    return math.isfinite(scale) and difference <= FLOAT_RTOL * scale
+
+
+def _magnitude_pow(node: Pow, results: List[Tuple[float, float]],
+                   point: Dict[str, float]) -> Tuple[float, float]:
+    (base, base_scale), (exponent, _) = results
+    value = base ** exponent
+    if isinstance(exponent, complex) or exponent <= 0:
+        return value, abs(value)
+    return value, max(abs(value), base_scale ** exponent)
+
+
+def _magnitude_mul(node: Mul, results: List[Tuple[float, float]],
+                   point: Dict[str, float]) -> Tuple[float, float]:
+    value, scale = 1.0, 1.0
+    for item, item_scale in results:
+        value *= item
+        scale *= item_scale
+    return value, scale
+
+
+def _magnitude_function(node: Function, results: List[Tuple[float, float]],
+                        point: Dict[str, float]) -> Tuple[float, float]:
+    value = node._eval_func(results[0][0])
+    return value, abs(value)
+
+
+# 单点浮点求值，同时给出 (值, 量级)：加法的量级是各项量级之和，
+# 差式抵消后只剩舍入残差时，残差与量级之比仍在 FLOAT_RTOL 以内
+_FLOAT_MAGNITUDE = Dispatcher({
+    Number: lambda node, results, point: (node.value, abs(node.value)),
+    Symbol: lambda node, results, point: (point[node.name], abs(point[node.name])),
+    Add: lambda node, results, point: (math.fsum(value for value, _ in results),
+                                       sum(scale for _, scale in results)),
+    Mul: _magnitude_mul,
+    Pow: _magnitude_pow,
+    Function: _magnitude_function,
+})
+
+
+# ---------- 按等价归并 ----------
+
+# 指纹保留的有效数字位数：浮点误差不应改变舍入结果（落在舍入边界时只会漏掉归并）
+_FINGERPRINT_DIGITS = 6
+
+
+class EquivalenceIndex:
+    """
+    等价表达式的归并表
+    
+    每个表达式在一个固定点（由符号名确定）上求值得到数值指纹，指纹相同的
+    表达式再用 equivalent 确认；canonical 对等价的表达式总是返回第一次登记的
+    节点，缓存中等价的结果因此共享同一个对象（及其渲染缓存和元数据）。
+    exact_only 时只归并能在素数域中精确比较的表达式，不依赖浮点模式的启发式判定。
+    
+    Examples:
+        >>> index = EquivalenceIndex()
+        >>> first = index.canonical(parse("x^2 + 2*x + 1"))
+        >>> index.canonical(parse("(x + 1)^2")) is first
+        True
+    """
+    
+    def __init__(self, confidence: float = DEFAULT_CONFIDENCE, max_entries: int = 20000,
+                 exact_only: bool = False):
+        """
+        Args:
+            confidence: 确认等价时使用的置信度
+            max_entries: 登记的代表节点数上限，超出时清空
+            exact_only: 为 True 时不登记含函数或非整数常数的表达式
+        """
+        self.confidence = confidence
+        self.max_entries = max_entries
+        self.exact_only = exact_only
+        self.merged = 0
+        self._buckets: Dict[tuple, List[Node]] = {}
+        self._size = 0
+    
+    def canonical(self, node: Node) -> Node:
+        """
+        返回已登记的与 node 等价的节点；没有时登记 node 并返回它本身
+        
+        在固定点上无定义的表达式（exact_only 时还有不能精确比较的表达式）不登记，原样返回
+        """
+        if self.exact_only and not fold(node, _FIELD_EXACT):
+            return node
+        key = _fingerprint(node)
+        if key is None:
+            return node
+        bucket = self._buckets.setdefault(key, [])
+        for candidate in bucket:
+            if candidate is node or equivalent(candidate, node, self.confidence, seed=0):
+                if candidate is not node:
+                    self.merged += 1
+                return candidate
+        if self._size >= self.max_entries:
+            self.clear()
+            bucket = self._buckets.setdefault(key, [])
+        bucket.append(node)
+        self._size += 1
+        return node
+    
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+
+
+def _fingerprint(node: Node) -> Optional[tuple]:
+    """(符号集合, 固定点上的值按有效数字舍入)；无定义时返回 None"""
+    # 固定点取在 (0.5, 1.5) 内，避开常见的定义域边界；只求一个点，直接遍历求值而不编译
+    names = free_symbols(node)
+    point = {name: 0.5 + (zlib.crc32(name.encode()) % 10007) / 10007 for name in names}
+    try:
+        value = fold(node, _FLOAT_VALUE, point)
+    except (ArithmeticError, ValueError, TypeError):
+        return None
+    if isinstance(value, complex) or not math.isfinite(value):
+        return None
+    rounded = float(f'{value:.{_FINGERPRINT_DIGITS}g}') if value else 0.0
+    return (names, rounded)
+
+
+def _float_mul(node: Mul, results: List[float], point: Dict[str, float]) -> float:
+    product = 1.0
+    for value in results:
+        product *= value
+    return product
+
+
+# 单点浮点求值（未知函数用节点自身的求值实现）
+_FLOAT_VALUE = Dispatcher({
+    Number: lambda node, results, point: node.value,
+    Symbol: lambda node, results, point: point[node.name],
+    Add: lambda node, results, point: math.fsum(results),
+    Mul: _float_mul,
+    Pow: lambda node, results, point: results[0] ** results[1],
+    Function: lambda node, results, point: node._eval_func(results[0]),
+})
@@ -0,0 +1,1070 @@
+"""
+多项式最大公因式、因式分解与有理式约分
+表达式中的符号和不能展开的子式（函数、非整数次幂）作为生成元，整数系数的
+多元多项式用稀疏字典 {指数元组: 系数} 表示（与 groebner 模块相同）。
+最大公因式用启发式 GCD（在整数点求值、递归求 GCD 后插值还原），失败时退回
+本原伪余式序列；无平方分解用 Yun 算法；完全分解对单变量多项式用 Zassenhaus
+算法（模 p 分解、Hensel 提升、组合试除），多变量多项式先按各变量提取容度，
+再经 Kronecker 代换化为单变量分解后组合试除
+"""
+
+import math
+import random
+from fractions import Fraction
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .ast import Node, Number, Add, Mul, Pow, children, intern, sort_key, _kind
+from .groebner import Monomial, Polynomial, _poly_mul
+from .systems import _to_fraction
+
+
+# 有理式展开后允许的最高总次数，防止 (x + 1)^1000 / (x + 1)^999 之类的输入展开过大
+MAX_DEGREE = 200
+
+# Kronecker 代换后单变量像（去掉 t 的幂之后）的次数上限，以及组合试除的候选因式数上限；
+# 超出时多变量的无平方因式不再分解
+MAX_KRONECKER_DEGREE = 120
+MAX_RECOMBINE_FACTORS = 12
+
+# 启发式 GCD 的求值点尝试次数
+HEU_GCD_ATTEMPTS = 6
+
+
+class _HeuristicGCDFailed(Exception):
+    """启发式 GCD 在尝试次数内没有找到结果"""
+
+
+class _TooLarge(Exception):
+    """展开后的次数超过 MAX_DEGREE"""
+
+
+def polynomial_gcd(a: Node, b: Node) -> Node:
+    """
+    两个多项式的最大公因式（系数可为有理数，变量为表达式中的符号和不能展开的子式）
+    
+    Args:
+        a, b: 多项式表达式
+        
+    Returns:
+        整数系数、系数互素且首项（字典序）系数为正的最大公因式；两者都为零时返回 0
+        
+    Raises:
+        ValueError: 表达式不是多项式（含非常数的分母）或展开后次数过高
+        
+    Examples:
+        >>> polynomial_gcd(parse("x^2 - y^2"), parse("x^2 + 2*x*y + y^2"))
+        x + y
+    """
+    generators = _generators([a, b])
+    pa, pb = (_integer_polynomial(node, generators) for node in (a, b))
+    if not pa and not pb:
+        return Number(0)
+    return _to_node(_primitive(_gcd(pa, pb)), generators)
+
+
+def square_free_decomposition(node: Node) -> Tuple[float, List[Tuple[Node, int]]]:
+    """
+    有理式的无平方分解：node = 系数 * prod(因式^重数)
+    
+    各因式无重因式、两两互素，整数系数互素且首项系数为正；分母的因式重数为负。
+    
+    Returns:
+        (系数, [(因式, 重数)])，因式按重数、再按规范序排列
+        
+    Examples:
+        >>> square_free_decomposition(parse("2*x^3 + 4*x^2 + 2*x"))
+        (2.0, [(x, 1), (x + 1, 2)])
+    """
+    return _decompose(node, lambda poly: _square_free(poly))
+
+
+def factor_list(node: Node) -> Tuple[float, List[Tuple[Node, int]]]:
+    """
+    有理式在整数上的分解：node = 系数 * prod(因式^重数)
+    
+    分母的因式重数为负。因式一般在整数上不可约；例外是多变量的无平方因式经
+    Kronecker 代换后次数超过 MAX_KRONECKER_DEGREE，或候选因式多于
+    MAX_RECOMBINE_FACTORS 时不再分解，这样的因式只保证无平方，可能仍可约。
+    
+    Returns:
+        (系数, [(因式, 重数)])，因式按重数、再按规范序排列
+        
+    Examples:
+        >>> factor_list(parse("x^4 - 1"))
+        (1.0, [(x - 1, 1), (x + 1, 1), (x^2 + 1, 1)])
+    """
+    return _decompose(node, _factor_polynomial)
+
+
+def factor(node: Node) -> Node:
+    """
+    因式分解，结果为各因式幂的乘积（因式的不可约性见 factor_list）
+    
+    Examples:
+        >>> factor(parse("x^3 - x^2*y - x*y^2 + y^3"))
+        (x - y)^2*(x + y)
+    """
+    coefficient, factors = factor_list(node)
+    items: List[Node] = [] if coefficient == 1 and factors else [Number(coefficient)]
+    for item, multiplicity in factors:
+        items.append(item if multiplicity == 1 else Pow(item, Number(multiplicity)))
+    return items[0] if len(items) == 1 else Mul(*items)
+
+
+def cancel(node: Node) -> Node:
+    """
+    把有理式化为约去公因式的 p/q（p、q 展开，q 的系数互素且首项系数为正）
+    
+    函数参数等不能展开的子式作为整体处理，内部不变。展开后次数超过
+    MAX_DEGREE 或分母为零时原样返回。
+    
+    Examples:
+        >>> cancel(parse("(x^2 - 1)/(x - 1)"))
+        x + 1
+        >>> cancel(parse("1/(x - 1) - 1/(x + 1)"))
+        2/(x^2 - 1)
+    """
+    return _fraction(node, reduce=True)
+
+
+def together(node: Node) -> Node:
+    """
+    通分：把和式中的分式合并为一个 p/q（分母取最小公倍式，不约去分子分母的公因式）
+    
+    Examples:
+        >>> together(parse("1/x + 1/y"))
+        (x + y)/(x*y)
+    """
+    return _fraction(node, reduce=False)
+
+
+# ---------- 表达式与多项式的转换 ----------
+
+def _is_atom(node: Node) -> bool:
+    """不能展开为多项式运算的节点（符号、函数、非整数常量次幂、inf/nan 等）"""
+    kind = _kind(type(node))
+    if kind == 'number':
+        return not math.isfinite(node.value)
+    if kind in ('add', 'mul'):
+        return False
+    if kind == 'pow':
+        exponent = node.exponent
+        return not (isinstance(exponent, Number) and exponent.value == int(exponent.value))
+    return True
+
+
+def _generators(nodes: Sequence[Node]) -> List[Node]:
+    """表达式中的生成元（按结构去重，按规范序排列）"""
+    found: Dict[int, Node] = {}
+    seen = set()
+    stack = list(nodes)
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if _is_atom(current):
+            found.setdefault(intern(current), current)
+        else:
+            stack.extend(children(current))
+    return sorted(found.values(), key=sort_key)
+
+
+def _rational(node: Node, generators: List[Node],
+              memo: Optional[Dict[int, Tuple[Polynomial, Polynomial]]] = None) -> Tuple[Polynomial, Polynomial]:
+    """
+    表达式化为 (分子, 分母) 两个整数系数多项式（显式栈后序）
+    
+    加法的分母取最小公倍式；乘法和乘幂不约分。给出 memo（按节点 id）时
+    多个表达式共享的子树只转换一次，调用者须保证 generators 不变且节点存活。
+    
+    Raises:
+        ZeroDivisionError: 分母为零
+        _TooLarge: 展开后次数超过 MAX_DEGREE
+    """
+    n = len(generators)
+    zero: Monomial = (0,) * n
+    one: Polynomial = {zero: 1}
+    index = {intern(item): i for i, item in enumerate(generators)}
+    done: Dict[int, Tuple[Polynomial, Polynomial]] = {} if memo is None else memo
+    stack: List[object] = [node]
+    while stack:
+        current = stack.pop()
+        if current.__class__ is tuple:
+            current, kids = current
+            parts = [done[id(kid)] for kid in kids]
+        else:
+            if id(current) in done:
+                continue
+            if _is_atom(current):
+                monomial = [0] * n
+                monomial[index[intern(current)]] = 1
+                done[id(current)] = ({tuple(monomial): 1}, one)
+                continue
+            kids = children(current)
+            if kids:
+                stack.append((current, kids))
+                stack.extend(kids)
+                continue
+            parts = []
+        kind = _kind(type(current))
+        if kind == 'number':
+            value = _to_fraction(current.value)
+            result = ({zero: value.numerator} if value else {}, {zero: value.denominator})
+        elif kind == 'add':
+            result = parts[0]
+            for part in parts[1:]:
+                result = _add_fractions(result, part)
+        elif kind == 'mul':
+            numerator, denominator = one, one
+            for num, den in parts:
+                numerator = _poly_mul(numerator, num, None)
+                denominator = _poly_mul(denominator, den, None)
+            result = (numerator, denominator)
+        else:
+            exponent = int(current.exponent.value)
+            num, den = parts[0]
+            if exponent < 0:
+                if not num:
+                    raise ZeroDivisionError("分母为零")
+                num, den, exponent = den, num, -exponent
+            if exponent * max(_total_degree(num), _total_degree(den)) > MAX_DEGREE:
+                raise _TooLarge()
+            result = (_power(num, exponent, zero), _power(den, exponent, zero))
+        if max(_total_degree(result[0]), _total_degree(result[1])) > MAX_DEGREE:
+            raise _TooLarge()
+        done[id(current)] = result
+    return done[id(node)]
+
+
+def _add_fractions(a: Tuple[Polynomial, Polynomial],
+                   b: Tuple[Polynomial, Polynomial]) -> Tuple[Polynomial, Polynomial]:
+    """a + b，分母取最小公倍式"""
+    (na, da), (nb, db) = a, b
+    if da == db:
+        return _add(na, nb), da
+    common = _gcd(da, db)
+    ca, cb = _exact_div(db, common), _exact_div(da, common)
+    return _add(_poly_mul(na, ca, None), _poly_mul(nb, cb, None)), _poly_mul(da, ca, None)
+
+
+def _integer_polynomial(node: Node, generators: List[Node]) -> Polynomial:
+    """多项式表达式化为整数系数多项式（有理系数乘以公分母）"""
+    try:
+        numerator, denominator = _rational(node, generators)
+    except _TooLarge:
+        raise ValueError(f"展开后次数超过 {MAX_DEGREE}: {node}")
+    except ZeroDivisionError:
+        raise ValueError(f"分母为零: {node}")
+    if not _is_constant(denominator):
+        raise ValueError(f"表达式不是多项式: {node}")
+    return numerator
+
+
+def _to_node(poly: Polynomial, generators: List[Node], scale: Fraction = Fraction(1)) -> Node:
+    """整数系数多项式（乘以 scale）转为表达式"""
+    terms: List[Node] = []
+    for monomial, coefficient in poly.items():
+        factors: List[Node] = []
+        for item, e in zip(generators, monomial):
+            if e == 1:
+                factors.append(item)
+            elif e > 1:
+                factors.append(Pow(item, Number(e)))
+        value = coefficient * scale
+        if value != 1 or not factors:
+            factors.insert(0, Number(float(value)))
+        terms.append(factors[0] if len(factors) == 1 else Mul(*factors))
+    if not terms:
+        return Number(0)
+    return terms[0] if len(terms) == 1 else Add(*terms)
+
+
+def _fraction(node: Node, reduce: bool) -> Node:
+    """cancel / together 的实现"""
+    generators = _generators([node])
+    try:
+        numerator, denominator = _rational(node, generators)
+    except (_TooLarge, ZeroDivisionError):
+        return node
+    return _quotient_node(numerator, denominator, generators, reduce)
+
+
+def _quotient_node(numerator: Polynomial, denominator: Polynomial, generators: List[Node],
+                   reduce: bool = True) -> Node:
+    """numerator / denominator 转为表达式（reduce 时先约去最大公因式）"""
+    if reduce and numerator:
+        common = _gcd(numerator, denominator)
+        if not _is_constant(common):
+            numerator = _exact_div(numerator, common)
+            denominator = _exact_div(denominator, common)
+    if not numerator:
+        return Number(0)
+    
+    # 分母化为本原且首项系数为正，常数比例并入分子的系数
+    den_content = _signed_content(denominator)
+    num_content = _content(numerator)
+    scale = Fraction(num_content, den_content)
+    numerator = _divide_integer(numerator, num_content)
+    denominator = _divide_integer(denominator, den_content)
+    
+    if _is_constant(denominator):
+        return _to_node(numerator, generators, scale)
+    top = _to_node(numerator, generators, scale)
+    if len(denominator) == 1:
+        # 单项式分母直接写成负指数
+        (monomial, _), = denominator.items()
+        factors = [top] if top != Number(1) else []
+        for item, e in zip(generators, monomial):
+            if e:
+                factors.append(Pow(item, Number(-e)))
+        return factors[0] if len(factors) == 1 else Mul(*factors)
+    bottom = Pow(_to_node(denominator, generators), Number(-1))
+    return bottom if top == Number(1) else Mul(top, bottom)
+
+
+def _decompose(node: Node, split) -> Tuple[float, List[Tuple[Node, int]]]:
+    """分别分解 cancel 后的分子与分母（分母的重数取负）"""
+    generators = _generators([node])
+    try:
+        numerator, denominator = _rational(node, generators)
+    except _TooLarge:
+        raise ValueError(f"展开后次数超过 {MAX_DEGREE}: {node}")
+    except ZeroDivisionError:
+        raise ValueError(f"分母为零: {node}")
+    if not numerator:
+        return 0.0, []
+    common = _gcd(numerator, denominator)
+    numerator = _exact_div(numerator, common)
+    denominator = _exact_div(denominator, common)
+    
+    num_coefficient, num_factors = split(numerator)
+    den_coefficient, den_factors = split(denominator)
+    factors = [(_to_node(f, generators), k) for f, k in num_factors]
+    factors += [(_to_node(f, generators), -k) for f, k in den_factors]
+    factors.sort(key=lambda item: (item[1], sort_key(item[0])))
+    return float(Fraction(num_coefficient, den_coefficient)), factors
+
+
+# ---------- 整数系数多元多项式的基本运算 ----------
+
+def _zero_monomial(poly: Polynomial) -> Monomial:
+    return (0,) * len(next(iter(poly)))
+
+
+def _is_constant(poly: Polynomial) -> bool:
+    return all(not any(m) for m in poly)
+
+
+def _total_degree(poly: Polynomial) -> int:
+    return max((sum(m) for m in poly), default=0)
+
+
+def _add(p: Polynomial, q: Polynomial, factor: int = 1) -> Polynomial:
+    """p + factor * q"""
+    result = dict(p)
+    for m, c in q.items():
+        value = result.get(m, 0) + factor * c
+        if value:
+            result[m] = value
+        else:
+            result.pop(m, None)
+    return result
+
+
+def _power(poly: Polynomial, n: int, zero: Monomial) -> Polynomial:
+    result: Polynomial = {zero: 1}
+    while n:
+        if n & 1:
+            result = _poly_mul(result, poly, None)
+        n >>= 1
+        if n:
+            poly = _poly_mul(poly, poly, None)
+    return result
+
+
+def _content(poly: Polynomial) -> int:
+    """系数的最大公约数（非负）"""
+    g = 0
+    for c in poly.values():
+        g = math.gcd(g, c)
+        if g == 1:
+            break
+    return g
+
+
+def _signed_content(poly: Polynomial) -> int:
+    """带首项系数符号的容度，除以它后首项（字典序最大的单项式）系数为正"""
+    g = _content(poly)
+    return -g if poly[max(poly)] < 0 else g
+
+
+def _divide_integer(poly: Polynomial, c: int) -> Polynomial:
+    return poly if c == 1 else {m: v // c for m, v in poly.items()}
+
+
+def _primitive(poly: Polynomial) -> Polynomial:
+    """本原部分：除以容度，首项系数为正"""
+    return _divide_integer(poly, _signed_content(poly)) if poly else poly
+
+
+def _exact_div(p: Polynomial, q: Polynomial) -> Optional[Polynomial]:
+    """p / q（按字典序做多元除法）；不能整除时返回 None"""
+    if not p:
+        return {}
+    lead = max(q)
+    lead_coefficient = q[lead]
+    if len(q) == 1:
+        quotient = {}
+        for m, c in p.items():
+            shifted = tuple(a - b for a, b in zip(m, lead))
+            if any(e < 0 for e in shifted) or c % lead_coefficient:
+                return None
+            quotient[shifted] = c // lead_coefficient
+        return quotient
+    quotient: Polynomial = {}
+    remainder = dict(p)
+    while remainder:
+        m = max(remainder)
+        shift = tuple(a - b for a, b in zip(m, lead))
+        if any(e < 0 for e in shift):
+            return None
+        c, r = divmod(remainder[m], lead_coefficient)
+        if r:
+            return None
+        quotient[shift] = c
+        for n, d in q.items():
+            mm = tuple(a + b for a, b in zip(n, shift))
+            value = remainder.get(mm, 0) - c * d
+            if value:
+                remainder[mm] = value
+            else:
+                del remainder[mm]
+    return quotient
+
+
+def _degree_in(poly: Polynomial, v: int) -> int:
+    return max((m[v] for m in poly), default=0)
+
+
+def _coefficients_in(poly: Polynomial, v: int) -> Dict[int, Polynomial]:
+    """按变量 v 的次数分组：{次数: 系数多项式（v 的指数置零）}"""
+    groups: Dict[int, Polynomial] = {}
+    for m, c in poly.items():
+        e = m[v]
+        groups.setdefault(e, {})[m[:v] + (0,) + m[v + 1:]] = c
+    return groups
+
+
+def _derivative(poly: Polynomial, v: int) -> Polynomial:
+    result: Polynomial = {}
+    for m, c in poly.items():
+        e = m[v]
+        if e:
+            result[m[:v] + (e - 1,) + m[v + 1:]] = c * e
+    return result
+
+
+def _variables(*polys: Polynomial) -> List[int]:
+    """多项式中出现的变量下标"""
+    present = set()
+    for poly in polys:
+        for m in poly:
+            present.update(i for i, e in enumerate(m) if e)
+    return sorted(present)
+
+
+# ---------- 最大公因式 ----------
+
+def _gcd(f: Polynomial, g: Polynomial) -> Polynomial:
+    """
+    整数系数多项式的最大公因式（本原部分首项系数为正，乘以两者容度的公约数）
+    
+    先用启发式 GCD，失败时退回本原伪余式序列
+    """
+    if not f:
+        return _normalize(g)
+    if not g:
+        return _normalize(f)
+    if f == g:
+        return _normalize(f)
+    variables = _variables(f, g)
+    try:
+        return _heu_gcd(f, g, variables)
+    except _HeuristicGCDFailed:
+        return _prs_gcd(f, g, variables)
+
+
+def _normalize(poly: Polynomial) -> Polynomial:
+    """首项系数为正"""
+    if poly and poly[max(poly)] < 0:
+        return {m: -c for m, c in poly.items()}
+    return poly
+
+
+def _heu_gcd(f: Polynomial, g: Polynomial, variables: List[int]) -> Polynomial:
+    """
+    启发式 GCD：把最后一个变量取为整数 ξ，递归求剩余变量的 GCD，
+    再把结果的整数系数按 ξ 进制（对称余数）展开还原该变量，能整除 f、g 时即为所求
+    """
+    zero = _zero_monomial(f)
+    if not variables:
+        return {zero: math.gcd(f.get(zero, 0), g.get(zero, 0))}
+    cf, cg = _content(f), _content(g)
+    common = math.gcd(cf, cg)
+    f, g = _divide_integer(f, cf), _divide_integer(g, cg)
+    
+    v = variables[-1]
+    norm_f = max(abs(c) for c in f.values())
+    norm_g = max(abs(c) for c in g.values())
+    bound = 2 * min(norm_f, norm_g) + 29
+    xi = max(min(bound, 99 * math.isqrt(bound)),
+             2 * min(norm_f // abs(f[max(f)]), norm_g // abs(g[max(g)])) + 2)
+    for _ in range(HEU_GCD_ATTEMPTS):
+        ff, gg = _evaluate(f, v, xi), _evaluate(g, v, xi)
+        if ff and gg:
+            h = _primitive(_interpolate(_heu_gcd(ff, gg, _variables(ff, gg)), v, xi))
+            if h and _exact_div(f, h) is not None and _exact_div(g, h) is not None:
+                return {m: c * common for m, c in h.items()}
+        xi = 73794 * xi * math.isqrt(math.isqrt(xi)) // 27011
+    raise _HeuristicGCDFailed()
+
+
+def _evaluate(poly: Polynomial, v: int, value: int) -> Polynomial:
+    """变量 v 取整数值"""
+    result: Polynomial = {}
+    for m, c in poly.items():
+        key = m[:v] + (0,) + m[v + 1:]
+        total = result.get(key, 0) + c * value ** m[v]
+        if total:
+            result[key] = total
+        else:
+            result.pop(key, None)
+    return result
+
+
+def _interpolate(poly: Polynomial, v: int, xi: int) -> Polynomial:
+    """把系数按 ξ 进制（对称余数）展开为变量 v 的各次系数"""
+    result: Polynomial = {}
+    e = 0
+    half = xi // 2
+    while poly:
+        rest: Polynomial = {}
+        for m, c in poly.items():
+            digit = c % xi
+            if digit > half:
+                digit -= xi
+            if digit:
+                result[m[:v] + (e,) + m[v + 1:]] = digit
+            quotient = (c - digit) // xi
+            if quotient:
+                rest[m] = quotient
+        poly = rest
+        e += 1
+    return result
+
+
+def _prs_gcd(f: Polynomial, g: Polynomial, variables: List[int]) -> Polynomial:
+    """本原伪余式序列：按第一个变量做欧几里得算法，系数（其余变量的多项式）的 GCD 用 _gcd"""
+    if not f:
+        return _normalize(g)
+    if not g:
+        return _normalize(f)
+    if not variables:
+        zero = _zero_monomial(f)
+        return {zero: math.gcd(f.get(zero, 0), g.get(zero, 0))}
+    v = variables[0]
+    cf, cg = _content_in(f, v), _content_in(g, v)
+    common = _gcd(cf, cg)
+    f, g = _exact_div(f, cf), _exact_div(g, cg)
+    if _degree_in(f, v) < _degree_in(g, v):
+        f, g = g, f
+    while g:
+        remainder = _pseudo_remainder(f, g, v)
+        f, g = g, (_primitive_in(remainder, v) if remainder else {})
+    return _normalize(_poly_mul(common, _primitive_in(f, v), None))
+
+
+def _content_in(poly: Polynomial, v: int) -> Polynomial:
+    """关于变量 v 的容度：各次系数的最大公因式"""
+    result: Polynomial = {}
+    for coefficient in _coefficients_in(poly, v).values():
+        result = _gcd(result, coefficient)
+        if _is_constant(result) and _content(result) == 1:
+            break
+    return result
+
+
+def _primitive_in(poly: Polynomial, v: int) -> Polynomial:
+    return _exact_div(poly, _content_in(poly, v))
+
+
+def _pseudo_remainder(f: Polynomial, g: Polynomial, v: int) -> Polynomial:
+    """f 对 g 关于变量 v 的伪余式"""
+    dg = _degree_in(g, v)
+    lead_g = _coefficients_in(g, v)[dg]
+    remainder = f
+    while remainder and _degree_in(remainder, v) >= dg:
+        dr = _degree_in(remainder, v)
+        lead_r = _coefficients_in(remainder, v)[dr]
+        shift = {m[:v] + (m[v] + dr - dg,) + m[v + 1:]: c for m, c in lead_r.items()}
+        remainder = _add(_poly_mul(lead_g, remainder, None), _poly_mul(shift, g, None), -1)
+    return remainder
+
+
+# ---------- 无平方分解 ----------
+
+def _square_free(poly: Polynomial) -> Tuple[int, List[Tuple[Polynomial, int]]]:
+    """整数系数多项式的无平方分解 (系数, [(因式, 重数)])"""
+    content = _signed_content(poly)
+    parts = _square_free_parts(_divide_integer(poly, content))
+    return content, parts
+
+
+def _square_free_parts(poly: Polynomial) -> List[Tuple[Polynomial, int]]:
+    """本原多项式的无平方分解：先提取第一个变量的容度（递归分解），再对本原部分用 Yun 算法"""
+    variables = _variables(poly)
+    if not variables:
+        return []
+    v = variables[0]
+    content = _content_in(poly, v)
+    result = _square_free_parts(_primitive(content)) if not _is_constant(content) else []
+    poly = _exact_div(poly, content)
+    
+    derivative = _derivative(poly, v)
+    a = _gcd(poly, derivative)
+    b = _exact_div(poly, a)
+    c = _exact_div(derivative, a)
+    d = _add(c, _derivative(b, v), -1)
+    k = 1
+    while not _is_constant(b):
+        a = _gcd(b, d)
+        b = _exact_div(b, a)
+        c = _exact_div(d, a)
+        d = _add(c, _derivative(b, v), -1)
+        if not _is_constant(a):
+            result.append((_primitive(a), k))
+        k += 1
+    return result
+
+
+# ---------- 完全分解 ----------
+
+def _factor_polynomial(poly: Polynomial) -> Tuple[int, List[Tuple[Polynomial, int]]]:
+    """整数系数多项式的完全分解 (系数, [(不可约因式, 重数)])"""
+    content, parts = _square_free(poly)
+    factors = []
+    for part, k in parts:
+        factors.extend((item, k) for item in _factor_square_free(part))
+    # 各因式首项系数为正，整体符号由首项系数确定
+    lead = 1
+    for item, k in factors:
+        lead *= item[max(item)] ** k
+    sign = 1 if poly[max(poly)] * lead > 0 else -1
+    return sign * abs(content), factors
+
+
+def _factor_square_free(poly: Polynomial) -> List[Polynomial]:
+    """本原、无平方多项式的不可约因式"""
+    variables = _variables(poly)
+    if not variables:
+        return []
+    if len(variables) == 1:
+        v = variables[0]
+        zero = _zero_monomial(poly)
+        dense = [0] * (_degree_in(poly, v) + 1)
+        for m, c in poly.items():
+            dense[m[v]] = c
+        factors = _zassenhaus(dense) if len(dense) > 2 else [dense]
+        return [{zero[:v] + (e,) + zero[v + 1:]: c for e, c in enumerate(f) if c} for f in factors]
+    for v in variables:
+        content = _content_in(poly, v)
+        if not _is_constant(content):
+            content = _primitive(content)
+            return _factor_square_free(content) + _factor_square_free(_exact_div(poly, content))
+    return _kronecker_factor(poly, variables)
+
+
+def _kronecker_factor(poly: Polynomial, variables: List[int]) -> List[Polynomial]:
+    """
+    Kronecker 代换：x_i -> t^(w_i)，w_i 为混合进制的位权（各位不超过 poly 对 x_i 的次数），
+    分解单变量的像后，组合其因式、反代换回多元多项式并试除
+    
+    像的 t^k 因子（如 x^6 - y^6 的像 t^6 - t^42）不作为候选：每个多元因式的像
+    只差一个 t 的幂，组合时逐个补上 t^j（j <= k）再反代换
+    """
+    degrees = [_degree_in(poly, v) for v in variables]
+    weights = [1]
+    for d in degrees[:-1]:
+        weights.append(weights[-1] * (d + 1))
+    exponents = {m: sum(m[v] * w for v, w in zip(variables, weights)) for m in poly}
+    low = min(exponents.values())
+    if max(exponents.values()) - low > MAX_KRONECKER_DEGREE:
+        return [poly]
+    image = [0] * (max(exponents.values()) - low + 1)
+    for m, c in poly.items():
+        image[exponents[m] - low] += c
+    
+    zero = _zero_monomial(poly)
+    candidates: List[List[int]] = []
+    univariate = {(e,): c for e, c in enumerate(image) if c}
+    for part, k in _square_free(univariate)[1]:
+        dense = [0] * (max(part)[0] + 1)
+        for (e,), c in part.items():
+            dense[e] = c
+        for item in (_zassenhaus(dense) if len(dense) > 2 else [dense]):
+            candidates.extend([item] * k)
+    if len(candidates) > MAX_RECOMBINE_FACTORS:
+        return [poly]
+    
+    factors = []
+    remaining = list(range(len(candidates)))
+    size = 1
+    while 2 * size <= len(remaining):
+        for subset in combinations(remaining, size):
+            product = [1]
+            for i in subset:
+                product = _dense_mul(product, candidates[i])
+            found = _kronecker_divisor(poly, product, low, variables, degrees, weights, zero)
+            if found is not None:
+                candidate, poly = found
+                factors.append(candidate)
+                remaining = [i for i in remaining if i not in subset]
+                break
+        else:
+            size += 1
+    if not _is_constant(poly):
+        factors.append(_primitive(poly))
+    return factors
+
+
+def _kronecker_divisor(poly: Polynomial, product: List[int], low: int, variables: List[int],
+                       degrees: List[int], weights: List[int],
+                       zero: Monomial) -> Optional[Tuple[Polynomial, Polynomial]]:
+    """product * t^j（j = 0..low）反代换后整除 poly 时返回 (因式, 商)"""
+    for shift in range(low + 1):
+        candidate = _inverse_kronecker([0] * shift + product, variables, degrees, weights, zero)
+        if candidate is None or _is_constant(candidate):
+            continue
+        candidate = _primitive(candidate)
+        quotient = _exact_div(poly, candidate)
+        if quotient is not None:
+            return candidate, quotient
+    return None
+
+
+def _inverse_kronecker(dense: List[int], variables: List[int], degrees: List[int],
+                       weights: List[int], zero: Monomial) -> Optional[Polynomial]:
+    """t^k -> 按混合进制拆出各变量的指数；某一位超过对应次数时返回 None"""
+    result: Polynomial = {}
+    for k, c in enumerate(dense):
+        if not c:
+            continue
+        monomial = list(zero)
+        for v, d, w in zip(reversed(variables), reversed(degrees), reversed(weights)):
+            e, k = divmod(k, w)
+            if e > d:
+                return None
+            monomial[v] = e
+        result[tuple(monomial)] = c
+    return result
+
+
+# ---------- 单变量稠密多项式（系数从常数项到最高次项） ----------
+
+def _trim(f: List[int]) -> List[int]:
+    while f and f[-1] == 0:
+        f.pop()
+    return f
+
+
+def _dense_mod(f: List[int], p: int) -> List[int]:
+    return _trim([c % p for c in f])
+
+
+def _dense_mul(f: List[int], g: List[int], p: Optional[int] = None) -> List[int]:
+    if not f or not g:
+        return []
+    result = [0] * (len(f) + len(g) - 1)
+    for i, a in enumerate(f):
+        if a:
+            for j, b in enumerate(g):
+                result[i + j] += a * b
+    return _dense_mod(result, p) if p else _trim(result)
+
+
+def _dense_sub(f: List[int], g: List[int], p: int) -> List[int]:
+    n = max(len(f), len(g))
+    return _dense_mod([(f[i] if i < len(f) else 0) - (g[i] if i < len(g) else 0) for i in range(n)], p)
+
+
+def _dense_add(f: List[int], g: List[int], p: int) -> List[int]:
+    n = max(len(f), len(g))
+    return _dense_mod([(f[i] if i < len(f) else 0) + (g[i] if i < len(g) else 0) for i in range(n)], p)
+
+
+def _dense_divmod(f: List[int], g: List[int], p: int) -> Tuple[List[int], List[int]]:
+    """模 p 带余除法（g 的首项系数须在模 p 下可逆；p 可以是素数幂而 g 首一）"""
+    f = list(f)
+    if len(f) < len(g):
+        return [], _dense_mod(f, p)
+    inverse = pow(g[-1], -1, p)
+    quotient = [0] * (len(f) - len(g) + 1)
+    for k in range(len(quotient) - 1, -1, -1):
+        c = f[k + len(g) - 1] * inverse % p
+        quotient[k] = c
+        if c:
+            for i, b in enumerate(g):
+                f[k + i] = (f[k + i] - c * b) % p
+    return _trim(quotient), _dense_mod(f[:len(g) - 1], p)
+
+
+def _dense_monic(f: List[int], p: int) -> List[int]:
+    inverse = pow(f[-1], -1, p)
+    return [c * inverse % p for c in f]
+
+
+def _dense_gcd(f: List[int], g: List[int], p: int) -> List[int]:
+    """模素数 p 的首一最大公因式"""
+    while g:
+        f, g = g, _dense_divmod(f, g, p)[1]
+    return _dense_monic(f, p) if f else []
+
+
+def _dense_gcdex(f: List[int], g: List[int], p: int) -> Tuple[List[int], List[int]]:
+    """模素数 p 下互素的 f、g：求 s、t 使 s*f + t*g = 1"""
+    r0, r1 = f, g
+    s0, s1 = [1], []
+    t0, t1 = [], [1]
+    while r1:
+        q, r = _dense_divmod(r0, r1, p)
+        r0, r1 = r1, r
+        s0, s1 = s1, _dense_sub(s0, _dense_mul(q, s1, p), p)
+        t0, t1 = t1, _dense_sub(t0, _dense_mul(q, t1, p), p)
+    inverse = pow(r0[0], -1, p)
+    return [c * inverse % p for c in s0], [c * inverse % p for c in t0]
+
+
+def _dense_powmod(f: List[int], e: int, modulus: List[int], p: int) -> List[int]:
+    """f^e mod (modulus, p)"""
+    result = [1]
+    base = _dense_divmod(f, modulus, p)[1]
+    while e:
+        if e & 1:
+            result = _dense_divmod(_dense_mul(result, base, p), modulus, p)[1]
+        e >>= 1
+        if e:
+            base = _dense_divmod(_dense_mul(base, base, p), modulus, p)[1]
+    return result
+
+
+def _dense_exact_div(f: List[int], g: List[int]) -> Optional[List[int]]:
+    """整数系数的 f / g；不能整除时返回 None"""
+    f = list(f)
+    if len(f) < len(g):
+        return None
+    quotient = [0] * (len(f) - len(g) + 1)
+    for k in range(len(quotient) - 1, -1, -1):
+        c, r = divmod(f[k + len(g) - 1], g[-1])
+        if r:
+            return None
+        quotient[k] = c
+        if c:
+            for i, b in enumerate(g):
+                f[k + i] -= c * b
+    if any(f[:len(g) - 1]):
+        return None
+    return _trim(quotient)
+
+
+def _dense_value(f: List[int], x: int) -> int:
+    value = 0
+    for c in reversed(f):
+        value = value * x + c
+    return value
+
+
+def _dense_primitive(f: List[int]) -> List[int]:
+    g = 0
+    for c in f:
+        g = math.gcd(g, c)
+    if f[-1] < 0:
+        g = -g
+    return [c // g for c in f]
+
+
+def _small_primes(limit: int = 2000) -> List[int]:
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[:2] = b'\x00\x00'
+    for i in range(2, math.isqrt(limit) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytearray(len(sieve[i * i::i]))
+    return [i for i in range(3, limit + 1) if sieve[i]]
+
+
+_PRIMES = _small_primes()
+
+# 选模数时比较的素数个数（取模分解后因式最少的一个，减少组合试除）
+_PRIME_CANDIDATES = 5
+
+
+def _zassenhaus(f: List[int]) -> List[List[int]]:
+    """
+    本原、无平方、首项系数为正的整数多项式（次数 >= 2）的不可约因式
+    
+    选 p 使 f 模 p 仍无平方，模 p 分解后 Hensel 提升到 p^l（超过因式系数的
+    Mignotte 界的两倍），再按因式个数从少到多组合试除
+    """
+    n = len(f) - 1
+    lead = f[-1]
+    derivative = [i * f[i] for i in range(1, len(f))]
+    best = None
+    tried = 0
+    for p in _PRIMES:
+        if lead % p == 0:
+            continue
+        fp = _dense_mod(f, p)
+        if len(_dense_gcd(fp, _dense_mod(derivative, p), p)) > 1:
+            continue
+        modular = _factor_mod_p(_dense_monic(fp, p), p)
+        if best is None or len(modular) < len(best[1]):
+            best = (p, modular)
+        tried += 1
+        if len(modular) == 1 or tried >= _PRIME_CANDIDATES:
+            break
+    if best is None:
+        return [f]
+    p, modular = best
+    if len(modular) == 1:
+        return [f]
+    
+    bound = (math.isqrt(n + 1) + 1) * 2 ** n * max(abs(c) for c in f) * lead
+    exponent, modulus = 1, p
+    while modulus <= 2 * bound:
+        exponent += 1
+        modulus *= p
+    lifted = _hensel_lift(f, modular, p, exponent)
+    
+    factors = []
+    remaining = list(range(len(lifted)))
+    size = 1
+    half = modulus // 2
+    f_at_two = _dense_value(f, 2)
+    while 2 * size <= len(remaining):
+        for subset in combinations(remaining, size):
+            # 真因式 g 对应 G = lc(f)/lc(g) * g，G(0)、G(2) 分别整除 lc(f) * f(0)、lc(f) * f(2)：
+            # 先只比较常数项，再比较在 2 处的值，最后才试除
+            constant = f[-1]
+            for i in subset:
+                constant = constant * lifted[i][0] % modulus
+            if constant > half:
+                constant -= modulus
+            if f[0] and (not constant or f[-1] * f[0] % constant):
+                continue
+            candidate = [f[-1]]
+            for i in subset:
+                candidate = _dense_mul(candidate, lifted[i], modulus)
+            candidate = [c - modulus if c > half else c for c in candidate]
+            at_two = _dense_value(candidate, 2)
+            if f_at_two and (not at_two or f[-1] * f_at_two % at_two):
+                continue
+            candidate = _dense_primitive(candidate)
+            quotient = _dense_exact_div(f, candidate)
+            if quotient is not None:
+                factors.append(candidate)
+                f = quotient
+                f_at_two = _dense_value(f, 2)
+                remaining = [i for i in remaining if i not in subset]
+                break
+        else:
+            size += 1
+    factors.append(_dense_primitive(f))
+    return factors
+
+
+def _factor_mod_p(f: List[int], p: int) -> List[List[int]]:
+    """首一、无平方多项式模 p 的首一不可约因式（逐次数分解 + Cantor–Zassenhaus 等次数分解）"""
+    rng = random.Random(p)
+    factors = []
+    for part, degree in _distinct_degree(f, p):
+        factors.extend(_equal_degree(part, degree, p, rng))
+    return factors
+
+
+def _distinct_degree(f: List[int], p: int) -> List[Tuple[List[int], int]]:
+    """逐次数分解：[(次数为 d 的全部不可约因式之积, d)]"""
+    result = []
+    x = [0, 1]
+    h = x
+    d = 0
+    while len(f) - 1 >= 2 * (d + 1):
+        d += 1
+        h = _dense_powmod(h, p, f, p)
+        g = _dense_gcd(f, _dense_sub(h, x, p), p)
+        if len(g) > 1:
+            result.append((g, d))
+            f = _dense_divmod(f, g, p)[0]
+            h = _dense_divmod(h, f, p)[1]
+    if len(f) > 1:
+        result.append((f, len(f) - 1))
+    return result
+
+
+def _equal_degree(f: List[int], degree: int, p: int, rng: random.Random) -> List[List[int]]:
+    """等次数分解：f 为若干 degree 次首一不可约因式之积"""
+    n = len(f) - 1
+    if n <= degree:
+        return [f]
+    exponent = (p ** degree - 1) // 2
+    while True:
+        a = _trim([rng.randrange(p) for _ in range(n)])
+        if len(a) < 2:
+            continue
+        g = _dense_gcd(a, f, p)
+        if 1 < len(g) < len(f):
+            break
+        g = _dense_gcd(_dense_sub(_dense_powmod(a, exponent, f, p), [1], p), f, p)
+        if 1 < len(g) < len(f):
+            break
+    quotient = _dense_monic(_dense_divmod(f, g, p)[0], p)
+    return _equal_degree(g, degree, p, rng) + _equal_degree(quotient, degree, p, rng)
+
+
+def _hensel_lift(f: List[int], factors: List[List[int]], p: int, exponent: int) -> List[List[int]]:
+    """
+    f ≡ lc(f) * prod(factors) (mod p)，factors 首一且两两互素：
+    把 factors 二分后逐对做二次 Hensel 提升，返回模 p^exponent 的首一因式
+    """
+    modulus = p ** exponent
+    if len(factors) == 1:
+        inverse = pow(f[-1], -1, modulus)
+        return [[c * inverse % modulus for c in f]]
+    k = len(factors) // 2
+    g = [f[-1] % p]
+    for item in factors[:k]:
+        g = _dense_mul(g, item, p)
+    h = [1]
+    for item in factors[k:]:
+        h = _dense_mul(h, item, p)
+    s, t = _dense_gcdex(g, h, p)
+    m = p
+    for _ in range(max(1, math.ceil(math.log2(exponent)))):
+        g, h, s, t = _hensel_step(m, f, g, h, s, t)
+        m *= m
+    return _hensel_lift(g, factors[:k], p, exponent) + _hensel_lift(h, factors[k:], p, exponent)
+
+
+def _hensel_step(m: int, f: List[int], g: List[int], h: List[int],
+                 s: List[int], t: List[int]) -> Tuple[List[int], List[int], List[int], List[int]]:
+    """f ≡ g*h、s*g + t*h ≡ 1 (mod m) 提升为模 m^2 的同样关系（h 首一）"""
+    M = m * m
+    e = _dense_sub(f, _dense_mul(g, h), M)
+    q, r = _dense_divmod(_dense_mul(s, e, M), h, M)
+    G = _dense_add(g, _dense_add(_dense_mul(t, e), _dense_mul(q, g), M), M)
+    H = _dense_add(h, r, M)
+    b = _dense_sub(_dense_add(_dense_mul(s, G), _dense_mul(t, H), M), [1], M)
+    c, d = _dense_divmod(_dense_mul(s, b, M), H, M)
+    S = _dense_sub(s, d, M)
+    T = _dense_sub(t, _dense_add(_dense_mul(t, b), _dense_mul(c, G), M), M)
+    return G, H, S, T
@@ -0,0 +1,380 @@
+"""
+Gröbner 基模块
+多元多项式用稀疏字典 {指数元组: 系数} 表示，Buchberger 算法配合
+Gebauer–Möller 判据计算约化 Gröbner 基，支持 lex / grevlex 序
+"""
+
+import heapq
+from fractions import Fraction
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .ast import Node, Number, Symbol, Add, Mul, Pow, Function, children
+from .systems import _to_fraction
+
+
+Monomial = Tuple[int, ...]
+Coefficient = Union[Fraction, int]
+Polynomial = Dict[Monomial, Coefficient]
+
+# 单项式序 -> 排序键；键越小单项式越大，升序排序即按单项式降序排列
+MONOMIAL_ORDERS: Dict[str, Callable[[Monomial], tuple]] = {
+    'lex': lambda m: tuple(-e for e in m),
+    'grevlex': lambda m: (-sum(m), m[::-1]),
+}
+
+
+def groebner(polynomials: Sequence[Node], variables: Sequence[Union[str, Symbol]],
+             order: str = 'grevlex', modulus: Optional[int] = None) -> List[Node]:
+    """
+    计算多项式组生成的理想的约化 Gröbner 基
+    
+    Args:
+        polynomials: 多项式表达式列表（系数为数值）
+        variables: 变量（符号或符号名）列表，其顺序决定单项式序中的变量大小
+        order: 单项式序，'lex' 或 'grevlex'
+        modulus: 素数 p 时在有限域 GF(p) 上计算，默认在有理数域上计算
+        
+    Returns:
+        约化 Gröbner 基（首项系数为1，按首项降序排列）；理想为整个环时返回 [1]
+        
+    Examples:
+        >>> groebner([parse("x^2 + y^2 - 1"), parse("x - y")], ['x', 'y'], order='lex')
+        [x - y, y^2 - 0.5]
+    """
+    names = [v.name if isinstance(v, Symbol) else v for v in variables]
+    
+    polys = []
+    for node in polynomials:
+        poly = sparse_polynomial(node, names, modulus)
+        if poly is None:
+            raise ValueError(f"表达式不是 {', '.join(names)} 的多项式: {node}")
+        polys.append(poly)
+    
+    return [polynomial_to_node(poly, names, order) for poly in groebner_basis(polys, order, modulus)]
+
+
+def sparse_polynomial(node: Node, variables: Sequence[str],
+                      modulus: Optional[int] = None) -> Optional[Polynomial]:
+    """
+    把表达式展开为稀疏多项式 {指数元组: 系数}
+    
+    Args:
+        node: AST节点
+        variables: 变量名列表，指数元组按此顺序排列
+        modulus: 素数 p 时系数为 0..p-1 的整数，否则为 Fraction
+        
+    Returns:
+        稀疏多项式（不含零系数）；表达式不是这些变量的多项式时返回 None
+    """
+    index = {name: i for i, name in enumerate(variables)}
+    zero: Monomial = (0,) * len(variables)
+    results: Dict[int, Polynomial] = {}
+    stack = [(node, False)]
+    
+    while stack:
+        current, ready = stack.pop()
+        if id(current) in results:
+            continue
+        kids = children(current)
+        if kids and not ready:
+            stack.append((current, True))
+            stack.extend((kid, False) for kid in kids)
+            continue
+        
+        poly = _node_polynomial(current, index, zero, modulus, results)
+        if poly is None:
+            return None
+        results[id(current)] = poly
+    
+    return results[id(node)]
+
+
+def _node_polynomial(node: Node, index: Dict[str, int], zero: Monomial, modulus: Optional[int],
+                     results: Dict[int, Polynomial]) -> Optional[Polynomial]:
+    """单个节点的稀疏多项式，子节点结果已在 results 中"""
+    if isinstance(node, Number):
+        return _constant(_to_fraction(node.value), zero, modulus)
+    
+    if isinstance(node, Symbol):
+        if node.name not in index:
+            return None
+        monomial = list(zero)
+        monomial[index[node.name]] = 1
+        return {tuple(monomial): 1}
+    
+    if isinstance(node, Add):
+        total: Polynomial = {}
+        for term in node.terms:
+            _add_into(total, results[id(term)], 1, zero, modulus)
+        return total
+    
+    if isinstance(node, Mul):
+        product = _constant(Fraction(1), zero, modulus)
+        for factor in node.factors:
+            product = _poly_mul(product, results[id(factor)], modulus)
+        return product
+    
+    if isinstance(node, Pow):
+        # 指数须为整数；负指数只允许出现在非零常数上（如 x/2 中的 2^-1）
+        n = _to_int(node.exponent)
+        base = results[id(node.base)]
+        if n is None:
+            return None
+        if n < 0:
+            if not base or not _is_constant(base, zero):
+                return None
+            value = base[zero]
+            inverse = pow(value, -1, modulus) if modulus is not None else 1 / value
+            base, n = {zero: inverse}, -n
+        return _poly_pow(base, n, zero, modulus)
+    
+    if isinstance(node, Function):
+        if not _is_constant(results[id(node.arg)], zero) or modulus is not None:
+            return None
+        # 常数子表达式按浮点求值
+        try:
+            value = node.eval({})
+        except (ValueError, ArithmeticError, TypeError):
+            return None
+        if isinstance(value, complex):
+            return None
+        return _constant(_to_fraction(value), zero, modulus)
+    
+    return None
+
+
+def _to_int(node: Node) -> Optional[int]:
+    """整数值的数字节点转为 int，否则返回 None"""
+    if isinstance(node, Number) and node.value == int(node.value):
+        return int(node.value)
+    return None
+
+
+def _is_constant(poly: Polynomial, zero: Monomial) -> bool:
+    return all(m == zero for m in poly)
+
+
+def _constant(value: Coefficient, zero: Monomial, modulus: Optional[int]) -> Polynomial:
+    """常数多项式；有限域上把有理数 a/b 映射为 a * b^-1 mod p"""
+    if modulus is not None and isinstance(value, Fraction):
+        if value.denominator % modulus == 0:
+            raise ValueError(f"系数 {value} 的分母在 GF({modulus}) 中为零")
+        value = value.numerator * pow(value.denominator, -1, modulus) % modulus
+    return {zero: value} if value else {}
+
+
+def _add_into(target: Polynomial, poly: Polynomial, factor: Coefficient,
+              shift: Monomial, modulus: Optional[int]) -> None:
+    """target += factor * x^shift * poly（就地修改）"""
+    for m, c in poly.items():
+        mm = tuple(a + b for a, b in zip(m, shift))
+        value = target.get(mm, 0) + factor * c
+        if modulus is not None:
+            value %= modulus
+        if value:
+            target[mm] = value
+        else:
+            target.pop(mm, None)
+
+
+def _poly_mul(p: Polynomial, q: Polynomial, modulus: Optional[int]) -> Polynomial:
+    if len(p) > len(q):
+        p, q = q, p
+    product: Polynomial = {}
+    for m, c in p.items():
+        _add_into(product, q, c, m, modulus)
+    return product
+
+
+def _poly_pow(base: Polynomial, n: int, zero: Monomial, modulus: Optional[int]) -> Polynomial:
+    """快速幂"""
+    result = _constant(Fraction(1), zero, modulus)
+    while n:
+        if n & 1:
+            result = _poly_mul(result, base, modulus)
+        n >>= 1
+        if n:
+            base = _poly_mul(base, base, modulus)
+    return result
+
+
+def _order_key(order: str) -> Callable[[Monomial], tuple]:
+    if order not in MONOMIAL_ORDERS:
+        raise ValueError(f"未知的单项式序: {order}")
+    return MONOMIAL_ORDERS[order]
+
+
+def _divides(m: Monomial, n: Monomial) -> bool:
+    """单项式 m 是否整除 n"""
+    return all(a <= b for a, b in zip(m, n))
+
+
+def _lcm(m: Monomial, n: Monomial) -> Monomial:
+    return tuple(a if a > b else b for a, b in zip(m, n))
+
+
+def _monic(poly: Polynomial, lm: Monomial, modulus: Optional[int]) -> Polynomial:
+    """除以首项系数"""
+    lc = poly[lm]
+    if lc == 1:
+        return poly
+    if modulus is not None:
+        inverse = pow(lc, -1, modulus)
+        return {m: c * inverse % modulus for m, c in poly.items()}
+    return {m: c / lc for m, c in poly.items()}
+
+
+def groebner_basis(polynomials: Sequence[Polynomial], order: str = 'grevlex',
+                   modulus: Optional[int] = None) -> List[Polynomial]:
+    """
+    Buchberger 算法（Gebauer–Möller 判据 + normal 选择策略）
+    
+    每步取 lcm 最小的临界对，S 多项式对当前基完全约化；新元素加入时用
+    Gebauer–Möller 判据（含 Buchberger 乘积判据）删去多余的临界对，
+    首项被新元素整除的旧元素退出基。最后对基做相互约化。
+    
+    Args:
+        polynomials: 稀疏多项式列表
+        order: 单项式序，'lex' 或 'grevlex'
+        modulus: 素数 p 时在 GF(p) 上计算
+        
+    Returns:
+        约化 Gröbner 基，首项系数为1，按首项降序排列
+    """
+    key = _order_key(order)
+    stored: List[Tuple[Monomial, Polynomial]] = []  # 所有生成过的 (首项, 首一多项式)
+    basis: List[int] = []
+    pairs: List[Tuple[Monomial, int, int]] = []  # (lcm, i, j)
+    
+    def add(poly: Polynomial) -> None:
+        nonlocal basis, pairs
+        lm = min(poly, key=key)
+        stored.append((lm, _monic(poly, lm, modulus)))
+        basis, pairs = _update(basis, pairs, len(stored) - 1, stored)
+    
+    for poly in polynomials:
+        remainder = _reduce(poly, [stored[g] for g in basis], key, modulus)
+        if remainder:
+            add(remainder)
+    
+    while pairs:
+        best = max(range(len(pairs)), key=lambda k: key(pairs[k][0]))
+        lcm, i, j = pairs.pop(best)
+        remainder = _reduce(_s_polynomial(stored[i], stored[j], lcm, modulus),
+                            [stored[g] for g in basis], key, modulus)
+        if remainder:
+            add(remainder)
+    
+    # 相互约化：首项已两两不整除，只需约化其余各项
+    reduced = []
+    for g in basis:
+        lm, poly = stored[g]
+        others = [stored[h] for h in basis if h != g]
+        reduced.append((lm, _reduce(poly, others, key, modulus)))
+    reduced.sort(key=lambda item: key(item[0]))
+    return [poly for _, poly in reduced]
+
+
+def _update(basis: List[int], pairs: List[Tuple[Monomial, int, int]], h: int,
+            stored: List[Tuple[Monomial, Polynomial]]) -> Tuple[List[int], List[Tuple[Monomial, int, int]]]:
+    """Gebauer–Möller 更新：加入新元素 h 后的基与临界对"""
+    lm_h = stored[h][0]
+    
+    def disjoint(m: Monomial) -> bool:
+        return all(a == 0 or b == 0 for a, b in zip(m, lm_h))
+    
+    # 新的临界对中，lcm 被另一个新临界对的 lcm 真整除的可以删去
+    candidates = [(_lcm(lm_h, stored[g][0]), g) for g in basis]
+    kept = []
+    while candidates:
+        lcm, g = candidates.pop()
+        if disjoint(stored[g][0]) or not any(
+                _divides(other, lcm) for other, _ in candidates + kept):
+            kept.append((lcm, g))
+    # 乘积判据：首项互素的对约化为零
+    new_pairs = [(lcm, g, h) for lcm, g in kept if not disjoint(stored[g][0])]
+    
+    # 旧临界对中，lcm 被 lm(h) 整除且与两端的 lcm 都不同的可以删去
+    old_pairs = [
+        (lcm, i, j) for lcm, i, j in pairs
+        if not (_divides(lm_h, lcm) and _lcm(stored[i][0], lm_h) != lcm and _lcm(stored[j][0], lm_h) != lcm)
+    ]
+    
+    new_basis = [g for g in basis if not _divides(lm_h, stored[g][0])]
+    new_basis.append(h)
+    return new_basis, old_pairs + new_pairs
+
+
+def _s_polynomial(f: Tuple[Monomial, Polynomial], g: Tuple[Monomial, Polynomial],
+                  lcm: Monomial, modulus: Optional[int]) -> Polynomial:
+    """S(f, g) = lcm/lm(f) * f - lcm/lm(g) * g（f, g 均为首一）"""
+    s: Polynomial = {}
+    _add_into(s, f[1], 1, tuple(a - b for a, b in zip(lcm, f[0])), modulus)
+    _add_into(s, g[1], -1, tuple(a - b for a, b in zip(lcm, g[0])), modulus)
+    return s
+
+
+def _reduce(poly: Polynomial, divisors: List[Tuple[Monomial, Polynomial]],
+            key: Callable[[Monomial], tuple], modulus: Optional[int]) -> Polynomial:
+    """
+    对首一多项式组作完全约化，返回余式
+    
+    按单项式降序逐项处理（堆中可能有重复或已消去的单项式，弹出时跳过），
+    某项被某个除式首项整除时消去该项，否则移入余式。
+    """
+    poly = dict(poly)
+    heap = [(key(m), m) for m in poly]
+    heapq.heapify(heap)
+    remainder: Polynomial = {}
+    
+    while heap:
+        _, m = heapq.heappop(heap)
+        c = poly.get(m)
+        if c is None:
+            continue
+        for lm, divisor in divisors:
+            if _divides(lm, m):
+                break
+        else:
+            remainder[m] = c
+            del poly[m]
+            continue
+        
+        # poly -= c * x^(m - lm) * divisor，首项随之消去
+        shift = tuple(a - b for a, b in zip(m, lm))
+        for dm, dc in divisor.items():
+            mm = tuple(a + b for a, b in zip(dm, shift))
+            old = poly.get(mm)
+            value = (old or 0) - c * dc
+            if modulus is not None:
+                value %= modulus
+            if value:
+                if old is None:
+                    heapq.heappush(heap, (key(mm), mm))
+                poly[mm] = value
+            elif old is not None:
+                del poly[mm]
+    
+    return remainder
+
+
+def polynomial_to_node(poly: Polynomial, variables: Sequence[str], order: str = 'grevlex') -> Node:
+    """稀疏多项式转为AST（按单项式降序排列各项）"""
+    key = _order_key(order)
+    terms: List[Node] = []
+    for m in sorted(poly, key=key):
+        c = poly[m]
+        factors: List[Node] = []
+        for name, e in zip(variables, m):
+            if e == 1:
+                factors.append(Symbol(name))
+            elif e > 1:
+                factors.append(Pow(Symbol(name), Number(e)))
+        if c != 1 or not factors:
+            factors.insert(0, Number(float(c) if isinstance(c, Fraction) else c))
+        terms.append(factors[0] if len(factors) == 1 else Mul(*factors))
+    if not terms:
+        return Number(0)
+    if len(terms) == 1:
+        return terms[0]
+    return Add(*terms)
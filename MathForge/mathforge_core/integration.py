@@ -0,0 +1,533 @@
+"""
+符号积分模块
+由按节点种类索引的积分规则表驱动：基本积分表（含线性换元）、线性性、
+有理函数的部分分式分解和分部积分。子积分的结果记忆化，每次调用的搜索步数有上限
+"""
+
+import math
+from fractions import Fraction
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .ast import Node, Number, Symbol, Add, Mul, Pow, Function, Sin, Cos, Exp, Log, Atan, intern, free_symbols, _kind
+from .polynomial import poly_coefficients, poly_coefficient_nodes, real_roots, _numeric_roots, _square_free
+from .systems import _sparse_solve
+from .simplify import simplify
+from .calculus import diff
+from .profiling import record_cache
+from .equivalence import EquivalenceIndex
+
+
+# 每次调用最多尝试的子积分数
+MAX_STEPS = 400
+
+# 部分分式分解允许的最高分母次数
+MAX_RATIONAL_DEGREE = 40
+
+# 跨调用的子积分结果缓存：(驻留键, 积分变量名) -> 原函数
+_MEMO: Dict[tuple, Node] = {}
+_MEMO_LIMIT = 20000
+
+# 顶层被积函数按等价归并，结构不同的等价被积函数共用缓存的原函数；
+# 只归并能在素数域中精确比较的有理被积函数，浮点模式的误判会直接给出错误的原函数
+_INTEGRANDS = EquivalenceIndex(max_entries=_MEMO_LIMIT, exact_only=True)
+
+
+# 基本积分表：函数名 -> F，使 ∫ f(u) du = F(u)
+INTEGRAL_TABLE: Dict[str, Callable[[Node], Node]] = {
+    'sin': lambda u: Mul(Number(-1), Cos(u)),
+    'cos': lambda u: Sin(u),
+    'tan': lambda u: Mul(Number(-1), Log(Cos(u))),
+    'exp': lambda u: Exp(u),
+    'log': lambda u: Add(Mul(u, Log(u)), Mul(Number(-1), u)),
+    'sqrt': lambda u: Mul(Number(2 / 3), Pow(u, Number(1.5))),
+    'atan': lambda u: Add(Mul(u, Atan(u)), Mul(Number(-0.5), Log(Add(Number(1), Pow(u, Number(2)))))),
+}
+
+
+class _SearchExhausted(Exception):
+    """搜索步数用尽"""
+
+
+class _Search:
+    """单次积分调用的搜索状态"""
+    
+    def __init__(self, var: Symbol, max_steps: int):
+        self.var = var
+        self.max_steps = max_steps
+        self.steps = 0
+        self.active: Set[tuple] = set()  # 正在求解的子积分，避免分部积分绕回自身
+        self.failed: Set[tuple] = set()
+
+
+def antiderivative(node: Node, var: Symbol, max_steps: int = MAX_STEPS) -> Optional[Node]:
+    """
+    求不定积分（省略积分常数）
+    
+    按节点种类在 INTEGRAL_RULES 中查找规则依次尝试，规则内部递归求子积分；
+    子积分结果按结构缓存，结构相同的被积函数只求一次；与已求过的被积函数
+    等价（结构不同）时直接复用其原函数。
+    
+    Args:
+        node: 被积函数
+        var: 积分变量
+        max_steps: 本次调用最多尝试的子积分数
+        
+    Returns:
+        原函数（未化简）；在步数上限内找不到时返回 None
+        
+    Examples:
+        >>> simplify(antiderivative(parse("x*exp(x)"), Symbol('x')))
+        x*exp(x) - exp(x)
+    """
+    search = _Search(var, max_steps)
+    try:
+        return _integrate(_equivalent_integrand(node, var), search)
+    except _SearchExhausted:
+        return None
+
+
+def _equivalent_integrand(node: Node, var: Symbol) -> Node:
+    """
+    结构不同但等价的被积函数已经求过原函数时换成它（命中跨调用缓存），
+    如先求过 (x + 1)^2 再求 x^2 + 2*x + 1；只对整数系数的有理被积函数归并，
+    等价由 equivalence 模块在素数域的随机点上精确判定
+    """
+    intern(node)
+    if (node._intern, var.name) in _MEMO:
+        return node
+    representative = _INTEGRANDS.canonical(node)
+    if representative is not node:
+        intern(representative)
+        if (representative._intern, var.name) in _MEMO:
+            return representative
+    return node
+
+
+def _integrate(node: Node, search: _Search) -> Optional[Node]:
+    """求子积分：查缓存，否则按种类依次尝试规则"""
+    intern(node)
+    key = (node._intern, search.var.name)
+    cached = _MEMO.get(key)
+    record_cache('integrate', cached is not None)
+    if cached is not None:
+        return cached
+    if key in search.failed or key in search.active:
+        return None
+    
+    search.steps += 1
+    if search.steps > search.max_steps:
+        raise _SearchExhausted()
+    
+    result = None
+    if not _depends(node, search):
+        result = Mul(node, search.var)
+    else:
+        search.active.add(key)
+        try:
+            for rule in INTEGRAL_RULES.get(_kind(type(node)), ()):
+                result = rule(node, search)
+                if result is not None:
+                    break
+        finally:
+            search.active.discard(key)
+    
+    if result is None:
+        search.failed.add(key)
+        return None
+    if len(_MEMO) >= _MEMO_LIMIT:
+        _MEMO.clear()
+    _MEMO[key] = result
+    return result
+
+
+def _depends(node: Node, search: _Search) -> bool:
+    """表达式是否含积分变量（查询节点上缓存的自由符号集合）"""
+    return search.var.name in free_symbols(node)
+
+
+def _factors(node: Node) -> List[Node]:
+    """展平嵌套乘法的因子"""
+    result: List[Node] = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, Mul):
+            stack.extend(reversed(current.factors))
+        else:
+            result.append(current)
+    return result
+
+
+def _product(factors: List[Node]) -> Node:
+    if not factors:
+        return Number(1)
+    return factors[0] if len(factors) == 1 else Mul(*factors)
+
+
+def _divide(node: Node, divisor: Node) -> Node:
+    """node / divisor，数值除数直接折叠"""
+    if isinstance(divisor, Number):
+        if divisor.value == 1:
+            return node
+        return Mul(Number(1 / divisor.value), node)
+    return Mul(Pow(divisor, Number(-1)), node)
+
+
+def _linear_slope(node: Node, search: _Search) -> Optional[Node]:
+    """node = a*var + b（a, b 不含 var）时返回 a，否则返回 None"""
+    coeffs = poly_coefficients(node, search.var)
+    if coeffs is not None:
+        return Number(coeffs[1]) if len(coeffs) == 2 else None
+    coeffs = poly_coefficient_nodes(node, search.var)
+    if coeffs is None or len(coeffs) != 2:
+        return None
+    slope = simplify(coeffs[1])
+    if isinstance(slope, Number) and slope.value == 0:
+        return None
+    return slope
+
+
+# ---------- 积分规则 ----------
+
+def _integrate_symbol(node: Symbol, search: _Search) -> Optional[Node]:
+    """∫ x dx = x^2/2"""
+    return Mul(Number(0.5), Pow(node, Number(2)))
+
+
+def _integrate_sum(node: Add, search: _Search) -> Optional[Node]:
+    """线性性：逐项积分"""
+    parts = []
+    for term in node.terms:
+        part = _integrate(term, search)
+        if part is None:
+            return None
+        parts.append(part)
+    return Add(*parts)
+
+
+def _integrate_constant_multiple(node: Mul, search: _Search) -> Optional[Node]:
+    """提出不含积分变量的因子"""
+    factors = _factors(node)
+    constants = [f for f in factors if not _depends(f, search)]
+    if not constants:
+        return None
+    rest = [f for f in factors if _depends(f, search)]
+    inner = _integrate(_product(rest), search)
+    if inner is None:
+        return None
+    return Mul(*constants, inner)
+
+
+def _integrate_table(node: Function, search: _Search) -> Optional[Node]:
+    """基本积分表 + 线性换元：∫ f(a*x + b) dx = F(a*x + b) / a"""
+    form = INTEGRAL_TABLE.get(node.name)
+    if form is None:
+        return None
+    slope = _linear_slope(node.arg, search)
+    if slope is None:
+        return None
+    return _divide(form(node.arg), slope)
+
+
+def _integrate_power(node: Pow, search: _Search) -> Optional[Node]:
+    """幂函数与指数函数（底数或指数为积分变量的线性函数）"""
+    base_depends = _depends(node.base, search)
+    exponent_depends = _depends(node.exponent, search)
+    
+    if base_depends and not exponent_depends:
+        # ∫ u^n dx = u^(n+1) / ((n+1) a)，n = -1 时为 ln(u) / a
+        if not isinstance(node.exponent, Number):
+            return None
+        slope = _linear_slope(node.base, search)
+        if slope is None:
+            return None
+        n = node.exponent.value
+        if abs(n + 1) < 1e-12:
+            return _divide(Log(node.base), slope)
+        divisor = Number((n + 1) * slope.value) if isinstance(slope, Number) else Mul(Number(n + 1), slope)
+        return _divide(Pow(node.base, Number(n + 1)), divisor)
+    
+    if exponent_depends and not base_depends:
+        # ∫ c^u dx = c^u / (a ln c)
+        slope = _linear_slope(node.exponent, search)
+        if slope is None:
+            return None
+        if isinstance(node.base, Number) and isinstance(slope, Number):
+            if node.base.value <= 0 or node.base.value == 1:
+                return None
+            return _divide(node, Number(slope.value * math.log(node.base.value)))
+        return _divide(node, Mul(slope, Log(node.base)))
+    
+    return None
+
+
+def _integrate_distribute(node: Mul, search: _Search) -> Optional[Node]:
+    """把乘积对其中的加法因子展开后逐项积分"""
+    factors = _factors(node)
+    for i, factor in enumerate(factors):
+        if isinstance(factor, Add) and _depends(factor, search):
+            others = factors[:i] + factors[i + 1:]
+            return _integrate(Add(*[_product(others + [term]) for term in factor.terms]), search)
+    return None
+
+
+# 分部积分中选作 u 的优先级（LIATE：对数/反三角、代数、三角、指数）
+def _parts_rank(node: Node, search: _Search) -> int:
+    if isinstance(node, (Log, Atan)):
+        return 0
+    if poly_coefficients(node, search.var) is not None:
+        return 1
+    if isinstance(node, Function) and node.name in ('sin', 'cos'):
+        return 2
+    if isinstance(node, Exp) or isinstance(node, Pow) and not _depends(node.base, search):
+        return 3
+    return 4
+
+
+def _integrate_by_parts(node: Mul, search: _Search) -> Optional[Node]:
+    """分部积分：∫ u dv = u v - ∫ v du，按 LIATE 顺序选 u"""
+    factors = _factors(node)
+    if len(factors) < 2 or not all(_depends(f, search) for f in factors):
+        return None
+    
+    # u 只取对数/反三角函数或多项式，求导后变简单；否则分部积分不会收敛
+    ranked = sorted(range(len(factors)), key=lambda i: _parts_rank(factors[i], search))
+    for i in ranked[:2]:
+        if _parts_rank(factors[i], search) > 1:
+            break
+        u = factors[i]
+        v = _integrate(_product(factors[:i] + factors[i + 1:]), search)
+        if v is None:
+            continue
+        du = simplify(diff(u, search.var))
+        rest = _integrate(simplify(Mul(v, du)), search)
+        if rest is None:
+            continue
+        return Add(Mul(u, v), Mul(Number(-1), rest))
+    return None
+
+
+def _integrate_rational(node: Node, search: _Search) -> Optional[Node]:
+    """有理函数 P(x)/Q(x)（数值系数）：多项式除法 + 部分分式分解"""
+    parts = _rational_parts(node, search.var)
+    if parts is None:
+        return None
+    numerator, denominator = parts
+    return _rational_antiderivative(numerator, denominator, search.var)
+
+
+def _rational_parts(node: Node, var: Symbol) -> Optional[Tuple[List[float], List[float]]]:
+    """把乘积拆为分子、分母多项式的系数（从常数项到最高次项）"""
+    numerator = [1.0]
+    denominator = [1.0]
+    for factor in _factors(node):
+        if isinstance(factor, Pow) and isinstance(factor.exponent, Number):
+            n = factor.exponent.value
+            if n != int(n) or abs(n) > MAX_RATIONAL_DEGREE:
+                return None
+            coeffs = poly_coefficients(factor.base, var)
+            if coeffs is None:
+                return None
+            for _ in range(abs(int(n))):
+                if n > 0:
+                    numerator = _list_mul(numerator, coeffs)
+                else:
+                    denominator = _list_mul(denominator, coeffs)
+        else:
+            coeffs = poly_coefficients(factor, var)
+            if coeffs is None:
+                return None
+            numerator = _list_mul(numerator, coeffs)
+        if len(denominator) > MAX_RATIONAL_DEGREE + 1:
+            return None
+    return numerator, denominator
+
+
+def _list_mul(a: List[float], b: List[float]) -> List[float]:
+    product = [0.0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                product[i + j] += x * y
+    return product
+
+
+def _rational_antiderivative(numerator: List[float], denominator: List[float], var: Symbol) -> Optional[Node]:
+    """
+    有理函数的原函数
+    
+    分母先做无平方分解，再对每个无平方因式求根：实根 r（k 重）对应
+    A_j / (x - r)^j，共轭复根对应 (B x + C) / (x^2 + p x + q)（只支持单重），
+    待定系数由线性方程组求出。
+    """
+    while len(denominator) > 1 and denominator[-1] == 0:
+        denominator.pop()
+    lead = denominator[-1]
+    if lead == 0:
+        return None
+    numerator = [c / lead for c in numerator]
+    denominator = [c / lead for c in denominator]
+    quotient, remainder = _list_divmod(numerator, denominator)
+    
+    terms: List[Node] = []
+    for k, c in enumerate(quotient):
+        if abs(c) > 1e-14:
+            terms.append(Mul(Number(_clean(c / (k + 1))), _power(var, k + 1)))
+    
+    if any(abs(c) > 1e-14 for c in remainder):
+        blocks = _denominator_factors(denominator)
+        if blocks is None:
+            return None
+        fraction_terms = _partial_fractions(remainder, blocks, var)
+        if fraction_terms is None:
+            return None
+        terms.extend(fraction_terms)
+    
+    if not terms:
+        return Number(0)
+    return terms[0] if len(terms) == 1 else Add(*terms)
+
+
+def _list_divmod(a: List[float], b: List[float]) -> Tuple[List[float], List[float]]:
+    """首一除式的多项式带余除法"""
+    if len(a) < len(b):
+        return [], list(a)
+    quotient = [0.0] * (len(a) - len(b) + 1)
+    remainder = list(a)
+    for k in range(len(quotient) - 1, -1, -1):
+        q = remainder[k + len(b) - 1]
+        quotient[k] = q
+        if q:
+            for i, c in enumerate(b):
+                remainder[k + i] -= q * c
+    return quotient, remainder[:len(b) - 1]
+
+
+def _denominator_factors(denominator: List[float]) -> Optional[List[Tuple[str, Tuple[float, ...], int]]]:
+    """
+    首一分母分解为 [(种类, 参数, 重数)]：('linear', (r,), k) 表示 (x - r)^k，
+    ('quadratic', (a, b), k) 表示 ((x - a)^2 + b^2)^k
+    """
+    exact = [Fraction(repr(c)) for c in denominator]
+    blocks: List[Tuple[str, Tuple[float, ...], int]] = []
+    for factor, multiplicity in _square_free(exact):
+        coeffs = [float(c) for c in factor]
+        degree = len(coeffs) - 1
+        reals = real_roots(coeffs)
+        pairs = []
+        if len(reals) < degree:
+            pairs = [z for z in _numeric_roots(coeffs) if z.imag > 1e-7 * max(1.0, abs(z))]
+        if len(reals) + 2 * len(pairs) != degree:
+            return None
+        if pairs and multiplicity > 1:
+            return None  # 重复的二次不可约因式暂不支持
+        blocks.extend(('linear', (r,), multiplicity) for r in reals)
+        blocks.extend(('quadratic', (z.real, z.imag), 1) for z in pairs)
+    return blocks
+
+
+def _block_polynomial(kind: str, params: Tuple[float, ...]) -> List[float]:
+    if kind == 'linear':
+        return [-params[0], 1.0]
+    a, b = params
+    return [a * a + b * b, -2 * a, 1.0]
+
+
+def _partial_fractions(remainder: List[float], blocks, var: Symbol) -> Optional[List[Node]]:
+    """待定系数法求部分分式，并逐项积分"""
+    # 每个未知系数对应的列：该项乘以分母后的多项式
+    columns: List[List[float]] = []
+    unknowns: List[Tuple[int, int]] = []  # (块号, j)，二次块的 j 为 1 (x 的系数) 或 0 (常数)
+    for index, (kind, params, multiplicity) in enumerate(blocks):
+        others = [1.0]
+        for other, (other_kind, other_params, other_multiplicity) in enumerate(blocks):
+            if other != index:
+                for _ in range(other_multiplicity):
+                    others = _list_mul(others, _block_polynomial(other_kind, other_params))
+        if kind == 'linear':
+            own = _block_polynomial(kind, params)
+            for j in range(1, multiplicity + 1):
+                column = others
+                for _ in range(multiplicity - j):
+                    column = _list_mul(column, own)
+                columns.append(column)
+                unknowns.append((index, j))
+        else:
+            columns.append(_list_mul(others, [0.0, 1.0]))
+            unknowns.append((index, 1))
+            columns.append(others)
+            unknowns.append((index, 0))
+    
+    n = len(columns)
+    rows = [{c: columns[c][i] for c in range(n) if i < len(columns[c]) and columns[c][i] != 0}
+            for i in range(n)]
+    rhs = [remainder[i] if i < len(remainder) else 0.0 for i in range(n)]
+    solution = _sparse_solve(rows, rhs, n, exact=False)
+    if solution is None or any(set(form) - {-1} for form in solution):
+        return None
+    values = [form.get(-1, 0.0) for form in solution]
+    
+    terms: List[Node] = []
+    quadratic: Dict[int, Dict[int, float]] = {}
+    for (index, j), value in zip(unknowns, values):
+        kind, params, _ = blocks[index]
+        if kind == 'quadratic':
+            quadratic.setdefault(index, {})[j] = value
+            continue
+        if abs(value) < 1e-12:
+            continue
+        shifted = _shift(var, params[0])
+        if j == 1:
+            terms.append(Mul(Number(_clean(value)), Log(shifted)))
+        else:
+            terms.append(Mul(Number(_clean(value / (1 - j))), _power(shifted, 1 - j)))
+    
+    for index, coefficients in quadratic.items():
+        # ∫ (B x + C) / ((x-a)^2 + b^2) = B/2 ln((x-a)^2 + b^2) + (C + B a)/b atan((x-a)/b)
+        a, b = blocks[index][1]
+        B, C = coefficients.get(1, 0.0), coefficients.get(0, 0.0)
+        if abs(B) > 1e-12:
+            p, q = _block_polynomial('quadratic', (a, b))[1::-1]
+            terms.append(Mul(Number(_clean(B / 2)), Log(_quadratic_node(var, p, q))))
+        scale = (C + B * a) / b
+        if abs(scale) > 1e-12:
+            argument = _shift(var, a)
+            if abs(b - 1) > 1e-12:
+                argument = Mul(Number(_clean(1 / b)), argument)
+            terms.append(Mul(Number(_clean(scale)), Atan(argument)))
+    return terms
+
+
+def _shift(var: Symbol, root: float) -> Node:
+    """x - r"""
+    root = _clean(root)
+    return var if root == 0 else Add(var, Number(-root))
+
+
+def _power(node: Node, n: int) -> Node:
+    return node if n == 1 else Pow(node, Number(n))
+
+
+def _quadratic_node(var: Symbol, p: float, q: float) -> Node:
+    """x^2 + p x + q"""
+    terms: List[Node] = [Pow(var, Number(2))]
+    if abs(p) > 1e-14:
+        terms.append(Mul(Number(_clean(p)), var))
+    if abs(q) > 1e-14:
+        terms.append(Number(_clean(q)))
+    return Add(*terms)
+
+
+def _clean(value: float) -> float:
+    """舍去浮点运算在第12位有效数字之后的误差"""
+    return float(f'{value:.12g}')
+
+
+# 积分规则表：节点种类 -> 依次尝试的规则
+INTEGRAL_RULES: Dict[str, List[Callable[[Node, _Search], Optional[Node]]]] = {
+    'symbol': [_integrate_symbol],
+    'add': [_integrate_sum],
+    'mul': [_integrate_constant_multiple, _integrate_rational, _integrate_distribute, _integrate_by_parts],
+    'pow': [_integrate_power, _integrate_rational],
+    'function': [_integrate_table],
+}
@@ -0,0 +1,440 @@
+"""
+区间算术模块
+给出变量的取值区间，求一个保证包含表达式全部取值的区间：
+单调函数取端点值，sin/cos/tan 按周期判断区间内是否含极值点或极点，
+运算结果向外舍入一个 ulp 以覆盖浮点误差。定义域外的部分被舍去，
+整个区间都在定义域外时结果为空区间（两端为 nan）。
+
+eval_interval 对单组区间求值（纯 Python），eval_intervals 用 numpy
+对整批区间同时求值，供求根和绘图成片剪除不可能有零点的区域
+"""
+
+import math
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .ast import Node, Number, Symbol, Add, Mul, Pow, Function
+from .polynomial import _constant_value
+from .traversal import fold
+
+try:
+    import numpy as np
+except ImportError:  # numpy 可选，仅 eval_intervals 需要
+    np = None
+
+
+class Interval(NamedTuple):
+    """闭区间 [lo, hi]；两端为 nan 表示空区间"""
+    lo: float
+    hi: float
+    
+    @property
+    def is_empty(self) -> bool:
+        return math.isnan(self.lo)
+    
+    def contains(self, value: float) -> bool:
+        """value 是否在区间内（空区间不含任何值）"""
+        return self.lo <= value <= self.hi
+
+
+EMPTY = Interval(math.nan, math.nan)
+WHOLE = Interval(-math.inf, math.inf)
+
+_TWO_PI = 2 * math.pi
+_HALF_PI = math.pi / 2
+
+
+def eval_interval(node: Node, values: Optional[Dict[str, Any]] = None) -> Interval:
+    """
+    区间求值
+    
+    Args:
+        node: AST节点
+        values: 变量名 -> 数值或 (lo, hi) 区间
+        
+    Returns:
+        包含 node 在这些区间上全部实数取值的 Interval
+        
+    Raises:
+        ValueError: 缺少变量的取值，或节点类型无法做区间求值
+        
+    Examples:
+        >>> eval_interval(parse("x^2 - 2*x"), {'x': (0, 3)})
+        Interval(lo=-6.000000000000003, hi=9.000000000000004)
+    """
+    values = values or {}
+    
+    def leaf(name: str) -> Interval:
+        if name not in values:
+            raise ValueError(f"变量 {name} 未在值字典中找到")
+        value = values[name]
+        if isinstance(value, (tuple, list)):
+            lo, hi = value
+            return Interval(float(lo), float(hi))
+        return Interval(float(value), float(value))
+    
+    return fold(node, lambda current, kids: _scalar_node(current, kids, leaf))
+
+
+def eval_intervals(node: Node, bounds: Dict[str, Any]) -> Tuple[Any, Any]:
+    """
+    向量化的区间求值：对整批区间同时求值
+    
+    Args:
+        node: AST节点
+        bounds: 变量名 -> (lo 数组, hi 数组)；也可以是单个数组或数值（退化区间）
+        
+    Returns:
+        (lo, hi) 两个 numpy 数组，形状为各输入广播后的形状；空区间处为 nan
+        
+    Raises:
+        ImportError: 未安装 numpy
+        ValueError: 缺少变量的取值，或节点类型无法做区间求值
+        
+    Examples:
+        >>> edges = np.linspace(-2, 2, 5)
+        >>> eval_intervals(parse("x^2"), {'x': (edges[:-1], edges[1:])})
+        (array([ 1.e+000, -5.e-324, -5.e-324,  1.e+000]), array([4., 1., 1., 4.]))
+    """
+    if np is None:
+        raise ImportError("向量化区间求值需要安装 numpy")
+    
+    def leaf(name: str) -> Tuple[Any, Any]:
+        if name not in bounds:
+            raise ValueError(f"变量 {name} 未在值字典中找到")
+        value = bounds[name]
+        if isinstance(value, tuple):
+            lo, hi = value
+            return np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)
+        value = np.asarray(value, dtype=float)
+        return value, value
+    
+    with np.errstate(all='ignore'):
+        lo, hi = fold(node, lambda current, kids: _vector_node(current, kids, leaf))
+    return tuple(np.broadcast_arrays(lo, hi))
+
+
+# ---------------------------------------------------------------------------
+# 单组区间（纯 Python）
+# ---------------------------------------------------------------------------
+
+def _outward(lo: float, hi: float) -> Interval:
+    """向外舍入一个 ulp"""
+    if math.isnan(lo) or math.isnan(hi):
+        return EMPTY
+    return Interval(math.nextafter(lo, -math.inf), math.nextafter(hi, math.inf))
+
+
+def _call(func: Callable[[float], float], x: float, overflow: float = math.inf) -> float:
+    try:
+        return func(x)
+    except OverflowError:
+        return overflow
+
+
+def _scalar_node(node: Node, kids: List[Interval], leaf: Callable[[str], Interval]) -> Interval:
+    if isinstance(node, Number):
+        return Interval(node.value, node.value)
+    
+    if isinstance(node, Symbol):
+        return leaf(node.name)
+    
+    if any(kid.is_empty for kid in kids):
+        return EMPTY
+    
+    if isinstance(node, Add):
+        return _outward(sum(kid.lo for kid in kids), sum(kid.hi for kid in kids))
+    
+    if isinstance(node, Mul):
+        result = kids[0]
+        for kid in kids[1:]:
+            result = _scalar_mul(result, kid)
+        return result
+    
+    if isinstance(node, Pow):
+        p = _constant_exponent(node)
+        if p is not None:
+            return _scalar_pow(kids[0], Interval(p, p))
+        return _scalar_pow(*kids)
+    
+    if isinstance(node, Function):
+        rule = _SCALAR_FUNCTIONS.get(node.name)
+        # 未登记的函数只能给出平凡的界
+        return rule(kids[0]) if rule is not None else WHOLE
+    
+    raise ValueError(f"无法对节点类型 {type(node).__name__} 做区间求值")
+
+
+def _constant_exponent(node: Pow) -> Optional[float]:
+    """不含变量的指数直接求出精确值，避免 -2 之类的指数被当成区间"""
+    if isinstance(node.exponent, Number):
+        return node.exponent.value
+    return _constant_value(node.exponent)
+
+
+def _scalar_mul(a: Interval, b: Interval) -> Interval:
+    products = [a.lo * b.lo, a.lo * b.hi, a.hi * b.lo, a.hi * b.hi]
+    products = [0.0 if math.isnan(p) else p for p in products]  # 0 * inf 取 0
+    return _outward(min(products), max(products))
+
+
+def _power(x: float, n: float) -> float:
+    try:
+        return x ** n
+    except OverflowError:
+        return -math.inf if x < 0 and n % 2 == 1 else math.inf
+
+
+def _scalar_reciprocal(a: Interval) -> Interval:
+    if a.lo > 0 or a.hi < 0:
+        return _outward(1 / a.hi, 1 / a.lo)
+    if a.lo == 0 and a.hi == 0:
+        return EMPTY
+    if a.lo == 0:
+        return _outward(1 / a.hi, math.inf)
+    if a.hi == 0:
+        return _outward(-math.inf, 1 / a.lo)
+    return WHOLE
+
+
+def _scalar_integer_power(base: Interval, n: int) -> Interval:
+    if n == 0:
+        return Interval(1.0, 1.0)
+    if n < 0:
+        return _scalar_reciprocal(_scalar_integer_power(base, -n))
+    lo, hi = _power(base.lo, n), _power(base.hi, n)
+    if n % 2 == 1:
+        return _outward(lo, hi)
+    if base.lo >= 0:
+        return _outward(lo, hi)
+    if base.hi <= 0:
+        return _outward(hi, lo)
+    return _outward(0.0, max(lo, hi))
+
+
+def _scalar_pow(base: Interval, exponent: Interval) -> Interval:
+    if exponent.lo == exponent.hi:
+        p = exponent.lo
+        if math.isfinite(p) and p == int(p):
+            return _scalar_integer_power(base, int(p))
+        # 非整数次幂只在非负底数上有实数值
+        if base.hi < 0:
+            return EMPTY
+        lo = max(base.lo, 0.0)
+        if p > 0:
+            return _outward(_power(lo, p), _power(base.hi, p))
+        return _outward(_power(base.hi, p) if base.hi > 0 else math.inf,
+                        math.inf if lo == 0 else _power(lo, p))
+    
+    # 指数是区间：负底数只在整数指数处有定义
+    if base.lo < 0 and math.floor(exponent.hi) >= math.ceil(exponent.lo):
+        return WHOLE
+    if base.hi < 0:
+        return EMPTY
+    logs = _scalar_log(Interval(max(base.lo, 0.0), base.hi))
+    return _scalar_exp(_scalar_mul(exponent, logs))
+
+
+def _scalar_exp(a: Interval) -> Interval:
+    return _outward(_call(math.exp, a.lo), _call(math.exp, a.hi))
+
+
+def _scalar_log(a: Interval) -> Interval:
+    if a.hi <= 0:
+        return EMPTY
+    return _outward(-math.inf if a.lo <= 0 else math.log(a.lo), math.log(a.hi))
+
+
+def _scalar_sqrt(a: Interval) -> Interval:
+    if a.hi < 0:
+        return EMPTY
+    return _outward(math.sqrt(max(a.lo, 0.0)), math.sqrt(a.hi))
+
+
+def _scalar_atan(a: Interval) -> Interval:
+    return _outward(math.atan(a.lo), math.atan(a.hi))
+
+
+def _touches(lo: float, hi: float, phase: float, period: float) -> bool:
+    """[lo, hi]（略微放宽）是否含 phase + k*period"""
+    slack = 1e-12 * max(1.0, abs(lo), abs(hi))
+    return math.floor((hi + slack - phase) / period) >= math.ceil((lo - slack - phase) / period)
+
+
+def _scalar_periodic(func: Callable[[float], float], peak: float) -> Callable[[Interval], Interval]:
+    """sin/cos：最大值点为 peak + 2kπ，最小值点为 peak + π + 2kπ"""
+    def rule(a: Interval) -> Interval:
+        if not (math.isfinite(a.lo) and math.isfinite(a.hi)) or a.hi - a.lo >= _TWO_PI:
+            return Interval(-1.0, 1.0)
+        ends = (func(a.lo), func(a.hi))
+        lo = -1.0 if _touches(a.lo, a.hi, peak + math.pi, _TWO_PI) else min(ends)
+        hi = 1.0 if _touches(a.lo, a.hi, peak, _TWO_PI) else max(ends)
+        lo, hi = _outward(lo, hi)
+        return Interval(max(lo, -1.0), min(hi, 1.0))
+    return rule
+
+
+def _scalar_tan(a: Interval) -> Interval:
+    if not (math.isfinite(a.lo) and math.isfinite(a.hi)) or a.hi - a.lo >= math.pi:
+        return WHOLE
+    if _touches(a.lo, a.hi, _HALF_PI, math.pi):
+        return WHOLE
+    return _outward(math.tan(a.lo), math.tan(a.hi))
+
+
+_SCALAR_FUNCTIONS: Dict[str, Callable[[Interval], Interval]] = {
+    'exp': _scalar_exp,
+    'log': _scalar_log,
+    'sqrt': _scalar_sqrt,
+    'atan': _scalar_atan,
+    'sin': _scalar_periodic(math.sin, _HALF_PI),
+    'cos': _scalar_periodic(math.cos, 0.0),
+    'tan': _scalar_tan,
+}
+
+
+# ---------------------------------------------------------------------------
+# 整批区间（numpy），规则与上面逐一对应
+# ---------------------------------------------------------------------------
+
+def _v_outward(lo: Any, hi: Any) -> Tuple[Any, Any]:
+    return np.nextafter(lo, -np.inf), np.nextafter(hi, np.inf)
+
+
+def _v_empty(lo: Any, hi: Any, empty: Any) -> Tuple[Any, Any]:
+    return np.where(empty, np.nan, lo), np.where(empty, np.nan, hi)
+
+
+def _vector_node(node: Node, kids: List[Tuple[Any, Any]],
+                 leaf: Callable[[str], Tuple[Any, Any]]) -> Tuple[Any, Any]:
+    if isinstance(node, Number):
+        value = np.asarray(node.value)
+        return value, value
+    
+    if isinstance(node, Symbol):
+        return leaf(node.name)
+    
+    if isinstance(node, Add):
+        return _v_outward(sum(kid[0] for kid in kids), sum(kid[1] for kid in kids))
+    
+    if isinstance(node, Mul):
+        result = kids[0]
+        for kid in kids[1:]:
+            result = _vector_mul(result, kid)
+        return result
+    
+    if isinstance(node, Pow):
+        base, exponent = kids
+        p = _constant_exponent(node)
+        if p is not None:
+            return _vector_point_pow(base, p)
+        return _vector_pow(base, exponent)
+    
+    if isinstance(node, Function):
+        rule = _VECTOR_FUNCTIONS.get(node.name)
+        if rule is None:
+            lo, hi = kids[0]
+            return _v_empty(np.full(np.shape(lo), -np.inf), np.full(np.shape(lo), np.inf), np.isnan(lo))
+        return rule(*kids[0])
+    
+    raise ValueError(f"无法对节点类型 {type(node).__name__} 做区间求值")
+
+
+def _vector_mul(a: Tuple[Any, Any], b: Tuple[Any, Any]) -> Tuple[Any, Any]:
+    (alo, ahi), (blo, bhi) = a, b
+    products = np.stack(np.broadcast_arrays(alo * blo, alo * bhi, ahi * blo, ahi * bhi))
+    products = np.where(np.isnan(products), 0.0, products)  # 0 * inf 取 0
+    lo, hi = _v_outward(products.min(axis=0), products.max(axis=0))
+    return _v_empty(lo, hi, np.isnan(alo) | np.isnan(blo))
+
+
+def _vector_reciprocal(lo: Any, hi: Any) -> Tuple[Any, Any]:
+    apart = (lo > 0) | (hi < 0)
+    rlo = np.select([apart, lo == 0, hi == 0], [1 / hi, 1 / hi, -np.inf], -np.inf)
+    rhi = np.select([apart, lo == 0, hi == 0], [1 / lo, np.inf, 1 / lo], np.inf)
+    rlo, rhi = _v_outward(rlo, rhi)
+    return _v_empty(rlo, rhi, ((lo == 0) & (hi == 0)) | np.isnan(lo))
+
+
+def _vector_point_pow(base: Tuple[Any, Any], p: float) -> Tuple[Any, Any]:
+    blo, bhi = base
+    if math.isfinite(p) and p == int(p):
+        n = int(p)
+        if n == 0:
+            return _v_empty(np.ones_like(blo), np.ones_like(blo), np.isnan(blo))
+        if n < 0:
+            return _vector_reciprocal(*_vector_point_pow(base, -n))
+        plo, phi = np.power(blo, n), np.power(bhi, n)
+        if n % 2 == 1:
+            return _v_outward(plo, phi)
+        lo = np.where(blo >= 0, plo, np.where(bhi <= 0, phi, 0.0))
+        hi = np.where(blo >= 0, phi, np.where(bhi <= 0, plo, np.maximum(plo, phi)))
+        return _v_outward(lo, hi)
+    
+    clipped = np.maximum(blo, 0.0)
+    if p > 0:
+        lo, hi = np.power(clipped, p), np.power(bhi, p)
+    else:
+        lo, hi = np.power(bhi, p), np.power(clipped, p)
+    lo, hi = _v_outward(lo, hi)
+    return _v_empty(lo, hi, (bhi < 0) | np.isnan(blo))
+
+
+def _vector_pow(base: Tuple[Any, Any], exponent: Tuple[Any, Any]) -> Tuple[Any, Any]:
+    (blo, bhi), (elo, ehi) = base, exponent
+    logs = _vector_log(np.maximum(blo, 0.0), bhi)
+    lo, hi = _vector_exp(*_vector_mul(exponent, logs))
+    whole = (blo < 0) & (np.floor(ehi) >= np.ceil(elo))
+    lo, hi = np.where(whole, -np.inf, lo), np.where(whole, np.inf, hi)
+    return _v_empty(lo, hi, ((bhi < 0) & ~whole) | np.isnan(blo) | np.isnan(elo))
+
+
+def _vector_exp(lo: Any, hi: Any) -> Tuple[Any, Any]:
+    return _v_outward(np.exp(lo), np.exp(hi))
+
+
+def _vector_log(lo: Any, hi: Any) -> Tuple[Any, Any]:
+    rlo, rhi = _v_outward(np.where(lo <= 0, -np.inf, np.log(lo)), np.log(hi))
+    return _v_empty(rlo, rhi, hi <= 0)
+
+
+def _vector_sqrt(lo: Any, hi: Any) -> Tuple[Any, Any]:
+    rlo, rhi = _v_outward(np.sqrt(np.maximum(lo, 0.0)), np.sqrt(hi))
+    return _v_empty(rlo, rhi, hi < 0)
+
+
+def _vector_atan(lo: Any, hi: Any) -> Tuple[Any, Any]:
+    return _v_outward(np.arctan(lo), np.arctan(hi))
+
+
+def _v_touches(lo: Any, hi: Any, phase: float, period: float) -> Any:
+    slack = 1e-12 * np.maximum(1.0, np.maximum(np.abs(lo), np.abs(hi)))
+    return np.floor((hi + slack - phase) / period) >= np.ceil((lo - slack - phase) / period)
+
+
+def _vector_periodic(lo: Any, hi: Any, func: Callable[[Any], Any], peak: float) -> Tuple[Any, Any]:
+    full = ~(np.isfinite(lo) & np.isfinite(hi)) | (hi - lo >= _TWO_PI)
+    flo, fhi = func(lo), func(hi)
+    rlo = np.where(_v_touches(lo, hi, peak + np.pi, _TWO_PI), -1.0, np.minimum(flo, fhi))
+    rhi = np.where(_v_touches(lo, hi, peak, _TWO_PI), 1.0, np.maximum(flo, fhi))
+    rlo, rhi = _v_outward(rlo, rhi)
+    rlo = np.where(full, -1.0, np.maximum(rlo, -1.0))
+    rhi = np.where(full, 1.0, np.minimum(rhi, 1.0))
+    return _v_empty(rlo, rhi, np.isnan(lo))
+
+
+def _vector_tan(lo: Any, hi: Any) -> Tuple[Any, Any]:
+    whole = ~(np.isfinite(lo) & np.isfinite(hi)) | (hi - lo >= np.pi) | _v_touches(lo, hi, _HALF_PI, np.pi)
+    rlo, rhi = _v_outward(np.tan(lo), np.tan(hi))
+    rlo, rhi = np.where(whole, -np.inf, rlo), np.where(whole, np.inf, rhi)
+    return _v_empty(rlo, rhi, np.isnan(lo))
+
+
+_VECTOR_FUNCTIONS: Dict[str, Callable[[Any, Any], Tuple[Any, Any]]] = {
+    'exp': _vector_exp,
+    'log': _vector_log,
+    'sqrt': _vector_sqrt,
+    'atan': _vector_atan,
+    'sin': lambda lo, hi: _vector_periodic(lo, hi, np.sin, _HALF_PI),
+    'cos': lambda lo, hi: _vector_periodic(lo, hi, np.cos, 0.0),
+    'tan': _vector_tan,
+}
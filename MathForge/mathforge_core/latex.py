@@ -3,140 +3,147 @@ LaTeX 输出模块
 将AST转换为LaTeX格式，兼容MathJax渲染
 """
 
-from .ast import Node, Number, Symbol, Add, Mul, Pow, Function
+from typing import Any, List
+from .ast import (
+    Node, Number, Symbol, Add, Mul, Pow, Function,
+    render, RenderCache, TERM_SEP, TERM_END
+)
+from .traversal import Dispatcher
+
+
+# 特殊函数名称映射
+FUNC_MAP = {
+    'sin': '\\sin',
+    'cos': '\\cos',
+    'tan': '\\tan',
+    'exp': 'e^{',
+    'log': '\\ln',
+    'sqrt': '\\sqrt',
+    'atan': '\\arctan'
+}
+
+# LaTeX 渲染缓存：结构相同的子表达式跨调用只渲染一次
+LATEX_CACHE = RenderCache()
 
 
 def to_latex(node: Node) -> str:
     """
     将AST节点转换为LaTeX字符串
     
+    使用显式栈迭代渲染，每个子树只输出一次，可处理任意深度的表达式。
+    重复出现的子表达式和整个结果会写入 LATEX_CACHE，再次渲染时直接复用。
+    
     Args:
         node: AST节点
         
     Returns:
         LaTeX格式字符串
     """
-    if isinstance(node, Number):
-        if node.value == int(node.value):
-            return str(int(node.value))
-        return str(node.value)
-    
-    elif isinstance(node, Symbol):
-        return node.name
-    
-    elif isinstance(node, Add):
-        terms = []
-        for i, term in enumerate(node.terms):
-            term_latex = to_latex(term)
-            # 处理负号
-            if i > 0 and not term_latex.startswith('-'):
-                terms.append(' + ' + term_latex)
-            elif i > 0:
-                terms.append(' ' + term_latex)
-            else:
-                terms.append(term_latex)
-        return ''.join(terms)
+    return render(node, LATEX_PARTS, ' + ', ' ', LATEX_CACHE)
+
+
+def _add_parts(node: Add) -> List[Any]:
+    """加法的LaTeX片段：负项前只加空格，其余项前加 ' + '（由 TERM_SEP 在输出时决定）"""
+    if not node.terms:
+        return []
+    parts: List[Any] = [node.terms[0]]
+    for term in node.terms[1:]:
+        parts.extend((TERM_SEP, term, TERM_END))
+    return parts
+
+
+def _function_parts(node: Function) -> List[Any]:
+    """函数的LaTeX片段"""
+    func_name = node.name
+    latex_name = FUNC_MAP.get(func_name, func_name)
     
-    elif isinstance(node, Mul):
-        factors = []
-        for i, factor in enumerate(node.factors):
-            factor_latex = to_latex(factor)
-            
-            # 处理负数
-            if isinstance(factor, Number) and factor.value < 0:
-                if i == 0:
-                    factors.append(factor_latex)
-                else:
-                    factors.append(f' \\cdot {factor_latex}')
-                continue
-            
-            # 处理需要括号的情况
-            needs_parens = isinstance(factor, (Add, Pow)) or isinstance(factor, Function)
-            
-            if i == 0:
-                if needs_parens:
-                    factors.append(f'\\left({factor_latex}\\right)')
-                else:
-                    factors.append(factor_latex)
-            else:
-                if needs_parens:
-                    factors.append(f' \\cdot \\left({factor_latex}\\right)')
-                else:
-                    # 检查是否需要显式的乘号
-                    if isinstance(factor, Number) or isinstance(factor, Symbol):
-                        factors.append(f' \\cdot {factor_latex}')
-                    else:
-                        factors.append(f' {factor_latex}')
-        
-        result = ''.join(factors)
-        # 简化：如果第一个因子是1，去掉
-        if result.startswith('1 \\cdot '):
-            result = result[9:]
-        return result
+    if func_name == 'exp':
+        return [latex_name, node.arg, '}']
+    elif func_name == 'sqrt':
+        return [latex_name, '{', node.arg, '}']
+    else:
+        return [latex_name, '\\left(', node.arg, '\\right)']
+
+
+def _mul_parts(node: Mul) -> List[Any]:
+    """乘法的LaTeX片段"""
+    factors = node.factors
+    separators = [_mul_separator(factor) for factor in factors]
     
-    elif isinstance(node, Pow):
-        base_latex = to_latex(node.base)
-        exp_latex = to_latex(node.exponent)
-        
-        # 处理底数需要括号的情况
-        if isinstance(node.base, (Add, Mul, Pow)) or isinstance(node.base, Function):
-            base_latex = f'\\left({base_latex}\\right)'
-        
-        # 处理分数指数
-        if isinstance(node.exponent, Number):
-            exp_val = node.exponent.value
-            if abs(exp_val - 0.5) < 1e-10:
-                return f'\\sqrt{{{to_latex(node.base)}}}'
-            elif abs(exp_val + 0.5) < 1e-10:
-                return f'\\frac{{1}}{{\\sqrt{{{to_latex(node.base)}}}}}'
-            elif exp_val < 0:
-                # 负指数
-                abs_exp = abs(exp_val)
-                if abs_exp == int(abs_exp):
-                    return f'\\frac{{1}}{{{base_latex}^{{{int(abs_exp)}}}}}'
-                else:
-                    return f'\\frac{{1}}{{{base_latex}^{{{exp_latex}}}}}'
-            elif exp_val != int(exp_val):
-                # 分数指数
-                return f'{base_latex}^{{{exp_latex}}}'
-        
-        # 处理分数形式的指数（如 1/2）
-        if isinstance(node.exponent, Mul):
-            # 检查是否是 1/n 形式
-            factors = node.exponent.factors
-            if len(factors) == 2:
-                if factors[0] == Number(1) and isinstance(factors[1], Number):
-                    n = factors[1].value
-                    if n > 0 and n == int(n):
-                        if n == 2:
-                            return f'\\sqrt{{{to_latex(node.base)}}}'
-                        else:
-                            return f'\\sqrt[{int(n)}]{{{to_latex(node.base)}}}'
-        
-        return f'{base_latex}^{{{exp_latex}}}'
+    # 简化：如果第一个因子是1且后面用 \cdot 连接，去掉 "1 \cdot "
+    start = 0
+    if (len(factors) > 1 and isinstance(factors[0], Number)
+            and factors[0].value == 1 and separators[1] == ' \\cdot '):
+        start = 1
     
-    elif isinstance(node, Function):
-        func_name = node.name
-        arg_latex = to_latex(node.arg)
-        
-        # 特殊函数名称映射
-        func_map = {
-            'sin': '\\sin',
-            'cos': '\\cos',
-            'tan': '\\tan',
-            'exp': 'e^{',
-            'log': '\\ln',
-            'sqrt': '\\sqrt'
-        }
-        
-        latex_name = func_map.get(func_name, func_name)
-        
-        if func_name == 'exp':
-            return f'{latex_name}{arg_latex}}}'
-        elif func_name == 'sqrt':
-            return f'{latex_name}{{{arg_latex}}}'
+    parts: List[Any] = []
+    for i in range(start, len(factors)):
+        factor = factors[i]
+        if i > start:
+            parts.append(separators[i])
+        # 处理需要括号的情况
+        if _needs_parens(factor):
+            parts.extend(('\\left(', factor, '\\right)'))
         else:
-            return f'{latex_name}\\left({arg_latex}\\right)'
+            parts.append(factor)
+    return parts
+
+
+def _mul_separator(factor: Node) -> str:
+    """非首个因子前的连接符"""
+    # 负数、带括号的因子、数字和符号需要显式的乘号
+    if _needs_parens(factor) or isinstance(factor, (Number, Symbol)):
+        return ' \\cdot '
+    return ' '
+
+
+def _needs_parens(factor: Node) -> bool:
+    """乘法因子是否需要括号（负数不加括号）"""
+    return isinstance(factor, (Add, Pow, Function))
+
+
+def _pow_parts(node: Pow) -> List[Any]:
+    """幂次的LaTeX片段"""
+    base = node.base
+    exponent = node.exponent
     
+    # 处理底数需要括号的情况
+    if isinstance(base, (Add, Mul, Pow, Function)):
+        base_parts: List[Any] = ['\\left(', base, '\\right)']
     else:
-        return str(node)
+        base_parts = [base]
+    
+    # 处理数值指数
+    if isinstance(exponent, Number):
+        exp_val = exponent.value
+        if abs(exp_val - 0.5) < 1e-10:
+            return ['\\sqrt{', base, '}']
+        elif abs(exp_val + 0.5) < 1e-10:
+            return ['\\frac{1}{\\sqrt{', base, '}}']
+        elif exp_val < 0:
+            # 负指数：x^{-n} = 1/x^{n}
+            return ['\\frac{1}{', *base_parts, f'^{{{Number(-exp_val)}}}}}']
+    
+    # 处理分数形式的指数 1/n（解析为 Mul(1, Pow(n, -1))）
+    if isinstance(exponent, Mul) and len(exponent.factors) == 2:
+        numerator, denominator = exponent.factors
+        if (numerator == Number(1) and isinstance(denominator, Pow)
+                and isinstance(denominator.base, Number) and denominator.exponent == Number(-1)):
+            n = denominator.base.value
+            if n > 0 and n == int(n):
+                if n == 2:
+                    return ['\\sqrt{', base, '}']
+                return [f'\\sqrt[{int(n)}]{{', base, '}']
+    
+    return [*base_parts, '^{', exponent, '}']
+
+
+# 节点类型 -> LaTeX 片段，子节点保留为节点由 render 展开
+LATEX_PARTS = Dispatcher({
+    Number: lambda node: [str(node)],
+    Symbol: lambda node: [node.name],
+    Add: _add_parts,
+    Mul: _mul_parts,
+    Pow: _pow_parts,
+    Function: _function_parts,
+}, default=lambda node: [str(node)])
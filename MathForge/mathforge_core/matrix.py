@@ -0,0 +1,587 @@
+"""
+符号矩阵模块
+以 AST 节点为元素的稀疏矩阵（每行一个 {列号: 元素} 字典，零元素不存，与 systems
+模块的稀疏行相同）。行列式、LU 分解和求逆把全部元素化为同一组生成元上的整数系数
+多项式（见 factor 模块），用无分数的 Bareiss 消元计算，每一步的除法都是精确的；
+某一步不参与消元的行推迟缩放，带状和稀疏矩阵只处理非零元。
+矩阵乘积中结构相同的元素乘积只建一次节点，雅可比矩阵只对含该变量的表达式求导
+"""
+
+from operator import add, sub
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .ast import Node, Number, Symbol, Add, Mul, free_symbols, substitute
+from .calculus import diff
+from .simplify import simplify
+from .factor import (
+    _TooLarge, _generators, _rational, _quotient_node, _add, _exact_div, _gcd, _is_constant
+)
+from .groebner import Polynomial, _poly_mul
+from .traversal import _structure_key
+
+
+Entry = Union[Node, int, float]
+Row = Dict[int, Node]
+
+
+class Matrix:
+    """
+    符号矩阵
+    
+    元素为 AST 节点，按行稀疏存储。加减、数乘和矩阵乘积直接构造表达式（数值元素
+    当场合并），不做化简；需要时调用 simplify()。det、lu、inv 给出约分后的精确结果。
+    
+    Examples:
+        >>> x = Symbol('x')
+        >>> A = Matrix([[x, 1], [1, x]])
+        >>> A.det()  # x^2 - 1
+    """
+    
+    def __init__(self, rows: Sequence[Sequence[Entry]]):
+        """
+        Args:
+            rows: 二维列表（各行长度相同），元素为 AST 节点或数值
+            
+        Raises:
+            ValueError: 各行长度不同或元素类型不支持
+        """
+        rows = [list(row) for row in rows]
+        n_cols = len(rows[0]) if rows else 0
+        if any(len(row) != n_cols for row in rows):
+            raise ValueError("矩阵各行的长度必须相同")
+        self.shape = (len(rows), n_cols)
+        self._rows: List[Row] = []
+        for row in rows:
+            entries = (_entry(item) for item in row)
+            self._rows.append({j: item for j, item in enumerate(entries) if not _is_zero(item)})
+    
+    @classmethod
+    def _from_rows(cls, rows: List[Row], shape: Tuple[int, int]) -> 'Matrix':
+        """由稀疏行直接构造（不复制、不检查）"""
+        matrix = cls.__new__(cls)
+        matrix.shape = shape
+        matrix._rows = rows
+        return matrix
+    
+    @classmethod
+    def sparse(cls, shape: Tuple[int, int], entries: Dict[Tuple[int, int], Entry]) -> 'Matrix':
+        """由 {(行, 列): 元素} 构造稀疏矩阵，未给出的元素为零"""
+        n_rows, n_cols = shape
+        rows: List[Row] = [{} for _ in range(n_rows)]
+        for (i, j), item in entries.items():
+            if not (0 <= i < n_rows and 0 <= j < n_cols):
+                raise ValueError(f"元素位置 ({i}, {j}) 超出矩阵形状 {shape}")
+            item = _entry(item)
+            if not _is_zero(item):
+                rows[i][j] = item
+        return cls._from_rows(rows, (n_rows, n_cols))
+    
+    @classmethod
+    def zeros(cls, n_rows: int, n_cols: Optional[int] = None) -> 'Matrix':
+        """零矩阵（n_cols 省略时为方阵）"""
+        n_cols = n_rows if n_cols is None else n_cols
+        return cls._from_rows([{} for _ in range(n_rows)], (n_rows, n_cols))
+    
+    @classmethod
+    def identity(cls, n: int) -> 'Matrix':
+        """n 阶单位矩阵"""
+        return cls._from_rows([{i: Number(1)} for i in range(n)], (n, n))
+    
+    def __getitem__(self, key: Tuple[int, int]) -> Node:
+        i, j = key
+        n_rows, n_cols = self.shape
+        if i < 0:
+            i += n_rows
+        if j < 0:
+            j += n_cols
+        if not (0 <= i < n_rows and 0 <= j < n_cols):
+            raise IndexError(f"元素位置 {key} 超出矩阵形状 {self.shape}")
+        return self._rows[i].get(j, Number(0))
+    
+    def nonzeros(self) -> List[Tuple[Tuple[int, int], Node]]:
+        """非零元素列表 [((行, 列), 元素)]，按行列排序"""
+        return [((i, j), row[j]) for i, row in enumerate(self._rows) for j in sorted(row)]
+    
+    def tolist(self) -> List[List[Node]]:
+        """转为二维列表（零元素为 Number(0)）"""
+        zero = Number(0)
+        return [[row.get(j, zero) for j in range(self.shape[1])] for row in self._rows]
+    
+    @property
+    def T(self) -> 'Matrix':
+        """转置"""
+        rows: List[Row] = [{} for _ in range(self.shape[1])]
+        for i, row in enumerate(self._rows):
+            for j, item in row.items():
+                rows[j][i] = item
+        return Matrix._from_rows(rows, (self.shape[1], self.shape[0]))
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Matrix) and self.shape == other.shape and self._rows == other._rows
+    
+    __hash__ = None
+    
+    def __add__(self, other: 'Matrix') -> 'Matrix':
+        return self._combine(other, 1)
+    
+    def __sub__(self, other: 'Matrix') -> 'Matrix':
+        return self._combine(other, -1)
+    
+    def __neg__(self) -> 'Matrix':
+        return self * -1
+    
+    def __mul__(self, other: Union['Matrix', Entry]) -> 'Matrix':
+        """数乘；两个矩阵相乘时同 @"""
+        if isinstance(other, Matrix):
+            return self @ other
+        scalar = _entry(other)
+        products: Dict[Tuple[Any, Any], Node] = {}
+        rows = [{j: value for j, value in ((j, _product(item, scalar, products)) for j, item in row.items())
+                 if not _is_zero(value)} for row in self._rows]
+        return Matrix._from_rows(rows, self.shape)
+    
+    def __rmul__(self, other: Entry) -> 'Matrix':
+        return self * other
+    
+    def __matmul__(self, other: 'Matrix') -> 'Matrix':
+        """
+        矩阵乘积
+        
+        只遍历两个因子的非零元；结构相同的元素乘积（以及由相同乘积组成的和）
+        在整个乘积中只建一次节点，结果中重复的元素共用同一对象。
+        """
+        if self.shape[1] != other.shape[0]:
+            raise ValueError(f"矩阵形状不匹配: {self.shape} @ {other.shape}")
+        products: Dict[Tuple[Any, Any], Node] = {}
+        sums: Dict[Tuple[Any, ...], Node] = {}
+        rows: List[Row] = []
+        for row in self._rows:
+            terms: Dict[int, List[Node]] = {}
+            for k, a in row.items():
+                for j, b in other._rows[k].items():
+                    terms.setdefault(j, []).append(_product(a, b, products))
+            result: Row = {}
+            for j, items in terms.items():
+                value = _sum(items, sums)
+                if not _is_zero(value):
+                    result[j] = value
+            rows.append(result)
+        return Matrix._from_rows(rows, (self.shape[0], other.shape[1]))
+    
+    def applyfunc(self, func: Callable[[Node], Entry]) -> 'Matrix':
+        """对每个元素（包括零元素）应用 func"""
+        zero = Number(0)
+        return Matrix([[func(row.get(j, zero)) for j in range(self.shape[1])] for row in self._rows])
+    
+    def simplify(self) -> 'Matrix':
+        """逐元素化简（结构相同的元素只化简一次）"""
+        memo: Dict[Any, Node] = {}
+        return self._map_nonzero(lambda item: _simplified(item, memo))
+    
+    def substitute(self, substitutions: Dict[str, Entry]) -> 'Matrix':
+        """逐元素替换变量，值可以是表达式或数值"""
+        substitutions = {name: _entry(value) for name, value in substitutions.items()}
+        return self._map_nonzero(lambda item: substitute(item, substitutions))
+    
+    def diff(self, var: Union[str, Symbol]) -> 'Matrix':
+        """逐元素求导并化简（元素共享的子树只求一次导数）"""
+        var = var if isinstance(var, Symbol) else Symbol(var)
+        derivatives: Dict[Any, Node] = {}
+        memo: Dict[Any, Node] = {}
+        return self._map_nonzero(lambda item: _simplified(diff(item, var, derivatives), memo))
+    
+    def eval(self, values: Optional[Dict[str, float]] = None) -> List[List[float]]:
+        """数值求值，返回二维浮点数列表"""
+        result = []
+        for row in self._rows:
+            line = [0.0] * self.shape[1]
+            for j, item in row.items():
+                line[j] = item.eval(values)
+            result.append(line)
+        return result
+    
+    def det(self) -> Node:
+        """
+        行列式
+        
+        Bareiss 无分数消元，最后一个主元即（行缩放后矩阵的）行列式，再约去行分母。
+        
+        Raises:
+            ValueError: 不是方阵，或元素展开后次数过大
+        """
+        n = self._require_square("行列式")
+        generators, rows, scales, one = _polynomial_rows(self)
+        result = _bareiss(rows, n, one)
+        if result is None:
+            return Number(0)
+        pivots, _, sign = result
+        value = pivots[-1] if pivots else one
+        if sign < 0:
+            value = {m: -c for m, c in value.items()}
+        denominator = one
+        for scale in scales:
+            denominator = _mul(denominator, scale)
+        return _quotient(value, denominator, generators)
+    
+    def lu(self) -> Tuple['Matrix', 'Matrix', 'Matrix']:
+        """
+        LU 分解 P A = L U
+        
+        L 为单位下三角矩阵，U 为上三角矩阵，P 为置换矩阵。主元取该列非零元中
+        所在行非零元最少的一个（带状矩阵因此不产生填充）。
+        
+        Returns:
+            (P, L, U)
+            
+        Raises:
+            ValueError: 不是方阵、矩阵奇异，或元素展开后次数过大
+        """
+        n = self._require_square("LU 分解")
+        generators, rows, scales, one = _polynomial_rows(self)
+        lower: List[Dict[int, Polynomial]] = [{} for _ in range(n)]
+        result = _bareiss(rows, n, one, lower)
+        if result is None:
+            raise ValueError("矩阵奇异，没有 LU 分解")
+        pivots, order, _ = result
+        
+        # 消元前第 i 行乘上了 scales[i]：L[i][k] 乘以 d_k / d_i，U 的第 k 行除以 d_k
+        scale = [scales[i] for i in order]
+        l_rows: List[Row] = []
+        u_rows: List[Row] = []
+        for i in range(n):
+            l_row: Row = {i: Number(1)}
+            for k, value in lower[i].items():
+                l_row[k] = _quotient(_mul(value, scale[k]),
+                                     _mul(pivots[k], scale[i]), generators)
+            l_rows.append(l_row)
+            previous = _mul(pivots[i - 1] if i else one, scale[i])
+            u_rows.append({j: _quotient(value, previous, generators) for j, value in rows[i].items()})
+        p_rows: List[Row] = [{i: Number(1)} for i in order]
+        shape = (n, n)
+        return (Matrix._from_rows(p_rows, shape), Matrix._from_rows(l_rows, shape),
+                Matrix._from_rows(u_rows, shape))
+    
+    def inv(self) -> 'Matrix':
+        """
+        逆矩阵
+        
+        对 [A | I] 做 Bareiss 前向消元，再无分数回代求出 det·A⁻¹（各元素都是多项式，
+        回代中的除法是精确的），最后每个元素与行列式约分。
+        
+        Raises:
+            ValueError: 不是方阵、矩阵奇异，或元素展开后次数过大
+        """
+        n = self._require_square("逆矩阵")
+        generators, rows, scales, one = _polynomial_rows(self)
+        for i, row in enumerate(rows):
+            row[n + i] = one
+        result = _bareiss(rows, n, one)
+        if result is None:
+            raise ValueError("矩阵奇异，不可逆")
+        pivots = result[0]
+        if not pivots:
+            return Matrix._from_rows([], (0, 0))
+        determinant = pivots[-1]
+        
+        # 上三角方程组 U x = b 的第 k 行除以 p_{k-1} 后即普通消元的结果，
+        # 因此 y = det·x 满足 y_k = (det·b_k - Σ_{j>k} U_kj y_j) / p_k
+        solution: List[Dict[int, Polynomial]] = [{} for _ in range(n)]
+        for k in reversed(range(n)):
+            row = rows[k]
+            total = {c - n: _mul(determinant, value) for c, value in row.items() if c >= n}
+            for j, u in row.items():
+                if k < j < n:
+                    for c, y in solution[j].items():
+                        total[c] = _add(total.get(c, {}), _mul(u, y), -1)
+            solution[k] = {c: _divide(value, pivots[k], one) for c, value in total.items() if value}
+        
+        # A 的第 c 行乘上了 scales[c]，所以 A⁻¹ 的第 c 列要乘回 scales[c]
+        inverse: List[Row] = []
+        for y_row in solution:
+            inverse.append({c: _quotient(_mul(value, scales[c]), determinant, generators)
+                            for c, value in y_row.items()})
+        return Matrix._from_rows(inverse, (n, n))
+    
+    def to_latex(self) -> str:
+        """LaTeX 表示（pmatrix 环境）"""
+        from .latex import to_latex
+        lines = [" & ".join(to_latex(item) for item in row) for row in self.tolist()]
+        return "\\begin{pmatrix}" + " \\\\ ".join(lines) + "\\end{pmatrix}"
+    
+    def __str__(self) -> str:
+        return "Matrix([" + ", ".join(
+            "[" + ", ".join(str(item) for item in row) + "]" for row in self.tolist()) + "])"
+    
+    __repr__ = __str__
+    
+    def _combine(self, other: 'Matrix', sign: int) -> 'Matrix':
+        """self + sign * other"""
+        if self.shape != other.shape:
+            raise ValueError(f"矩阵形状不匹配: {self.shape} 与 {other.shape}")
+        products: Dict[Tuple[Any, Any], Node] = {}
+        negative = Number(-1)
+        rows: List[Row] = []
+        for a_row, b_row in zip(self._rows, other._rows):
+            row = dict(a_row)
+            for j, item in b_row.items():
+                if sign < 0:
+                    item = _product(negative, item, products)
+                value = _sum([row[j], item], {}) if j in row else item
+                if _is_zero(value):
+                    row.pop(j)
+                else:
+                    row[j] = value
+            rows.append(row)
+        return Matrix._from_rows(rows, self.shape)
+    
+    def _map_nonzero(self, func: Callable[[Node], Node]) -> 'Matrix':
+        """对非零元素应用保持零不变的 func"""
+        rows = [{j: value for j, value in ((j, func(item)) for j, item in row.items()) if not _is_zero(value)}
+                for row in self._rows]
+        return Matrix._from_rows(rows, self.shape)
+    
+    def _require_square(self, what: str) -> int:
+        if self.shape[0] != self.shape[1]:
+            raise ValueError(f"只有方阵才有{what}，矩阵形状为 {self.shape}")
+        return self.shape[0]
+
+
+def jacobian(exprs: Sequence[Node], variables: Sequence[Union[str, Symbol]]) -> Matrix:
+    """
+    向量函数的雅可比矩阵 J[i][j] = ∂exprs[i]/∂variables[j]
+    
+    只对含该变量的表达式求导，其余元素为零并按稀疏存储；对同一变量求导时，各表达式
+    共享的子树只求一次导数，结构相同的导数只化简一次。
+    
+    Args:
+        exprs: 表达式列表
+        variables: 变量（符号或符号名）列表
+        
+    Returns:
+        len(exprs) × len(variables) 的矩阵
+        
+    Raises:
+        ValueError: 变量重复
+        
+    Examples:
+        >>> jacobian([parse("x^2*y"), parse("sin(x) + y")], ['x', 'y'])
+        # Matrix([[2*x*y, x^2], [cos(x), 1]])
+    """
+    symbols = [v if isinstance(v, Symbol) else Symbol(v) for v in variables]
+    column = {symbol.name: j for j, symbol in enumerate(symbols)}
+    if len(column) != len(symbols):
+        raise ValueError("雅可比矩阵的变量不能重复")
+    derivatives: List[Dict[Any, Node]] = [{} for _ in symbols]
+    simplified: Dict[Any, Node] = {}
+    rows: List[Row] = []
+    for expr in exprs:
+        row: Row = {}
+        for name in free_symbols(expr):
+            j = column.get(name)
+            if j is None:
+                continue
+            value = _simplified(diff(expr, symbols[j], derivatives[j]), simplified)
+            if not _is_zero(value):
+                row[j] = value
+        rows.append(row)
+    return Matrix._from_rows(rows, (len(rows), len(symbols)))
+
+
+# ---------- 元素运算 ----------
+
+def _entry(value: Entry) -> Node:
+    if isinstance(value, Node):
+        return value
+    if isinstance(value, (int, float)):
+        return Number(value)
+    raise ValueError(f"矩阵元素必须是表达式或数值: {value!r}")
+
+
+def _is_zero(node: Node) -> bool:
+    return node.__class__ is Number and node.value == 0
+
+
+def _product(a: Node, b: Node, memo: Dict[Tuple[Any, Any], Node]) -> Node:
+    """
+    a * b：数值直接相乘、乘 1 省略，其余按结构记忆（结构相同的乘积共用节点）
+    
+    先按对象 id 查找（元素本身常常是共用的对象），查不到时才计算结构键。
+    memo 只在一次运算内使用，查找期间 a、b 都被矩阵引用，id 不会被复用。
+    """
+    if a.__class__ is Number:
+        if b.__class__ is Number:
+            return Number(a.value * b.value)
+        if a.value == 1:
+            return b
+    elif b.__class__ is Number and b.value == 1:
+        return a
+    product = memo.get((id(a), id(b)))
+    if product is None:
+        ka, kb = _structure_key(a), _structure_key(b)
+        key = (ka, kb) if ka <= kb else (kb, ka)
+        product = memo.get(key)
+        if product is None:
+            product = memo[key] = Mul(a, b)
+        memo[id(a), id(b)] = product
+    return product
+
+
+def _sum(items: List[Node], memo: Dict[Tuple[Any, ...], Node]) -> Node:
+    """各项之和：数值项合并为一个常数，由同一组（_product 共用的）项对象组成的和只建一次"""
+    constant = 0.0
+    terms: List[Node] = []
+    for item in items:
+        if item.__class__ is Number:
+            constant += item.value
+        else:
+            terms.append(item)
+    if constant or not terms:
+        terms.append(Number(constant))
+    if len(terms) == 1:
+        return terms[0]
+    key = tuple(sorted(map(id, terms)))
+    total = memo.get(key)
+    if total is None:
+        total = memo[key] = Add(*terms)
+    return total
+
+
+def _simplified(node: Node, memo: Dict[Any, Node]) -> Node:
+    key = _structure_key(node)
+    result = memo.get(key)
+    if result is None:
+        result = memo[key] = simplify(node)
+    return result
+
+
+# ---------- 多项式消元 ----------
+
+def _polynomial_rows(matrix: Matrix) -> Tuple[List[Node], List[Dict[int, Polynomial]], List[Polynomial], Polynomial]:
+    """
+    元素化为公共生成元上的整数系数多项式
+    
+    每行乘以该行各元素分母的最小公倍式，使整行都是多项式。
+    
+    Returns:
+        (生成元, 各行 {列号: 多项式}, 各行乘上的分母, 多项式 1)
+        
+    Raises:
+        ValueError: 元素分母为零或展开后次数过大
+    """
+    generators = _generators([item for row in matrix._rows for item in row.values()])
+    one: Polynomial = {(0,) * len(generators): 1}
+    memo: Dict[int, Tuple[Polynomial, Polynomial]] = {}
+    rows: List[Dict[int, Polynomial]] = []
+    scales: List[Polynomial] = []
+    for row in matrix._rows:
+        fractions = {}
+        for j, item in row.items():
+            try:
+                fractions[j] = _rational(item, generators, memo)
+            except _TooLarge:
+                raise ValueError(f"矩阵元素展开后次数过大: {item}")
+            except ZeroDivisionError:
+                raise ValueError(f"矩阵元素的分母为零: {item}")
+        common = one
+        for _, denominator in fractions.values():
+            common = _lcm(common, denominator)
+        rows.append({j: num if den == common else _mul(num, _exact_div(common, den))
+                     for j, (num, den) in fractions.items() if num})
+        scales.append(common)
+    return generators, rows, scales, one
+
+
+def _lcm(a: Polynomial, b: Polynomial) -> Polynomial:
+    if a == b:
+        return a
+    return _mul(a, _exact_div(b, _gcd(a, b)))
+
+
+def _mul(p: Polynomial, q: Polynomial) -> Polynomial:
+    """p * q（两个单项式相乘不经过一般的多项式乘法，数值矩阵的消元全是这种情况）"""
+    if len(p) == 1 and len(q) == 1:
+        (m, a), = p.items()
+        (n, b), = q.items()
+        return {tuple(map(add, m, n)): a * b}
+    return _poly_mul(p, q, None)
+
+
+def _divide(p: Polynomial, q: Polynomial, one: Polynomial) -> Polynomial:
+    """p / q（Bareiss 消元和回代中的除法总是精确的）"""
+    if q == one:
+        return p
+    if len(p) == 1 and len(q) == 1:
+        (m, a), = p.items()
+        (n, b), = q.items()
+        return {tuple(map(sub, m, n)): a // b}
+    return _exact_div(p, q)
+
+
+def _quotient(numerator: Polynomial, denominator: Polynomial, generators: List[Node]) -> Node:
+    """numerator / denominator 约分后转为表达式（分母为常数时不求最大公因式）"""
+    return _quotient_node(numerator, denominator, generators, reduce=not _is_constant(denominator))
+
+
+def _bareiss(rows: List[Dict[int, Polynomial]], n: int, one: Polynomial,
+             lower: Optional[List[Dict[int, Polynomial]]] = None
+             ) -> Optional[Tuple[List[Polynomial], List[int], int]]:
+    """
+    对前 n 列做 Bareiss 无分数消元（原地修改 rows）
+    
+    消元后第 k 行是它作为主元行时（第 k-1 步之后）的值，第 k 个主元 p_k 是
+    前 k+1 阶顺序主子式，新元素 (p_k·a_ij - a_ik·a_kj) / p_{k-1} 总是多项式。
+    第 k 列为零的行在这一步只是整体乘以 p_k / p_{k-1}，这一缩放推迟到该行
+    下次参与消元时一次完成：从第 s 步补到第 t 步只需乘以 p_t / p_s。
+    lower 不为 None 时记录每行被消去的元素 {k: a_ik}（随行交换），供 LU 分解使用。
+    
+    Returns:
+        (主元列表, 各位置上的原始行号, 行交换的符号)；矩阵奇异时返回 None
+    """
+    order = list(range(len(rows)))
+    stage = [-1] * len(rows)
+    pivots: List[Polynomial] = []
+    sign = 1
+    
+    def catch_up(i: int, target: int) -> None:
+        s = stage[i]
+        if s < target:
+            start = pivots[s] if s >= 0 else one
+            rows[i] = {j: _divide(_mul(value, pivots[target]), start, one)
+                       for j, value in rows[i].items()}
+            stage[i] = target
+    
+    swapped = [rows, order, stage] + ([lower] if lower is not None else [])
+    for k in range(n):
+        candidates = [i for i in range(k, len(rows)) if k in rows[i]]
+        if not candidates:
+            return None
+        best = min(candidates, key=lambda i: (len(rows[i]), len(rows[i][k])))
+        if best != k:
+            for items in swapped:
+                items[k], items[best] = items[best], items[k]
+            sign = -sign
+        catch_up(k, k - 1)
+        previous = pivots[-1] if pivots else one
+        pivot_row = rows[k]
+        pivot = pivot_row[k]
+        pivots.append(pivot)
+        for i in range(k + 1, len(rows)):
+            if k not in rows[i]:
+                continue
+            catch_up(i, k - 1)
+            row = rows[i]
+            factor = row.pop(k)
+            if lower is not None:
+                lower[i][k] = factor
+            updated: Dict[int, Polynomial] = {}
+            for j in row.keys() | pivot_row.keys():
+                if j == k:
+                    continue
+                value = _mul(pivot, row[j]) if j in row else {}
+                if j in pivot_row:
+                    value = _add(value, _mul(factor, pivot_row[j]), -1)
+                if value:
+                    updated[j] = _divide(value, previous, one)
+            rows[i] = updated
+            stage[i] = k
+    return pivots, order, sign
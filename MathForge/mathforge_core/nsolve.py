@@ -0,0 +1,225 @@
+"""
+数值求根模块
+在区间上求方程的全部实根：采样找出有根区间后用 Brent 法精化，
+不变号的根（偶数重根）用牛顿法从 |f| 的局部极小点出发求得。
+安装 numpy 时先用分层的向量化区间求值剪掉不可能有零点的格子，
+只在剩下的格子附近取样
+"""
+
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .ast import Node, Symbol
+from .calculus import diff
+from .simplify import simplify
+from .codegen import compile_function
+from .interval import eval_intervals
+
+try:
+    import numpy as np
+except ImportError:  # numpy 可选，缺失时不做区间剪枝
+    np = None
+
+
+# 默认求根区间与采样点数
+DEFAULT_INTERVAL = (-10.0, 10.0)
+DEFAULT_SAMPLES = 2000
+
+# 区间剪枝时每个格子每轮切分的份数
+_BRANCHING = 16
+
+
+def nsolve(equation: Node, var: Symbol, interval: Tuple[float, float] = DEFAULT_INTERVAL,
+           samples: int = DEFAULT_SAMPLES, tol: float = 1e-12) -> List[float]:
+    """
+    数值求解方程 equation = 0 在区间内的全部实根
+    
+    方程和（需要时）由 calculus.diff 得到的导数都编译为Python函数后再求值。
+    
+    Args:
+        equation: 方程表达式（已移项，等于0）
+        var: 要求解的变量
+        interval: 搜索区间 (a, b)
+        samples: 区间上的采样点数，决定能分辨的最小根间距
+        tol: 根的相对精度
+        
+    Returns:
+        升序的实根列表
+    """
+    a, b = interval
+    if not a < b:
+        raise ValueError(f"无效的求根区间: {interval}")
+    
+    f = _safe(compile_function(equation, [var.name]))
+    df = None  # 导数只在需要牛顿法时才求
+    
+    xs = [a + (b - a) * i / samples for i in range(samples + 1)]
+    ys: Dict[int, Optional[float]] = {}
+    
+    def y(i: int) -> Optional[float]:
+        if i not in ys:
+            ys[i] = f(xs[i])
+        return ys[i]
+    
+    cells = _candidate_cells(equation, var, xs)
+    if cells is None:
+        cells = range(samples)
+        probe = range(samples + 1)
+    else:
+        # 只在可能有零点的格子附近求值，函数值的典型大小用稀疏采样估计
+        probe = range(0, samples + 1, max(1, samples // 64))
+    finite = sorted(abs(value) for value in map(y, probe) if value is not None)
+    scale = max(1.0, finite[len(finite) // 2]) if finite else 1.0
+    
+    # 格子 i 内的变号，以及点 x_i（格子 i-1 与 i 之间）处的局部极小
+    indices = sorted({j for i in cells for j in (i, i + 1) if j < samples})
+    roots: List[float] = []
+    for i in indices:
+        x0, x1, y0, y1 = xs[i], xs[i + 1], y(i), y(i + 1)
+        if y0 is None or y1 is None:
+            continue
+        if y0 == 0:
+            roots.append(x0)
+        elif y0 * y1 < 0:
+            root = _brent(f, x0, x1, y0, y1, tol)
+            if root is not None:
+                roots.append(root)
+        elif i > 0 and y(i - 1) is not None and abs(y0) <= abs(y(i - 1)) and abs(y0) <= abs(y1):
+            # |f| 的局部极小点：可能是不变号的重根
+            if df is None:
+                df = _safe(compile_function(simplify(diff(equation, var)), [var.name]))
+            root = _newton(f, df, x0, xs[i - 1], x1, tol)
+            if root is not None:
+                roots.append(root)
+    if y(samples) == 0:
+        roots.append(xs[-1])
+    
+    # 排除极点等伪根：根处的函数值必须远小于区间上的典型值
+    accepted = []
+    for root in sorted(roots):
+        value = f(root)
+        if value is None or abs(value) > 1e-8 * scale:
+            continue
+        if accepted and abs(root - accepted[-1]) <= 1e-9 * max(1.0, abs(root)):
+            continue
+        accepted.append(root)
+    return accepted
+
+
+def _candidate_cells(equation: Node, var: Symbol, xs: List[float]) -> Optional[List[int]]:
+    """
+    分层区间剪枝：从整个区间开始，每轮把可能含零点的格子切成至多
+    _BRANCHING 份并对全部子格子做一次向量化区间求值，直到单个采样格子
+    
+    Returns:
+        可能含零点的采样格子下标（格子 i 为 [x_i, x_(i+1)]）；
+        没有 numpy 或表达式无法做区间求值时返回 None
+    """
+    if np is None:
+        return None
+    edges = np.asarray(xs)
+    starts = np.array([0])
+    stops = np.array([len(xs) - 1])
+    split = np.arange(_BRANCHING + 1)
+    while True:
+        try:
+            lo, hi = eval_intervals(equation, {var.name: (edges[starts], edges[stops])})
+        except ValueError:
+            return None
+        # 区间含0才保留（空区间的 nan 比较为假，定义域外的格子被剪掉）
+        keep = (lo <= 0) & (hi >= 0)
+        starts, stops = starts[keep], stops[keep]
+        if starts.size == 0 or (stops - starts).max() == 1:
+            return starts.tolist()
+        bounds = starts[:, None] + ((stops - starts)[:, None] * split) // _BRANCHING
+        nonempty = bounds[:, 1:] > bounds[:, :-1]
+        starts, stops = bounds[:, :-1][nonempty], bounds[:, 1:][nonempty]
+
+
+def _safe(function: Callable[[float], float]) -> Callable[[float], Optional[float]]:
+    """包装编译后的函数：定义域错误、溢出和复数结果返回 None"""
+    def evaluate(x: float) -> Optional[float]:
+        try:
+            y = function(x)
+        except (ValueError, ArithmeticError):
+            return None
+        if isinstance(y, complex) or not math.isfinite(y):
+            return None
+        return y
+    return evaluate
+
+
+def _brent(f: Callable[[float], Optional[float]], a: float, b: float,
+           fa: float, fb: float, tol: float, max_iterations: int = 100) -> Optional[float]:
+    """Brent 法在有根区间 [a, b] 内求根（反二次插值 + 割线 + 二分）"""
+    if abs(fa) < abs(fb):
+        a, b, fa, fb = b, a, fb, fa
+    c, fc = a, fa
+    d = e = b - a
+    
+    for _ in range(max_iterations):
+        if fb == 0:
+            return b
+        if fa * fb > 0:
+            a, fa = c, fc
+            d = e = b - a
+        if abs(fa) < abs(fb):
+            c, fc = b, fb
+            b, fb = a, fa
+            a, fa = c, fc
+        
+        tol1 = 2 * 2.2e-16 * abs(b) + 0.5 * tol * max(1.0, abs(b))
+        m = 0.5 * (a - b)
+        if abs(m) <= tol1:
+            return b
+        
+        if abs(e) >= tol1 and abs(fc) > abs(fb):
+            s = fb / fc
+            if c == a:
+                # 割线
+                p = 2 * m * s
+                q = 1 - s
+            else:
+                # 反二次插值
+                q = fc / fa
+                r = fb / fa
+                p = s * (2 * m * q * (q - r) - (b - c) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * m * q - abs(tol1 * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+        
+        c, fc = b, fb
+        b += d if abs(d) > tol1 else math.copysign(tol1, m)
+        fb = f(b)
+        if fb is None:
+            return None
+    
+    return b
+
+
+def _newton(f: Callable[[float], Optional[float]], df: Callable[[float], Optional[float]],
+            x: float, lo: float, hi: float, tol: float, max_iterations: int = 50) -> Optional[float]:
+    """从 x 出发的牛顿迭代，离开 [lo, hi] 则放弃"""
+    for _ in range(max_iterations):
+        y = f(x)
+        slope = df(x)
+        if y is None or slope is None:
+            return None
+        if y == 0:
+            return x
+        if slope == 0:
+            return None
+        step = y / slope
+        x -= step
+        if not lo <= x <= hi:
+            return None
+        if abs(step) <= tol * max(1.0, abs(x)):
+            return x
+    return x
@@ -5,7 +5,7 @@
 
 import re
 from typing import List, Optional
-from .ast import Node, Symbol, Number, Add, Mul, Pow, Function, Sin, Cos, Tan, Exp, Log, Sqrt
+from .ast import Node, Symbol, Number, Add, Mul, Pow, Function, Sin, Cos, Tan, Exp, Log, Sqrt, Atan
 
 
 class Token:
@@ -35,9 +35,14 @@ class Lexer:
         (r',', 'COMMA'),
     ]
     
+    # 全部模式合并成一个正则（按 TOKEN_PATTERNS 的顺序尝试），类定义时编译一次
+    TOKEN_REGEX = re.compile('|'.join(f'(?P<{token_type or "SKIP"}>{pattern})'
+                                      for pattern, token_type in TOKEN_PATTERNS))
+    
     FUNCTION_NAMES = {
         'sin': Sin, 'cos': Cos, 'tan': Tan,
-        'exp': Exp, 'log': Log, 'sqrt': Sqrt
+        'exp': Exp, 'log': Log, 'sqrt': Sqrt,
+        'atan': Atan
     }
     
     def __init__(self, text: str):
@@ -48,19 +53,12 @@ class Lexer:
     def tokenize(self) -> List[Token]:
         """词法分析"""
         while self.pos < len(self.text):
-            matched = False
-            for pattern, token_type in self.TOKEN_PATTERNS:
-                regex = re.compile(pattern)
-                match = regex.match(self.text, self.pos)
-                if match:
-                    if token_type:  # 忽略空白字符
-                        self.tokens.append(Token(token_type, match.group()))
-                    self.pos = match.end()
-                    matched = True
-                    break
-            
-            if not matched:
+            match = self.TOKEN_REGEX.match(self.text, self.pos)
+            if not match:
                 raise ValueError(f"无法识别的字符: {self.text[self.pos]}")
+            if match.lastgroup != 'SKIP':  # 忽略空白字符
+                self.tokens.append(Token(match.lastgroup, match.group()))
+            self.pos = match.end()
         
         return self.tokens
 
@@ -0,0 +1,670 @@
+"""
+单变量多项式模块
+从AST提取系数，并求多项式的全部实根
+"""
+
+import cmath
+import math
+from fractions import Fraction
+from typing import List, Dict, Optional
+
+from .ast import Node, Number, Symbol, Add, Mul, Pow, Function, children
+from .traversal import Dispatcher, fold
+
+try:
+    import numpy as np
+except ImportError:  # numpy 可选，缺失时使用纯 Python 的 Aberth 迭代
+    np = None
+
+
+# 指数上限，防止 (x+1)^100000 之类的输入展开过大
+MAX_DEGREE = 10000
+
+# 有理根搜索中分子/分母候选数的上限
+MAX_RATIONAL_CANDIDATES = 5000
+
+# 用于快速排除有理根候选的素数
+_SIEVE_PRIMES = (1000003, 1000033, 1000037)
+
+
+def poly_coefficients(node: Node, var: Symbol) -> Optional[List[float]]:
+    """
+    提取多项式的系数（一次性展开，显式栈遍历）
+    
+    Args:
+        node: AST节点
+        var: 多项式变量
+        
+    Returns:
+        系数列表（从常数项到最高次项，已去掉最高次的零系数）；
+        如果表达式不是数值系数的多项式，返回 None
+    """
+    results: Dict[int, Dict[int, float]] = {}
+    stack = [(node, False)]
+    
+    while stack:
+        current, ready = stack.pop()
+        if id(current) in results:
+            continue
+        
+        if isinstance(current, (Add, Mul, Pow)) and not ready:
+            stack.append((current, True))
+            if isinstance(current, Pow):
+                stack.append((current.base, False))
+            else:
+                children = current.terms if isinstance(current, Add) else current.factors
+                stack.extend((child, False) for child in children)
+            continue
+        
+        terms = _poly_terms(current, var, results)
+        if terms is None:
+            return None
+        results[id(current)] = terms
+    
+    terms = results[id(node)]
+    degree = max((d for d, c in terms.items() if c != 0), default=0)
+    return [terms.get(d, 0.0) for d in range(degree + 1)]
+
+
+def _poly_terms(node: Node, var: Symbol, results: Dict[int, Dict[int, float]]) -> Optional[Dict[int, float]]:
+    """计算单个节点的 {次数: 系数}，子节点结果已在 results 中"""
+    if isinstance(node, Number):
+        return {0: node.value}
+    
+    if isinstance(node, Symbol):
+        if node == var:
+            return {1: 1.0}
+        return None
+    
+    if isinstance(node, Add):
+        total: Dict[int, float] = {}
+        for term in node.terms:
+            for d, c in results[id(term)].items():
+                total[d] = total.get(d, 0.0) + c
+        return total
+    
+    if isinstance(node, Mul):
+        product: Dict[int, float] = {0: 1.0}
+        for factor in node.factors:
+            product = _poly_mul(product, results[id(factor)])
+        return product
+    
+    if isinstance(node, Pow):
+        base = results[id(node.base)]
+        exponent = _constant_value(node.exponent)
+        if exponent is None:
+            return None
+        if len(base) == 1 and 0 in base:
+            # 常数的任意次幂（负数的分数次幂等结果为复数或非有限值时不是实系数多项式）
+            try:
+                value = base[0] ** exponent
+            except (ArithmeticError, ValueError):
+                return None
+            if isinstance(value, complex) or not math.isfinite(value):
+                return None
+            return {0: value}
+        if exponent < 0 or exponent != int(exponent) or exponent > MAX_DEGREE:
+            return None
+        result: Dict[int, float] = {0: 1.0}
+        power = base
+        n = int(exponent)
+        while n:
+            if n & 1:
+                result = _poly_mul(result, power)
+            n >>= 1
+            if n:
+                power = _poly_mul(power, power)
+        if max(result) > MAX_DEGREE:
+            return None
+        return result
+    
+    # 函数等节点：只接受不含变量的常数
+    value = _constant_value(node)
+    if value is None:
+        return None
+    return {0: value}
+
+
+def poly_coefficient_nodes(node: Node, var: Symbol) -> Optional[List[Node]]:
+    """
+    提取多项式的符号系数（系数可以含其他符号）
+    
+    Args:
+        node: AST节点
+        var: 多项式变量
+        
+    Returns:
+        系数表达式列表（从常数项到最高次项，未化简）；
+        如果表达式不是 var 的多项式，返回 None
+    """
+    # 子表达式不含 var 时记为 None，否则记为 {次数: [系数项]}
+    results: Dict[int, Optional[Dict[int, List[Node]]]] = {}
+    stack = [(node, False)]
+    
+    while stack:
+        current, ready = stack.pop()
+        if id(current) in results:
+            continue
+        kids = children(current)
+        if kids and not ready:
+            stack.append((current, True))
+            stack.extend((kid, False) for kid in kids)
+            continue
+        
+        if current == var:
+            results[id(current)] = {1: [Number(1)]}
+        elif all(results[id(kid)] is None for kid in kids):
+            results[id(current)] = None
+        else:
+            terms = _symbolic_terms(current, results)
+            if terms is None:
+                return None
+            results[id(current)] = terms
+    
+    terms = results[id(node)] or {0: [node]}
+    degree = max(terms)
+    return [_sum(terms.get(d, [])) for d in range(degree + 1)]
+
+
+def _symbolic_terms(node: Node, results: Dict[int, Optional[Dict[int, List[Node]]]]) -> Optional[Dict[int, List[Node]]]:
+    """计算含变量节点的 {次数: [系数项]}，子节点结果已在 results 中"""
+    def terms_of(child: Node) -> Dict[int, List[Node]]:
+        return results[id(child)] or {0: [child]}
+    
+    if isinstance(node, Add):
+        total: Dict[int, List[Node]] = {}
+        for term in node.terms:
+            for d, coefs in terms_of(term).items():
+                total.setdefault(d, []).extend(coefs)
+        return total
+    
+    if isinstance(node, Mul):
+        product: Dict[int, List[Node]] = {0: [Number(1)]}
+        for factor in node.factors:
+            product = _symbolic_mul(product, terms_of(factor))
+        return product
+    
+    if isinstance(node, Pow) and results[id(node.exponent)] is None and isinstance(node.exponent, Number):
+        exponent = node.exponent.value
+        if exponent < 0 or exponent != int(exponent) or exponent > MAX_DEGREE:
+            return None
+        power: Dict[int, List[Node]] = {0: [Number(1)]}
+        for _ in range(int(exponent)):
+            power = _symbolic_mul(power, terms_of(node.base))
+        return power
+    
+    # 函数的参数含变量、指数含变量等情况
+    return None
+
+
+def _symbolic_mul(a: Dict[int, List[Node]], b: Dict[int, List[Node]]) -> Dict[int, List[Node]]:
+    """系数为表达式的多项式乘法"""
+    product: Dict[int, List[Node]] = {}
+    for da, ca in a.items():
+        for db, cb in b.items():
+            product.setdefault(da + db, []).append(Mul(_sum(ca), _sum(cb)))
+    return product
+
+
+def _sum(terms: List[Node]) -> Node:
+    """项列表求和（空列表为0）"""
+    if not terms:
+        return Number(0)
+    if len(terms) == 1:
+        return terms[0]
+    return Add(*terms)
+
+
+def _poly_mul(a: Dict[int, float], b: Dict[int, float]) -> Dict[int, float]:
+    """稀疏多项式乘法"""
+    product: Dict[int, float] = {}
+    for da, ca in a.items():
+        if ca == 0:
+            continue
+        for db, cb in b.items():
+            product[da + db] = product.get(da + db, 0.0) + ca * cb
+    return product
+
+
+def _unbound_symbol(node: Symbol, results: List[float]) -> float:
+    raise ValueError(f"常数求值中出现变量 {node.name}")
+
+
+def _constant_product(node: Mul, results: List[float]) -> float:
+    product = 1.0
+    for value in results:
+        product *= value
+    return product
+
+
+# 不含变量的表达式的浮点求值（显式栈，不受深度限制；遇到变量时报错）
+_CONSTANT_VALUE = Dispatcher({
+    Number: lambda node, results: node.value,
+    Symbol: _unbound_symbol,
+    Add: lambda node, results: sum(results),
+    Mul: _constant_product,
+    Pow: lambda node, results: results[0] ** results[1],
+    Function: lambda node, results: node._eval_func(results[0]),
+})
+
+
+def _constant_value(node: Node) -> Optional[float]:
+    """对不含变量的子表达式求值，含变量或无法求值时返回 None"""
+    try:
+        value = fold(node, _CONSTANT_VALUE)
+    except (ValueError, ArithmeticError, TypeError):
+        return None
+    if isinstance(value, complex) or not math.isfinite(value):
+        return None
+    return value
+
+
+def real_roots(coeffs: List[float]) -> List[float]:
+    """
+    求多项式的全部实根（去重，升序）
+    
+    先去掉零根，系数可化为有理数时用有理根定理精确求出有理根并降次，
+    剩余部分模素数判定有重根时再做无平方分解（Yun 算法），只对没有重根的因式求根，
+    避免重根处数值方法的精度损失；每个因式次数不超过2时使用求根公式，否则使用数值方法
+    （有 numpy 时用友矩阵特征值，否则用 Aberth-Ehrlich 迭代）并用牛顿法精化。
+    
+    Args:
+        coeffs: 系数列表（从常数项到最高次项）
+        
+    Returns:
+        实根列表
+    """
+    coeffs = list(coeffs)
+    while coeffs and abs(coeffs[-1]) < 1e-14:
+        coeffs.pop()
+    if len(coeffs) < 2:
+        return []
+    
+    roots: List[float] = []
+    
+    # 零根：x^k 因子
+    if abs(coeffs[0]) < 1e-14:
+        roots.append(0.0)
+        while abs(coeffs[0]) < 1e-14:
+            coeffs.pop(0)
+    
+    int_coeffs = _integer_coefficients(coeffs)
+    if int_coeffs is not None:
+        rational, int_coeffs = _rational_roots(int_coeffs)
+        roots.extend(float(r) for r in rational)
+        if _modular_square_free(int_coeffs):
+            roots.extend(_remaining_real_roots(_to_float(int_coeffs)))
+        else:
+            for factor, _ in _square_free([Fraction(c) for c in int_coeffs]):
+                roots.extend(_remaining_real_roots([float(c) for c in factor]))
+    else:
+        roots.extend(_remaining_real_roots(coeffs))
+    return _dedupe(roots)
+
+
+def _integer_coefficients(coeffs: List[float]) -> Optional[List[int]]:
+    """把系数化为互素的整数系数，无法精确化为小分母有理数时返回 None"""
+    fractions = []
+    for c in coeffs:
+        f = Fraction(c).limit_denominator(10 ** 6)
+        if abs(float(f) - c) > 1e-12 * max(1.0, abs(c)):
+            return None
+        fractions.append(f)
+    
+    lcm = 1
+    for f in fractions:
+        lcm = lcm * f.denominator // math.gcd(lcm, f.denominator)
+    ints = [int(f * lcm) for f in fractions]
+    
+    content = 0
+    for c in ints:
+        content = math.gcd(content, c)
+    return [c // content for c in ints]
+
+
+def _rational_roots(coeffs: List[int]):
+    """
+    有理根定理：p 整除常数项，q 整除首项系数
+    
+    候选先用 f(1)、f(-1) 的整除性以及若干素数模下的取值筛选，
+    通过后再做精确验证，每找到一个根就精确降次（重根重复除）。
+    
+    Returns:
+        (有理根列表, 降次后的整数系数)
+    """
+    found: List[Fraction] = []
+    if len(coeffs) < 2 or coeffs[0] == 0:
+        return found, coeffs
+    
+    a0, an = abs(coeffs[0]), abs(coeffs[-1])
+    numerators = _divisors(a0)
+    denominators = _divisors(an)
+    if numerators is None or denominators is None:
+        return found, coeffs
+    if len(numerators) * len(denominators) > MAX_RATIONAL_CANDIDATES:
+        return found, coeffs
+    
+    bound = _cauchy_bound(coeffs)
+    candidates = set()
+    for q in denominators:
+        for p in numerators:
+            if math.gcd(p, q) == 1 and p <= bound * q:
+                candidates.add(Fraction(p, q))
+                candidates.add(Fraction(-p, q))
+    
+    for root in sorted(candidates):
+        while len(coeffs) > 1 and _is_root(coeffs, root):
+            found.append(root)
+            coeffs = _deflate(coeffs, root)
+        if len(coeffs) <= 1:
+            break
+    
+    return found, coeffs
+
+
+def _divisors(n: int) -> Optional[List[int]]:
+    """n 的全部正因子，n 过大时返回 None"""
+    if n > 10 ** 12:
+        return None
+    small, large = [], []
+    d = 1
+    while d * d <= n:
+        if n % d == 0:
+            small.append(d)
+            if d * d != n:
+                large.append(n // d)
+        d += 1
+    return small + large[::-1]
+
+
+def _cauchy_bound(coeffs: List[int]) -> float:
+    """Cauchy 根界：所有根满足 |x| <= 1 + max|a_i / a_n|"""
+    an = abs(coeffs[-1])
+    return 1 + max(abs(c) for c in coeffs[:-1]) / an
+
+
+def _is_root(coeffs: List[int], root: Fraction) -> bool:
+    """判断 p/q 是否为整数系数多项式的根"""
+    p, q = root.numerator, root.denominator
+    
+    # 筛选：(p - q) | f(1)，(p + q) | f(-1)
+    f1 = sum(coeffs)
+    fm1 = sum(c if i % 2 == 0 else -c for i, c in enumerate(coeffs))
+    if (p - q != 0 and f1 % (p - q) != 0) or (p + q != 0 and fm1 % (p + q) != 0):
+        return False
+    
+    # 模素数筛选
+    for prime in _SIEVE_PRIMES:
+        if q % prime == 0:
+            continue
+        x = p * pow(q, -1, prime) % prime
+        acc = 0
+        for c in reversed(coeffs):
+            acc = (acc * x + c) % prime
+        if acc:
+            return False
+    
+    # 精确验证：q^n f(p/q) = sum a_i p^i q^(n-i)
+    acc = 0
+    q_power = 1
+    for c in reversed(coeffs):
+        acc = acc * p + c * q_power
+        q_power *= q
+    return acc == 0
+
+
+def _modular_square_free(coeffs: List[int]) -> bool:
+    """
+    模素数判定整数系数多项式无重因式：p 不整除首项系数时，f 的重因式 g^2 模 p 后
+    仍是次数不变的重因式，因此 gcd(f mod p, f' mod p) = 1 即可断定 f 无平方
+    （反之不成立，返回 False 时交给有理系数的 Yun 算法）
+    """
+    for prime in _SIEVE_PRIMES:
+        if coeffs[-1] % prime == 0:
+            continue
+        f = [c % prime for c in coeffs]
+        g = _modular_trim([i * f[i] % prime for i in range(1, len(f))])
+        while g:
+            f, g = g, _modular_remainder(f, g, prime)
+        return len(f) == 1
+    return False
+
+
+def _modular_trim(coeffs: List[int]) -> List[int]:
+    while coeffs and coeffs[-1] == 0:
+        coeffs.pop()
+    return coeffs
+
+
+def _modular_remainder(a: List[int], b: List[int], prime: int) -> List[int]:
+    """模素数的多项式余式（b 的首项系数非零）"""
+    remainder = list(a)
+    inverse = pow(b[-1], -1, prime)
+    for k in range(len(remainder) - len(b), -1, -1):
+        q = remainder[k + len(b) - 1] * inverse % prime
+        if q:
+            for i, c in enumerate(b):
+                remainder[k + i] = (remainder[k + i] - q * c) % prime
+    return _modular_trim(remainder[:len(b) - 1])
+
+
+def _deflate(coeffs: List[int], root: Fraction) -> List[int]:
+    """整数系数多项式除以 (q*x - p)，商仍为整数系数（Gauss 引理）"""
+    # 综合除法除以 (x - p/q)，商再除以 q
+    n = len(coeffs) - 1
+    quotient: List[Fraction] = [Fraction(0)] * n
+    acc = Fraction(0)
+    for i in range(n, 0, -1):
+        acc = coeffs[i] + acc * root
+        quotient[i - 1] = acc
+    q = root.denominator
+    return [int(c / q) for c in quotient]
+
+
+def _to_float(coeffs: List[int]) -> List[float]:
+    """整数系数转为浮点系数（按首项系数缩放，避免溢出）"""
+    lead = Fraction(coeffs[-1])
+    return [float(Fraction(c) / lead) for c in coeffs]
+
+
+def _remaining_real_roots(coeffs: List[float]) -> List[float]:
+    """求（已去掉有理根的）多项式的实根"""
+    degree = len(coeffs) - 1
+    if degree < 1:
+        return []
+    if degree == 1:
+        return [-coeffs[0] / coeffs[1]]
+    if degree == 2:
+        c, b, a = coeffs
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0:
+            return []
+        sqrt_disc = math.sqrt(discriminant)
+        # 数值稳定的求根公式
+        q = -0.5 * (b + math.copysign(sqrt_disc, b))
+        if q == 0:
+            return [0.0]
+        return [q / a, c / q]
+    
+    roots = []
+    for z in _numeric_roots(coeffs):
+        if abs(z.imag) <= 1e-7 * max(1.0, abs(z)):
+            roots.append(_newton_polish(coeffs, z.real))
+    return roots
+
+
+def _numeric_roots(coeffs: List[float]) -> List[complex]:
+    """多项式的全部复根"""
+    if np is not None:
+        return [complex(z) for z in np.roots(coeffs[::-1])]
+    return _aberth(coeffs)
+
+
+def _aberth(coeffs: List[float], max_iterations: int = 500, tol: float = 1e-14) -> List[complex]:
+    """Aberth-Ehrlich 同时迭代求全部复根"""
+    n = len(coeffs) - 1
+    lead = coeffs[-1]
+    monic = [c / lead for c in coeffs]
+    derivative = [i * monic[i] for i in range(1, n + 1)]
+    reversed_monic = monic[::-1]
+    reversed_derivative = [i * reversed_monic[i] for i in range(1, n + 1)]
+    
+    # 初值：半径取 |a_0|^(1/n) 的圆上错开角度的点
+    radius = max(abs(monic[0]) ** (1.0 / n), 1e-3)
+    z = [radius * cmath.exp(1j * (2 * math.pi * k / n + 0.4)) for k in range(n)]
+    
+    for _ in range(max_iterations):
+        converged = True
+        for i in range(n):
+            zi = z[i]
+            ratio = _newton_ratio(monic, derivative, reversed_monic, reversed_derivative, zi)
+            if ratio is None:
+                continue
+            s = 0j
+            for j in range(n):
+                if j != i:
+                    diff = zi - z[j]
+                    if diff != 0:
+                        s += 1 / diff
+            denominator = 1 - ratio * s
+            w = ratio / denominator if denominator != 0 else ratio
+            z[i] = zi - w
+            if abs(w) > tol * max(1.0, abs(z[i])):
+                converged = False
+        if converged:
+            break
+    
+    return z
+
+
+def _newton_ratio(monic, derivative, reversed_monic, reversed_derivative, z: complex) -> Optional[complex]:
+    """计算 p(z)/p'(z)；|z|>1 时用反转多项式避免溢出"""
+    n = len(monic) - 1
+    if abs(z) <= 1:
+        p = _horner(monic, z)
+        dp = _horner(derivative, z)
+        if p == 0:
+            return None
+        return p / dp if dp != 0 else None
+    
+    # p(z) = z^n r(1/z)，p'(z)/p(z) = (n - y r'(y)/r(y)) / z，其中 y = 1/z
+    y = 1 / z
+    r = _horner(reversed_monic, y)
+    if r == 0:
+        return None
+    dr = _horner(reversed_derivative, y)
+    denominator = n - y * dr / r
+    return z / denominator if denominator != 0 else None
+
+
+def _horner(coeffs, x):
+    """Horner 法求值（系数从常数项到最高次项）"""
+    acc = 0
+    for c in reversed(coeffs):
+        acc = acc * x + c
+    return acc
+
+
+def _newton_polish(coeffs: List[float], x: float, iterations: int = 5) -> float:
+    """用牛顿法精化实根"""
+    derivative = [i * coeffs[i] for i in range(1, len(coeffs))]
+    for _ in range(iterations):
+        try:
+            p = _horner(coeffs, x)
+            dp = _horner(derivative, x)
+        except OverflowError:
+            break
+        if dp == 0 or not math.isfinite(p) or not math.isfinite(dp):
+            break
+        step = p / dp
+        if not math.isfinite(step) or abs(step) > 1e-3 * max(1.0, abs(x)):
+            break
+        x -= step
+        if abs(step) <= 1e-16 * max(1.0, abs(x)):
+            break
+    return x
+
+
+def _dedupe(roots: List[float]) -> List[float]:
+    """合并数值上重合的根，返回升序列表"""
+    result: List[float] = []
+    for r in sorted(roots):
+        if result and abs(r - result[-1]) <= 1e-8 * max(1.0, abs(r)):
+            continue
+        result.append(r)
+    return result
+
+
+def _fraction_trim(coeffs: List[Fraction]) -> List[Fraction]:
+    """去掉最高次的零系数"""
+    coeffs = list(coeffs)
+    while coeffs and coeffs[-1] == 0:
+        coeffs.pop()
+    return coeffs
+
+
+def _fraction_divmod(a: List[Fraction], b: List[Fraction]):
+    """有理系数多项式带余除法，返回 (商, 余式)"""
+    a = _fraction_trim(a)
+    b = _fraction_trim(b)
+    if len(a) < len(b):
+        return [], a
+    quotient = [Fraction(0)] * (len(a) - len(b) + 1)
+    remainder = list(a)
+    lead = b[-1]
+    for k in range(len(quotient) - 1, -1, -1):
+        q = remainder[k + len(b) - 1] / lead
+        quotient[k] = q
+        if q:
+            for i, c in enumerate(b):
+                remainder[k + i] -= q * c
+    return quotient, _fraction_trim(remainder[:len(b) - 1])
+
+
+def _fraction_gcd(a: List[Fraction], b: List[Fraction]) -> List[Fraction]:
+    """有理系数多项式的首一最大公因式（欧几里得算法）"""
+    a = _fraction_trim(a)
+    b = _fraction_trim(b)
+    while b:
+        a, b = b, _fraction_divmod(a, b)[1]
+    if not a:
+        return []
+    lead = a[-1]
+    return [c / lead for c in a]
+
+
+def _fraction_derivative(a: List[Fraction]) -> List[Fraction]:
+    return [i * a[i] for i in range(1, len(a))]
+
+
+def _square_free(coeffs: List[Fraction]):
+    """
+    Yun 算法的无平方分解：f = lc * prod(s_k^k)
+    
+    Returns:
+        [(s_k, k)]，s_k 为首一、无重因式且两两互素的多项式（略去等于1的因式）
+    """
+    f = _fraction_trim(coeffs)
+    f = [c / f[-1] for c in f]
+    derivative = _fraction_derivative(f)
+    a = _fraction_gcd(f, derivative)
+    b = _fraction_divmod(f, a)[0]
+    c = _fraction_divmod(derivative, a)[0]
+    d = [x - y for x, y in _zip_longest(c, _fraction_derivative(b))]
+    
+    factors = []
+    k = 1
+    while len(b) > 1:
+        a = _fraction_gcd(b, d)
+        b = _fraction_divmod(b, a)[0]
+        c = _fraction_divmod(d, a)[0]
+        d = [x - y for x, y in _zip_longest(c, _fraction_derivative(b))]
+        if len(a) > 1:
+            factors.append((a, k))
+        k += 1
+    return factors
+
+
+def _zip_longest(a: List[Fraction], b: List[Fraction]):
+    n = max(len(a), len(b))
+    return zip(a + [Fraction(0)] * (n - len(a)), b + [Fraction(0)] * (n - len(b)))
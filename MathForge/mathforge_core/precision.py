@@ -0,0 +1,358 @@
+"""
+高精度求值模块
+用 decimal 实现的初等函数在任意位数的工作精度下求值（安装 mpmath 时可选用
+mpmath 后端），并自动逐步提高工作精度，直到相邻两次的结果在要求的有效数字内
+一致、且工作精度足以覆盖相消损失的位数，用于验证浮点结果和在相消严重的点上求值
+"""
+
+import decimal
+from decimal import Decimal, localcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ast import Node, Number, Symbol, Add, Mul, Pow, Function, Sin, Cos, Tan, Exp, Log, Sqrt, Atan
+from .traversal import Dispatcher, fold
+
+try:
+    import mpmath
+except ImportError:  # mpmath 可选，默认使用 decimal 后端
+    mpmath = None
+
+
+# 默认的有效数字位数
+DEFAULT_PRECISION = 30
+
+# 工作精度比要求多出的保护位数，以及自适应提高工作精度的上限（十进制位）
+GUARD_DIGITS = 10
+MAX_PRECISION = 5000
+
+# 判为 0 的条件：相邻两次提高工作精度时结果的绝对值都随之缩小（至少缩小增加位数的一半），
+# 且工作精度已达到初始精度的 ZERO_PRECISION_FACTOR 倍，即结果只是相消后剩下的舍入误差
+ZERO_PRECISION_FACTOR = 3
+
+BACKENDS = ('decimal', 'mpmath')
+
+
+def eval_precise(node: Node, values: Optional[Dict[str, Any]] = None,
+                 precision: int = DEFAULT_PRECISION, backend: Optional[str] = None) -> Decimal:
+    """
+    高精度求值
+    
+    先以 precision + GUARD_DIGITS 位工作精度求值，之后每次把工作精度提高一半重新求值，
+    直到相邻两次的结果在 precision 位有效数字内一致，且工作精度不少于 precision 加上
+    相消损失的位数 log10(量级 / |结果|)（量级是求值中各项绝对值之和，与
+    equivalence 模块浮点模式的量级相同）：两次求值可能以同样的方式舍掉同一个被相消
+    暴露的项，只比较相邻结果会把舍入误差当作答案。结果的绝对值随工作精度
+    一再缩小（只是相消后剩下的舍入误差），且工作精度已达到初始精度的
+    ZERO_PRECISION_FACTOR 倍时判为 0。
+    
+    表达式中的数值常量按十进制表示解释（0.1 即 1/10），不经化简直接求值，
+    避免浮点常量折叠引入误差。
+    
+    Args:
+        node: AST节点
+        values: 变量名 -> 取值（float、int、str 或 Decimal；float 按十进制表示解释）
+        precision: 要求的有效数字位数
+        backend: 'decimal' 或 'mpmath'，默认在安装了 mpmath 时用 mpmath
+        
+    Returns:
+        舍入到 precision 位有效数字的 Decimal
+        
+    Raises:
+        ValueError: precision 超出范围、未知的后端、缺少变量的取值、表达式在该点
+            无定义，或工作精度达到 MAX_PRECISION 时结果仍不稳定
+        ZeroDivisionError: 除数为零
+        OverflowError: 结果溢出
+        
+    Examples:
+        >>> eval_precise(parse("(1 - cos(x))/x^2"), {'x': 1e-8}, precision=20)
+        Decimal('0.49999999999999999583')
+        >>> eval_precise(parse("exp(x) - 1 - x"), {'x': '1e-10'}, precision=10)
+        Decimal('5.000000000E-21')
+        >>> eval_precise(parse("(x + 1)^2 - x^2 - 2*x - 1"), {'x': '1e15'}, precision=10)
+        Decimal('0')
+    """
+    if not isinstance(precision, int) or not 1 <= precision <= MAX_PRECISION - GUARD_DIGITS:
+        raise ValueError(f"精度必须是 1 到 {MAX_PRECISION - GUARD_DIGITS} 之间的整数: {precision}")
+    if backend is None:
+        backend = 'mpmath' if mpmath is not None else 'decimal'
+    if backend not in BACKENDS:
+        raise ValueError(f"未知的高精度后端: {backend}（可选 {', '.join(BACKENDS)}）")
+    if backend == 'mpmath' and mpmath is None:
+        raise ValueError("mpmath 后端需要安装 mpmath")
+    
+    values = values or {}
+    digits = precision + GUARD_DIGITS
+    zero_digits = ZERO_PRECISION_FACTOR * digits
+    last: Optional[Decimal] = None
+    last_digits = 0
+    shrinking = 0  # 结果随工作精度连续缩小的次数
+    while True:
+        value, scale = _evaluate(node, values, digits, backend)
+        if not value.is_finite():
+            raise OverflowError(f"结果溢出: {node}")
+        if last is not None:
+            with localcontext(decimal.Context(prec=digits)):
+                if abs(value) <= abs(last).scaleb(-((digits - last_digits) // 2)):
+                    shrinking += 1
+                    if shrinking >= 2 and digits >= zero_digits:
+                        return Decimal(0)
+                else:
+                    shrinking = 0
+                    # 相消损失的位数（按十进制指数估计，多算一位）
+                    lost = scale.adjusted() - value.adjusted() + 1 if value else 0
+                    if digits >= precision + lost and abs(value - last) <= abs(value).scaleb(-precision):
+                        with localcontext(decimal.Context(prec=precision)):
+                            return +value
+        if digits >= MAX_PRECISION:
+            raise ValueError(f"工作精度达到 {MAX_PRECISION} 位时结果仍不稳定: {node}")
+        last, last_digits = value, digits
+        digits = min(digits + max(GUARD_DIGITS, digits // 2), MAX_PRECISION)
+
+
+def _evaluate(node: Node, values: Dict[str, Any], digits: int, backend: str) -> Tuple[Decimal, Decimal]:
+    """以 digits 位工作精度求值一次，返回 (结果, 量级)，都转为 Decimal"""
+    try:
+        if backend == 'decimal':
+            with localcontext(decimal.Context(prec=digits)):
+                return fold(node, _scaled(_DECIMAL), {name: _to_decimal(value) for name, value in values.items()})
+        with mpmath.workdps(digits):
+            converted = {name: mpmath.mpf(str(_to_decimal(value))) for name, value in values.items()}
+            value, scale = fold(node, _scaled(_MPMATH), converted)
+            return Decimal(mpmath.nstr(value, digits)), Decimal(mpmath.nstr(scale, 10))
+    except decimal.DivisionByZero:
+        raise ZeroDivisionError(f"除数为零: {node}")
+    except decimal.InvalidOperation:
+        raise ValueError(f"表达式在该点无定义: {node}")
+    except decimal.Overflow:
+        raise OverflowError(f"结果溢出: {node}")
+
+
+def _to_decimal(value: Any) -> Decimal:
+    """变量取值转为 Decimal（float 按十进制表示解释）"""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        return Decimal(int(value)) if value.is_integer() else Decimal(repr(value))
+    return Decimal(value)
+
+
+def _symbol_value(node: Symbol, results: List[Any], values: Dict[str, Any]) -> Any:
+    if node.name not in values:
+        raise ValueError(f"变量 {node.name} 未在值字典中找到")
+    return values[node.name]
+
+
+def _sum(node: Add, results: List[Any], values: Dict[str, Any]) -> Any:
+    total = results[0]
+    for value in results[1:]:
+        total += value
+    return total
+
+
+def _product(node: Mul, results: List[Any], values: Dict[str, Any]) -> Any:
+    product = results[0]
+    for value in results[1:]:
+        product *= value
+    return product
+
+
+def _scaled(table: Dispatcher):
+    """
+    把逐节点求值的 table 包装为同时求 (值, 量级) 的 combine：加法的量级是各项量级之和，
+    乘法和正整数次幂按量级相乘，其余节点取自身值的绝对值
+    """
+    def combine(node: Node, results: List[Tuple[Any, Any]], values: Dict[str, Any]) -> Tuple[Any, Any]:
+        value = table(node, [item for item, _ in results], values)
+        if isinstance(node, Add):
+            return value, sum(scale for _, scale in results)
+        if isinstance(node, Mul):
+            return value, _product(node, [scale for _, scale in results], values)
+        if isinstance(node, Pow):
+            (_, base_scale), (exponent, _) = results
+            if exponent > 0 and exponent == int(exponent):
+                return value, base_scale ** int(exponent)
+        return value, abs(value)
+    return combine
+
+
+def _unsupported(node: Node, results: List[Any], values: Dict[str, Any]) -> Any:
+    raise ValueError(f"不支持高精度求值的节点: {type(node).__name__}")
+
+
+# ---------- decimal 后端 ----------
+
+# 各工作精度下的 π（按位数缓存）
+_PI_CACHE: Dict[int, Decimal] = {}
+
+
+def _pi() -> Decimal:
+    """当前上下文精度下的 π（Machin 公式 π = 16 atan(1/5) - 4 atan(1/239)）"""
+    prec = decimal.getcontext().prec
+    pi = _PI_CACHE.get(prec)
+    if pi is None:
+        with localcontext() as ctx:
+            ctx.prec = prec + 5
+            pi = 16 * _atan_series(Decimal(1) / 5) - 4 * _atan_series(Decimal(1) / 239)
+        pi = _PI_CACHE[prec] = +pi
+    return pi
+
+
+def _atan_series(x: Decimal) -> Decimal:
+    """atan 的泰勒级数（|x| 较小时收敛快）"""
+    total = power = x
+    square = x * x
+    k = 1
+    while True:
+        power *= -square
+        term = power / (2 * k + 1)
+        if not term or term.adjusted() < total.adjusted() - decimal.getcontext().prec - 2:
+            return total
+        total += term
+        k += 1
+
+
+def _d_atan(x: Decimal) -> Decimal:
+    if x < 0:
+        return -_d_atan(-x)
+    with localcontext() as ctx:
+        ctx.prec += 5
+        if x > 1:
+            result = _pi() / 2 - _d_atan(1 / x)
+        else:
+            # 半角约化两次：atan(x) = 2 atan(x / (1 + sqrt(1 + x^2)))，x 不超过 tan(π/16)
+            for _ in range(2):
+                x = x / (1 + (1 + x * x).sqrt())
+            result = 4 * _atan_series(x)
+    return +result
+
+
+def _reduce_angle(x: Decimal) -> Decimal:
+    """x 约化到 [-π, π]（按 x 的量级多取 π 的位数，避免约化时丢失精度）"""
+    with localcontext() as ctx:
+        ctx.prec += max(0, x.adjusted()) + 5
+        two_pi = 2 * _pi()
+        return x - two_pi * (x / two_pi).to_integral_value()
+
+
+def _sin_cos_series(x: Decimal, first: Decimal, start: int) -> Decimal:
+    """sin（first = x, start = 1）或 cos（first = 1, start = 0）的泰勒级数"""
+    total = term = first
+    square = x * x
+    i = start
+    while True:
+        i += 2
+        term = -term * square / (i * (i - 1))
+        if not term or term.adjusted() < total.adjusted() - decimal.getcontext().prec - 2:
+            return total
+        total += term
+
+
+def _d_sin(x: Decimal) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec += 5
+        r = _reduce_angle(x)
+        result = _sin_cos_series(r, r, 1)
+    return +result
+
+
+def _d_cos(x: Decimal) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec += 5
+        result = _sin_cos_series(_reduce_angle(x), Decimal(1), 0)
+    return +result
+
+
+def _d_tan(x: Decimal) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec += 5
+        result = _d_sin(x) / _d_cos(x)
+    return +result
+
+
+def _d_pow(node: Pow, results: List[Decimal], values: Dict[str, Any]) -> Decimal:
+    base, exponent = results
+    if exponent == exponent.to_integral_value():
+        n = int(exponent)
+        if not base and n < 0:
+            raise ZeroDivisionError(f"零的负数次幂: {node}")
+        # 0^0 在 decimal 中无定义，按浮点求值的约定取 1
+        return Decimal(1) if n == 0 else base ** n
+    if base < 0:
+        raise ValueError(f"负数的非整数次幂: {node}")
+    if not base:
+        if exponent < 0:
+            raise ZeroDivisionError(f"零的负数次幂: {node}")
+        return Decimal(0)
+    return base ** exponent
+
+
+def _d_log(x: Decimal) -> Decimal:
+    if x <= 0:
+        raise ValueError(f"对数的参数必须为正: {x}")
+    return x.ln()
+
+
+def _d_function(func):
+    return lambda node, results, values: func(results[0])
+
+
+# decimal 后端：在当前上下文精度下求值（exp、ln、sqrt 由 decimal 正确舍入）
+_DECIMAL = Dispatcher({
+    Number: lambda node, results, values: _to_decimal(node.value),
+    Symbol: _symbol_value,
+    Add: _sum,
+    Mul: _product,
+    Pow: _d_pow,
+    Sin: _d_function(_d_sin),
+    Cos: _d_function(_d_cos),
+    Tan: _d_function(_d_tan),
+    Exp: _d_function(lambda x: x.exp()),
+    Log: _d_function(_d_log),
+    Sqrt: _d_function(lambda x: x.sqrt()),
+    Atan: _d_function(_d_atan),
+    Function: _unsupported,
+}, default=_unsupported)
+
+
+# ---------- mpmath 后端 ----------
+
+def _real(node: Node, value: Any) -> Any:
+    """mpmath 在定义域外返回复数，按实数求值的约定报错"""
+    if isinstance(value, mpmath.mpc):
+        raise ValueError(f"表达式在该点无定义: {node}")
+    return value
+
+
+def _m_pow(node: Pow, results: List[Any], values: Dict[str, Any]) -> Any:
+    base, exponent = results
+    if not base and exponent < 0:
+        raise ZeroDivisionError(f"零的负数次幂: {node}")
+    return _real(node, mpmath.power(base, exponent))
+
+
+def _m_log(node: Log, results: List[Any], values: Dict[str, Any]) -> Any:
+    if results[0] <= 0:
+        raise ValueError(f"对数的参数必须为正: {node}")
+    return mpmath.log(results[0])
+
+
+def _m_function(name: str):
+    return lambda node, results, values: _real(node, getattr(mpmath, name)(results[0]))
+
+
+# mpmath 后端：在 mpmath.workdps 设定的精度下求值
+_MPMATH = Dispatcher({
+    Number: lambda node, results, values: mpmath.mpf(str(_to_decimal(node.value))),
+    Symbol: _symbol_value,
+    Add: _sum,
+    Mul: _product,
+    Pow: _m_pow,
+    Sin: _m_function('sin'),
+    Cos: _m_function('cos'),
+    Tan: _m_function('tan'),
+    Exp: _m_function('exp'),
+    Log: _m_log,
+    Sqrt: _m_function('sqrt'),
+    Atan: _m_function('atan'),
+    Function: _unsupported,
+}, default=_unsupported)
@@ -0,0 +1,207 @@
+"""
+性能剖析模块
+Profile 上下文管理器在其作用域内跟踪 mathforge_core 内的函数调用，统计每个函数的
+调用次数、处理的节点数（第一个参数是节点的调用）、分配的节点数、自身与累计耗时，
+以及各缓存的命中情况；调用栈可导出为 flamegraph 使用的折叠格式
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .ast import Node, STR_CACHE
+
+
+# 当前生效的 Profile（没有剖析时为 None，缓存钩子据此直接返回）
+_active: Optional['Profile'] = None
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_AST_FILE = os.path.join(_PACKAGE_DIR, 'ast.py')
+
+# 推导式和生成器表达式的耗时计入所在函数
+_INLINE_CODE = {'<genexpr>', '<listcomp>', '<dictcomp>', '<setcomp>'}
+
+
+class FunctionStats:
+    """单个函数的剖析统计"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.visits = 0
+        self.allocations = 0
+        self.self_time = 0.0
+        self.total_time = 0.0
+    
+    def __repr__(self) -> str:
+        return (f"FunctionStats(name={self.name!r}, calls={self.calls}, visits={self.visits}, "
+                f"allocations={self.allocations}, self_time={self.self_time:.6f}, "
+                f"total_time={self.total_time:.6f})")
+
+
+class Profile:
+    """
+    剖析上下文管理器
+    
+    只记录定义在 mathforge_core 包内的函数；节点构造（ast.py 中的 __init__）
+    不单独记为函数，而计入调用它的函数的 allocations。同一时间只能有一个
+    Profile 生效。
+    
+    Examples:
+        >>> with Profile() as prof:
+        ...     simplify(diff(parse("sin(x^2)*exp(x)"), Symbol('x')))
+        >>> print(prof.report())
+        >>> open("out.folded", "w").write(prof.folded())
+    """
+    
+    def __init__(self):
+        self.functions: Dict[str, FunctionStats] = {}
+        self.stacks: Dict[Tuple[str, ...], float] = {}
+        self.caches: Dict[str, List[int]] = {}
+        self.elapsed = 0.0
+        self._frames: List[list] = []  # [帧, 函数名, 开始时刻, 子调用耗时]
+        self._depth: Dict[str, int] = {}
+        self._names: Dict[object, Optional[str]] = {}
+        self._render_start: Dict[str, Tuple[int, int]] = {}
+    
+    def __enter__(self) -> 'Profile':
+        global _active
+        if _active is not None:
+            raise RuntimeError("已有 Profile 正在运行")
+        _active = self
+        self._render_start = {name: (cache.hits, cache.misses) for name, cache in _render_caches().items()}
+        self._start = time.perf_counter()
+        sys.setprofile(self._callback)
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        global _active
+        sys.setprofile(None)
+        now = time.perf_counter()
+        self.elapsed += now - self._start
+        # 异常退出时栈上还有未返回的帧
+        while self._frames:
+            self._pop(now)
+        for name, cache in _render_caches().items():
+            hits, misses = self._render_start[name]
+            self._count_cache(name, cache.hits - hits, cache.misses - misses)
+        _active = None
+    
+    def _callback(self, frame, event: str, arg) -> None:
+        if event == 'call':
+            code = frame.f_code
+            name = self._names.get(code, 0)
+            if name == 0:
+                name = self._names[code] = _function_name(code)
+            if name is None:
+                return
+            if code.co_name == '__init__' and code.co_filename == _AST_FILE:
+                # 节点构造计入调用者（子类经 super().__init__ 的第二次调用不重复计数）
+                caller = frame.f_back.f_code
+                nested = caller.co_name == '__init__' and caller.co_filename == _AST_FILE
+                if self._frames and not nested and isinstance(frame.f_locals.get('self'), Node):
+                    self._stats(self._frames[-1][1]).allocations += 1
+                return
+            stats = self._stats(name)
+            stats.calls += 1
+            if code.co_argcount and isinstance(frame.f_locals.get(code.co_varnames[0]), Node):
+                stats.visits += 1
+            self._depth[name] = self._depth.get(name, 0) + 1
+            self._frames.append([frame, name, time.perf_counter(), 0.0])
+        elif event == 'return':
+            if self._frames and self._frames[-1][0] is frame:
+                self._pop(time.perf_counter())
+    
+    def _pop(self, now: float) -> None:
+        _, name, start, child_time = self._frames.pop()
+        elapsed = now - start
+        stats = self._stats(name)
+        stats.self_time += elapsed - child_time
+        depth = self._depth[name] = self._depth[name] - 1
+        if depth == 0:
+            # 递归调用只在最外层计入累计耗时
+            stats.total_time += elapsed
+        if self._frames:
+            self._frames[-1][3] += elapsed
+        stack = tuple(entry[1] for entry in self._frames) + (name,)
+        self.stacks[stack] = self.stacks.get(stack, 0.0) + elapsed - child_time
+    
+    def _stats(self, name: str) -> FunctionStats:
+        stats = self.functions.get(name)
+        if stats is None:
+            stats = self.functions[name] = FunctionStats(name)
+        return stats
+    
+    def _count_cache(self, name: str, hits: int, misses: int) -> None:
+        counts = self.caches.setdefault(name, [0, 0])
+        counts[0] += hits
+        counts[1] += misses
+    
+    def hot_spots(self, limit: Optional[int] = None) -> List[FunctionStats]:
+        """按自身耗时降序排列的函数统计"""
+        ranked = sorted(self.functions.values(), key=lambda stats: stats.self_time, reverse=True)
+        return ranked[:limit] if limit is not None else ranked
+    
+    def report(self, limit: int = 15) -> str:
+        """
+        热点函数与缓存命中情况的文本报告
+        
+        Args:
+            limit: 最多列出的函数数
+            
+        Returns:
+            多行文本
+        """
+        lines = [f"总耗时: {self.elapsed * 1000:.3f} ms",
+                 f"{'函数':<40} {'调用':>8} {'节点':>8} {'分配':>8} {'自身(ms)':>10} {'累计(ms)':>10} {'占比':>7}"]
+        for stats in self.hot_spots(limit):
+            share = stats.self_time / self.elapsed if self.elapsed else 0.0
+            lines.append(f"{stats.name:<40} {stats.calls:>8} {stats.visits:>8} {stats.allocations:>8} "
+                         f"{stats.self_time * 1000:>10.3f} {stats.total_time * 1000:>10.3f} {share:>7.1%}")
+        if self.caches:
+            lines.append(f"{'缓存':<40} {'命中':>8} {'未命中':>8}")
+            for name, (hits, misses) in sorted(self.caches.items()):
+                lines.append(f"{name:<40} {hits:>8} {misses:>8}")
+        return "\n".join(lines)
+    
+    def folded(self) -> str:
+        """
+        折叠格式的调用栈（每行 "外层;...;内层 自身耗时微秒"），
+        可直接交给 flamegraph.pl、speedscope 等工具
+        """
+        lines = []
+        for stack, seconds in sorted(self.stacks.items()):
+            micros = int(round(seconds * 1e6))
+            if micros > 0:
+                lines.append(f"{';'.join(stack)} {micros}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+def record_cache(name: str, hit: bool) -> None:
+    """
+    缓存钩子：在缓存查找处调用，没有 Profile 生效时直接返回
+    
+    Args:
+        name: 缓存名
+        hit: 是否命中
+    """
+    if _active is not None:
+        _active._count_cache(name, int(hit), int(not hit))
+
+
+def _render_caches() -> dict:
+    """自带命中计数的渲染缓存（进入和退出时取差值，不需要钩子）"""
+    from .latex import LATEX_CACHE
+    return {'str': STR_CACHE, 'latex': LATEX_CACHE}
+
+
+def _function_name(code) -> Optional[str]:
+    """包内函数的显示名（模块.限定名），包外返回 None"""
+    filename = code.co_filename
+    if not filename.startswith(_PACKAGE_DIR):
+        return None
+    module = os.path.splitext(os.path.relpath(filename, _PACKAGE_DIR))[0].replace(os.sep, '.')
+    if module == 'profiling' or code.co_name in _INLINE_CODE:
+        return None
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
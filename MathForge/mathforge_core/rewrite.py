@@ -4,7 +4,8 @@
 """
 
 from typing import Dict, Optional
-from .ast import Node, Number, Symbol, Add, Mul, Pow, Function, Sin, Cos
+from .ast import Node, Number, Symbol, Add, Pow, Sin, Cos
+from .traversal import transform
 
 
 def rewrite(node: Node, rules: Optional[Dict[str, Node]] = None) -> Node:
@@ -33,7 +34,7 @@ def rewrite(node: Node, rules: Optional[Dict[str, Node]] = None) -> Node:
         
         for pattern, replacement in rules.items():
             new_result = _apply_rule(result, pattern, replacement)
-            if new_result != result:
+            if new_result is not result:
                 result = new_result
                 changed = True
                 break
@@ -41,52 +42,64 @@ def rewrite(node: Node, rules: Optional[Dict[str, Node]] = None) -> Node:
     return result
 
 
+# 默认规则表：首次使用时构建一次，之后所有调用共享
+_DEFAULT_RULES: Optional[Dict[str, Node]] = None
+
+
 def _default_rules() -> Dict[str, Node]:
-    """默认重写规则"""
-    from .parser import parse
-    
-    rules = {}
-    
-    # sin^2(x) + cos^2(x) = 1
-    x = Symbol('x')
-    rules['trig_identity'] = parse('sin(x)^2 + cos(x)^2')
-    
-    return rules
+    """默认重写规则（直接用节点构造，不经过解析器）"""
+    global _DEFAULT_RULES
+    if _DEFAULT_RULES is None:
+        x = Symbol('x')
+        _DEFAULT_RULES = {
+            # sin^2(x) + cos^2(x) = 1
+            'trig_identity': Add(Pow(Sin(x), Number(2)), Pow(Cos(x), Number(2))),
+        }
+    return _DEFAULT_RULES
 
 
 def _apply_rule(node: Node, pattern: str, replacement: Node) -> Node:
-    """应用单个重写规则"""
+    """自底向上在每个节点上应用单个规则，未匹配的子树原样返回"""
+    return transform(node, _rule_step, pattern, replacement)
+
+
+def _rule_step(node: Node, pattern: str, replacement: Node) -> Node:
+    matched = _match_rule(node, pattern, replacement)
+    return node if matched is None else matched
+
+
+def _match_rule(node: Node, pattern: str, replacement: Node) -> Optional[Node]:
+    """
+    只在 node 本身（不含子节点）上尝试规则
+    
+    Args:
+        node: AST节点
+        pattern: 规则名
+        replacement: 规则的模式表达式
+        
+    Returns:
+        重写后的节点；不匹配时返回 None
+    """
     # 这里实现简化的模式匹配
     # 实际应用中需要更复杂的模式匹配算法
     
-    # 检查是否是 sin^2 + cos^2 形式
+    # 检查是否是 sin^2 + cos^2 形式：每对参数相同的两项替换为1，其余项保留
     if isinstance(node, Add):
-        sin_squared = None
-        cos_squared = None
-        
-        for term in node.terms:
-            if isinstance(term, Pow):
-                if isinstance(term.base, Sin):
-                    if isinstance(term.exponent, Number) and abs(term.exponent.value - 2) < 1e-10:
-                        sin_squared = term
-                elif isinstance(term.base, Cos):
-                    if isinstance(term.exponent, Number) and abs(term.exponent.value - 2) < 1e-10:
-                        cos_squared = term
+        squares = {Sin: {}, Cos: {}}
+        for index, term in enumerate(node.terms):
+            if isinstance(term, Pow) and type(term.base) in squares:
+                if isinstance(term.exponent, Number) and abs(term.exponent.value - 2) < 1e-10:
+                    squares[type(term.base)].setdefault(term.base.arg, []).append(index)
         
-        if sin_squared and cos_squared:
+        matched = set()
+        for arg, sin_indices in squares[Sin].items():
             # 检查参数是否相同
-            if sin_squared.base.arg == cos_squared.base.arg:
-                return Number(1)
-    
-    # 递归应用到子节点
-    if isinstance(node, Add):
-        return Add(*[_apply_rule(term, pattern, replacement) for term in node.terms])
-    elif isinstance(node, Mul):
-        return Mul(*[_apply_rule(factor, pattern, replacement) for factor in node.factors])
-    elif isinstance(node, Pow):
-        return Pow(_apply_rule(node.base, pattern, replacement),
-                  _apply_rule(node.exponent, pattern, replacement))
-    elif isinstance(node, Function):
-        return type(node)(_apply_rule(node.arg, pattern, replacement))
+            cos_indices = squares[Cos].get(arg, [])
+            for pair in zip(sin_indices, cos_indices):
+                matched.update(pair)
+        if matched:
+            rest = [term for index, term in enumerate(node.terms) if index not in matched]
+            ones = Number(len(matched) // 2)
+            return Add(*rest, ones) if rest else ones
     
-    return node
+    return None
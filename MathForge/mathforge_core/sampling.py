@@ -0,0 +1,118 @@
+"""
+自适应采样模块
+为绘图生成 (x, y) 采样点：表达式只编译一次（numpy 后端），
+从均匀网格出发，每轮对整批线段取中点，只细分偏离直线的线段；
+区间求值能证明函数在线段上几乎不变的线段直接跳过，
+跨过极点的线段插入 nan 断开曲线
+"""
+
+from typing import Dict, Optional, Tuple
+
+from .ast import Node, Symbol
+from .codegen import compile_function, batched
+from .interval import eval_intervals
+
+try:
+    import numpy as np
+except ImportError:  # numpy 可选，仅 adaptive_sample 需要
+    np = None
+
+
+# 初始均匀网格点数、点数上限、细分轮数上限和相对容差（相对于 y 的取值范围）
+DEFAULT_POINTS = 200
+DEFAULT_MAX_POINTS = 20000
+MAX_DEPTH = 12
+DEFAULT_SAMPLE_TOL = 1e-3
+
+
+def adaptive_sample(node: Node, var: Symbol, lower: float, upper: float,
+                    points: int = DEFAULT_POINTS, max_points: int = DEFAULT_MAX_POINTS,
+                    tol: float = DEFAULT_SAMPLE_TOL,
+                    values: Optional[Dict[str, float]] = None) -> Tuple[object, object]:
+    """
+    在 [lower, upper] 上自适应采样表达式
+    
+    Args:
+        node: AST节点
+        var: 自变量
+        lower, upper: 采样区间
+        points: 初始均匀网格的点数
+        max_points: 返回点数的上限
+        tol: 线段中点偏离直线的容差，相对于 y 的典型取值范围
+        values: 其他符号的取值
+        
+    Returns:
+        (xs, ys) 两个 numpy 数组，xs 升序；定义域外和曲线断开处 ys 为 nan
+        
+    Raises:
+        ImportError: 未安装 numpy
+        ValueError: 区间或点数无效
+        
+    Examples:
+        >>> xs, ys = adaptive_sample(parse("sin(x)"), Symbol('x'), 0, 6.28)
+    """
+    if np is None:
+        raise ImportError("自适应采样需要安装 numpy")
+    if not (np.isfinite(lower) and np.isfinite(upper) and lower < upper):
+        raise ValueError(f"无效的采样区间: [{lower}, {upper}]")
+    if points < 2 or max_points < points:
+        raise ValueError("points 至少为 2，且不能超过 max_points")
+    
+    values = dict(values or {})
+    names = sorted(values)
+    compiled = compile_function(node, [var.name] + names, backend='numpy')
+    params = [values[name] for name in names]
+    f = batched(lambda x: compiled(x, *params))
+    
+    def bounds(x0, x1):
+        return eval_intervals(node, dict(values, **{var.name: (x0, x1)}))
+    
+    xs = np.linspace(lower, upper, points)
+    ys = f(xs)
+    finite = ys[np.isfinite(ys)]
+    if finite.size:
+        low, high = np.percentile(finite, [2, 98])
+        scale = max(high - low, 1e-12 * max(abs(low), abs(high)), 1e-300)
+    else:
+        scale = 1.0
+    threshold = tol * scale
+    
+    for _ in range(MAX_DEPTH):
+        budget = max_points - len(xs)
+        if budget <= 0:
+            break
+        x0, x1, y0, y1 = xs[:-1], xs[1:], ys[:-1], ys[1:]
+        # 两端都在定义域外的线段不再细分；区间界足够窄的线段已是直线
+        lo, hi = bounds(x0, x1)
+        candidates = np.flatnonzero(~(np.isnan(y0) & np.isnan(y1)) & ~(hi - lo <= threshold))
+        if candidates.size == 0:
+            break
+        
+        mids = (x0[candidates] + x1[candidates]) / 2
+        ym = f(mids)
+        a, b = y0[candidates], y1[candidates]
+        error = np.abs(ym - (a + b) / 2)
+        # 中点偏离直线，或线段一端/中点在定义域外而另一端不在
+        nans = np.isnan(a).astype(int) + np.isnan(b) + np.isnan(ym)
+        error = np.where((nans > 0) & (nans < 3), np.inf, error)
+        refine = np.flatnonzero(error > threshold)
+        if refine.size == 0:
+            break
+        if refine.size > budget:
+            refine = refine[np.argsort(-error[refine], kind='stable')[:budget]]
+            refine.sort()
+        
+        at = candidates[refine] + 1
+        xs = np.insert(xs, at, mids[refine])
+        ys = np.insert(ys, at, ym[refine])
+    
+    # 跨过极点的线段：区间无界且两端变号或跳跃很大时插入 nan 断开
+    x0, x1, y0, y1 = xs[:-1], xs[1:], ys[:-1], ys[1:]
+    lo, hi = bounds(x0, x1)
+    jump = (np.isinf(lo) | np.isinf(hi)) & ((y0 * y1 < 0) | (np.abs(y1 - y0) > scale))
+    breaks = np.flatnonzero(jump)
+    if breaks.size:
+        xs = np.insert(xs, breaks + 1, (x0[breaks] + x1[breaks]) / 2)
+        ys = np.insert(ys, breaks + 1, np.nan)
+    
+    return xs, ys
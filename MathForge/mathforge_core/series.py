@@ -0,0 +1,377 @@
+"""
+幂级数模块
+在展开点处把表达式转为截断幂级数，系数按需惰性计算：
+乘除、幂、exp、log、sin/cos、atan 都用系数递推（每个系数一次内积），
+避免反复求导造成的表达式膨胀
+"""
+
+import math
+from operator import mul
+from typing import Dict, List, Optional
+
+from .ast import Node, Number, Symbol, Add, Mul, Pow, Function, children
+
+try:
+    import numpy as np
+except ImportError:  # numpy 可选，缺失时用纯 Python 的内积
+    np = None
+
+
+class PowerSeries:
+    """
+    截断幂级数 Σ c_k (x - x0)^k
+    
+    系数在第一次访问时才计算并缓存；求第 n 个系数时按依赖的拓扑顺序
+    把整个级数图扩展到 n，不递归。子类实现 _next(k)：在运算对象的
+    前 k 个（或 k+1 个）系数已知时给出自己的第 k 个系数。
+    """
+    
+    def __init__(self, *operands: 'PowerSeries'):
+        self.operands = operands
+        self._data = np.zeros(8) if np is not None else []
+        self._size = 0
+        self._order: Optional[List['PowerSeries']] = None
+    
+    def coefficient(self, n: int) -> float:
+        """第 n 个系数"""
+        self._extend(n)
+        return float(self._data[n])
+    
+    def coefficients(self, order: int) -> List[float]:
+        """前 order+1 个系数（从常数项开始）"""
+        self._extend(order)
+        return [float(c) for c in self._data[:order + 1]]
+    
+    def to_node(self, order: int, var: Symbol, point: float = 0.0) -> Node:
+        """截断到 order 次的泰勒多项式（AST）"""
+        base = var if point == 0 else Add(var, Number(-point))
+        terms: List[Node] = []
+        for k, c in enumerate(self.coefficients(order)):
+            if c == 0:
+                continue
+            if k == 0:
+                terms.append(Number(c))
+            else:
+                power = base if k == 1 else Pow(base, Number(k))
+                terms.append(power if c == 1 else Mul(Number(c), power))
+        if not terms:
+            return Number(0)
+        return terms[0] if len(terms) == 1 else Add(*terms)
+    
+    def _extend(self, n: int) -> None:
+        if self._size > n:
+            return
+        for series in self._topological_order():
+            while series._size <= n:
+                series._append(series._next(series._size))
+    
+    def _topological_order(self) -> List['PowerSeries']:
+        """运算对象在前的依赖顺序（显式栈 DFS，结果缓存）"""
+        if self._order is None:
+            order: List[PowerSeries] = []
+            seen = set()
+            stack = [(self, False)]
+            while stack:
+                series, ready = stack.pop()
+                if ready:
+                    order.append(series)
+                    continue
+                if id(series) in seen:
+                    continue
+                seen.add(id(series))
+                stack.append((series, True))
+                stack.extend((operand, False) for operand in series.operands if id(operand) not in seen)
+            self._order = order
+        return self._order
+    
+    def _append(self, value: float) -> None:
+        if np is None:
+            self._data.append(value)
+        else:
+            if self._size == len(self._data):
+                self._data = np.concatenate([self._data, np.zeros(len(self._data))])
+            self._data[self._size] = value
+        self._size += 1
+    
+    def _next(self, k: int) -> float:
+        raise NotImplementedError
+
+
+def _dot(a, b) -> float:
+    """两个等长系数片段的内积"""
+    if np is not None:
+        return float(np.dot(a, b))
+    return sum(map(mul, a, b))
+
+
+def _ramp(start: int, stop: int):
+    """整数权重 start, ..., stop-1"""
+    if np is not None:
+        return np.arange(start, stop, dtype=float)
+    return list(range(start, stop))
+
+
+def _scaled(weights, values):
+    """逐项相乘"""
+    if np is not None:
+        return weights * values
+    return [w * v for w, v in zip(weights, values)]
+
+
+class _Constant(PowerSeries):
+    def __init__(self, value: float):
+        super().__init__()
+        self.value = value
+    
+    def _next(self, k: int) -> float:
+        return self.value if k == 0 else 0.0
+
+
+class _Variable(PowerSeries):
+    """展开变量 x = x0 + (x - x0)"""
+    
+    def __init__(self, point: float):
+        super().__init__()
+        self.point = point
+    
+    def _next(self, k: int) -> float:
+        return self.point if k == 0 else (1.0 if k == 1 else 0.0)
+
+
+class _Sum(PowerSeries):
+    def _next(self, k: int) -> float:
+        return sum(float(operand._data[k]) for operand in self.operands)
+
+
+class _Product(PowerSeries):
+    """c_k = Σ a_i b_(k-i)"""
+    
+    def _next(self, k: int) -> float:
+        a, b = self.operands
+        return _dot(a._data[:k + 1], b._data[k::-1])
+
+
+class _Quotient(PowerSeries):
+    """c = a / b：c_k = (a_k - Σ_{i>=1} b_i c_(k-i)) / b_0"""
+    
+    def _next(self, k: int) -> float:
+        a, b = self.operands
+        b0 = b._data[0]
+        if b0 == 0:
+            raise ValueError("级数在展开点处有极点（分母常数项为0）")
+        if k == 0:
+            return float(a._data[0] / b0)
+        return float((a._data[k] - _dot(b._data[1:k + 1], self._data[k - 1::-1])) / b0)
+
+
+class _Power(PowerSeries):
+    """y = a^p（p 为常数，a_0 != 0）：k a_0 y_k = Σ_{j>=1} ((p+1) j - k) a_j y_(k-j)"""
+    
+    def __init__(self, base: PowerSeries, exponent: float):
+        super().__init__(base)
+        self.exponent = exponent
+    
+    def _next(self, k: int) -> float:
+        a = self.operands[0]
+        a0 = float(a._data[0])
+        if k == 0:
+            if a0 < 0 and self.exponent != int(self.exponent):
+                raise ValueError("负数的非整数次幂在实数范围内无定义")
+            return a0 ** self.exponent
+        p = self.exponent
+        if np is not None:
+            weights = _ramp(1, k + 1) * (p + 1) - k
+        else:
+            weights = [(p + 1) * j - k for j in range(1, k + 1)]
+        return _dot(_scaled(weights, a._data[1:k + 1]), self._data[k - 1::-1]) / (k * a0)
+
+
+class _Exp(PowerSeries):
+    """e = exp(a)：k e_k = Σ_{j>=1} j a_j e_(k-j)"""
+    
+    def _next(self, k: int) -> float:
+        a = self.operands[0]
+        if k == 0:
+            return math.exp(a._data[0])
+        return _dot(_scaled(_ramp(1, k + 1), a._data[1:k + 1]), self._data[k - 1::-1]) / k
+
+
+class _Integral(PowerSeries):
+    """
+    t = F(a)，F'(u) = 1/g(u)：由 g(a) t' = a' 得
+    k g_0 t_k = k a_k - Σ_{m=1}^{k-1} m t_m g_(k-m)
+    （log 取 g = a，atan 取 g = 1 + a^2）
+    """
+    
+    def __init__(self, arg: PowerSeries, denominator: PowerSeries, value_at_zero):
+        super().__init__(arg, denominator)
+        self.value_at_zero = value_at_zero
+    
+    def _next(self, k: int) -> float:
+        a, g = self.operands
+        if k == 0:
+            return self.value_at_zero(float(a._data[0]))
+        g0 = g._data[0]
+        acc = k * a._data[k]
+        if k > 1:
+            acc -= _dot(_scaled(_ramp(1, k), self._data[1:k]), g._data[k - 1:0:-1])
+        return float(acc / (k * g0))
+
+
+class _SinCos(PowerSeries):
+    """s = sin(a)，伴随的 c = cos(a)：k s_k = Σ j a_j c_(k-j)，k c_k = -Σ j a_j s_(k-j)"""
+    
+    def __init__(self, arg: PowerSeries):
+        super().__init__(arg)
+        self.cos = _Companion(self)
+    
+    def _next(self, k: int) -> float:
+        a = self.operands[0]
+        cos = self.cos
+        if k == 0:
+            a0 = float(a._data[0])
+            cos._append(math.cos(a0))
+            return math.sin(a0)
+        weighted = _scaled(_ramp(1, k + 1), a._data[1:k + 1])
+        s = _dot(weighted, cos._data[k - 1::-1]) / k
+        cos._append(-_dot(weighted, self._data[k - 1::-1]) / k)
+        return s
+
+
+class _Companion(PowerSeries):
+    """_SinCos 同时算出的 cos 系数"""
+    
+    def __init__(self, pair: _SinCos):
+        # 依赖 pair 保证拓扑顺序中 pair 在前，系数由 pair 扩展时写入
+        super().__init__(pair)
+        self.pair = pair
+
+
+def _log_series(a: PowerSeries) -> PowerSeries:
+    def log_value(a0: float) -> float:
+        if a0 <= 0:
+            raise ValueError("对数在展开点处无定义")
+        return math.log(a0)
+    return _Integral(a, a, log_value)
+
+
+def _atan_series(a: PowerSeries) -> PowerSeries:
+    return _Integral(a, _Sum(_Constant(1.0), _Product(a, a)), math.atan)
+
+
+def _power_series(base: PowerSeries, exponent: float) -> PowerSeries:
+    """常数次幂；底数常数项为0时只允许非负整数次幂（用乘法展开）"""
+    if base.coefficient(0) != 0:
+        return _Power(base, exponent)
+    if exponent != int(exponent) or exponent < 0:
+        raise ValueError("级数在展开点处不解析（底数为0的非整数或负数次幂）")
+    n = int(exponent)
+    result: PowerSeries = _Constant(1.0)
+    square = base
+    while n:
+        if n & 1:
+            result = square if isinstance(result, _Constant) else _Product(result, square)
+        n >>= 1
+        if n:
+            square = _Product(square, square)
+    return result
+
+
+def taylor(node: Node, var: Symbol, point: float = 0.0) -> PowerSeries:
+    """
+    表达式在 var = point 处的泰勒级数
+    
+    自底向上（显式栈）把每个子表达式转为惰性级数，结构相同的子表达式
+    对象只转换一次。支持 Add、Mul、Pow 以及 sin、cos、tan、exp、log、
+    sqrt、atan；不含 var 的子表达式按常数求值。
+    
+    Args:
+        node: AST节点（除 var 外不能含其他符号）
+        var: 展开变量
+        point: 展开点
+        
+    Returns:
+        PowerSeries，系数在访问时计算
+        
+    Raises:
+        ValueError: 表达式在展开点处不解析或含不支持的函数
+        
+    Examples:
+        >>> taylor(parse("exp(x)"), Symbol('x')).coefficients(4)
+        [1.0, 1.0, 0.5, 0.16666666666666666, 0.041666666666666664]
+    """
+    results: Dict[int, PowerSeries] = {}
+    stack = [(node, False)]
+    
+    while stack:
+        current, ready = stack.pop()
+        if id(current) in results:
+            continue
+        kids = children(current)
+        if kids and not ready:
+            stack.append((current, True))
+            stack.extend((kid, False) for kid in kids if id(kid) not in results)
+            continue
+        results[id(current)] = _node_series(current, var, point, [results[id(kid)] for kid in kids])
+    
+    return results[id(node)]
+
+
+def _node_series(node: Node, var: Symbol, point: float, operands: List[PowerSeries]) -> PowerSeries:
+    """单个节点的级数，子节点的级数已在 operands 中"""
+    if isinstance(node, Number):
+        return _Constant(float(node.value))
+    
+    if isinstance(node, Symbol):
+        if node.name != var.name:
+            raise ValueError(f"表达式含展开变量以外的符号: {node.name}")
+        return _Variable(float(point))
+    
+    if all(isinstance(operand, _Constant) for operand in operands):
+        # 常数子表达式直接求值
+        try:
+            value = node.eval({})
+        except (ValueError, ArithmeticError) as e:
+            raise ValueError(f"常数子表达式 {node} 无法求值: {e}")
+        if isinstance(value, complex):
+            raise ValueError(f"常数子表达式 {node} 的值不是实数")
+        return _Constant(float(value))
+    
+    if isinstance(node, Add):
+        return _Sum(*operands)
+    
+    if isinstance(node, Mul):
+        result = operands[0]
+        for operand in operands[1:]:
+            result = _Product(result, operand)
+        return result
+    
+    if isinstance(node, Pow):
+        base, exponent = operands
+        if isinstance(exponent, _Constant):
+            if exponent.value == -1 and base.coefficient(0) != 0:
+                return _Quotient(_Constant(1.0), base)
+            return _power_series(base, exponent.value)
+        # a^b = exp(b log a)
+        return _Exp(_Product(exponent, _log_series(base)))
+    
+    if isinstance(node, Function):
+        arg = operands[0]
+        if node.name == 'exp':
+            return _Exp(arg)
+        if node.name == 'log':
+            return _log_series(arg)
+        if node.name == 'sqrt':
+            return _power_series(arg, 0.5)
+        if node.name == 'atan':
+            return _atan_series(arg)
+        if node.name in ('sin', 'cos', 'tan'):
+            pair = _SinCos(arg)
+            if node.name == 'sin':
+                return pair
+            if node.name == 'cos':
+                return pair.cos
+            return _Quotient(pair, pair.cos)
+        raise ValueError(f"不支持展开的函数: {node.name}")
+    
+    raise ValueError(f"无法展开的节点类型: {type(node).__name__}")
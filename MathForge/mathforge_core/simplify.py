@@ -1,208 +1,391 @@
 """
 代数化简模块
+化简由若干遍（pass）组成：每一遍是按节点类型分派的规则表，由 traversal.transform
+自底向上作用于整棵树，未改变的子树原样复用；PassManager 依次循环执行各遍直到不动点，并记录每一遍的耗时和节点数变化
 """
 
-from typing import List, Dict
-from .ast import Node, Number, Add, Mul, Pow, Symbol, Function
+import math
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
+from .ast import Node, Number, Add, Mul, Pow, Function, children, node_size
+from .rewrite import _match_rule, _default_rules
+from .traversal import Dispatcher, transform
 
-def simplify(node: Node) -> Node:
+
+# 不动点迭代的轮数上限（每轮依次执行全部的遍）
+MAX_ITERATIONS = 20
+
+
+def simplify(node: Node, passes: Optional[Sequence[str]] = None) -> Node:
     """
     化简表达式
     
     Args:
         node: 要化简的AST节点
+        passes: 依次执行的遍名（见 PASSES），默认为 DEFAULT_PASSES
         
     Returns:
         化简后的AST节点
     """
-    # 递归化简子节点
-    if isinstance(node, Add):
-        return _simplify_add(node)
-    elif isinstance(node, Mul):
-        return _simplify_mul(node)
-    elif isinstance(node, Pow):
-        return _simplify_pow(node)
-    elif isinstance(node, Function):
-        return type(node)(simplify(node.arg))
-    else:
-        return node
+    return PassManager(passes).run(node)
 
 
-def _simplify_add(add_node: Add) -> Node:
-    """化简加法"""
-    terms: List[Node] = []
-    constant = 0.0
+class PassStats:
+    """单个遍的累计统计"""
     
-    # 展开所有项并收集常数
-    for term in add_node.terms:
-        simplified = simplify(term)
-        
-        if isinstance(simplified, Number):
-            constant += simplified.value
-        elif isinstance(simplified, Mul):
-            # 检查是否是 -1 * something
-            if len(simplified.factors) == 2:
-                if simplified.factors[0] == Number(-1):
-                    terms.append(Mul(Number(-1), simplified.factors[1]))
-                    continue
-                elif simplified.factors[1] == Number(-1):
-                    terms.append(Mul(Number(-1), simplified.factors[0]))
-                    continue
-            terms.append(simplified)
-        else:
-            terms.append(simplified)
+    def __init__(self, name: str):
+        self.name = name
+        self.runs = 0
+        self.changes = 0
+        self.seconds = 0.0
+        self.node_delta = 0
     
-    # 合并同类项
-    term_dict: Dict[str, Node] = {}
-    for term in terms:
-        key = _get_term_key(term)
-        if key in term_dict:
-            term_dict[key] = _combine_terms(term_dict[key], term)
-        else:
-            term_dict[key] = term
+    def __repr__(self) -> str:
+        return (f"PassStats(name={self.name!r}, runs={self.runs}, changes={self.changes}, "
+                f"seconds={self.seconds:.6f}, node_delta={self.node_delta})")
+
+
+class PassManager:
+    """
+    化简遍管理器
     
-    # 重新构建项列表
-    new_terms: List[Node] = []
-    for term in term_dict.values():
-        if isinstance(term, Number) and term.value == 0:
-            continue
-        new_terms.append(term)
+    按顺序循环执行各遍，直到连续一整圈都没有遍改变表达式（不动点）。
+    某一遍是否改变表达式由返回的根节点是否为同一对象判断，各遍保证
+    不变的子树原样返回。
     
-    # 添加常数项
-    if abs(constant) > 1e-10:
-        new_terms.append(Number(constant))
+    Examples:
+        >>> manager = PassManager(profile=True)
+        >>> manager.run(parse("x*x + 2*x*x"))
+        >>> print(manager.report())
+    """
     
-    # 如果只有一项，直接返回
-    if len(new_terms) == 0:
-        return Number(0)
-    elif len(new_terms) == 1:
-        return new_terms[0]
+    def __init__(self, passes: Optional[Sequence[str]] = None,
+                 max_iterations: int = MAX_ITERATIONS, profile: bool = False):
+        """
+        Args:
+            passes: 依次执行的遍名，默认为 DEFAULT_PASSES
+            max_iterations: 不动点迭代的轮数上限
+            profile: 是否统计每一遍前后的节点数（节点数缓存在节点上，只需遍历新建的部分）
+        """
+        names = list(DEFAULT_PASSES if passes is None else passes)
+        unknown = [name for name in names if name not in PASSES]
+        if unknown:
+            raise ValueError(f"未知的化简遍: {', '.join(unknown)}")
+        self.passes = names
+        self.max_iterations = max_iterations
+        self.profile = profile
+        self.iterations = 0
+        self.stats: Dict[str, PassStats] = {name: PassStats(name) for name in names}
     
-    return Add(*new_terms)
+    def run(self, node: Node) -> Node:
+        """把各遍循环执行到不动点，返回化简结果"""
+        if not self.passes:
+            return node
+        size = node_size(node) if self.profile else 0
+        unchanged = 0  # 连续未改变表达式的遍数
+        self.iterations = 0
+        while self.iterations < self.max_iterations:
+            self.iterations += 1
+            for name in self.passes:
+                stats = self.stats[name]
+                start = time.perf_counter()
+                result = transform(node, PASSES[name])
+                stats.seconds += time.perf_counter() - start
+                stats.runs += 1
+                if result is node:
+                    unchanged += 1
+                else:
+                    # 改变了表达式的遍也要再执行一次，确认它自身也已到不动点
+                    stats.changes += 1
+                    unchanged = 0
+                    if self.profile:
+                        new_size = node_size(result)
+                        stats.node_delta += new_size - size
+                        size = new_size
+                    node = result
+                if unchanged >= len(self.passes):
+                    return node
+        return node
+    
+    def report(self) -> str:
+        """各遍统计的文本表格"""
+        lines = [f"{'遍':<10} {'执行次数':>8} {'改变次数':>8} {'耗时(ms)':>10} {'节点数变化':>10}"]
+        for stats in self.stats.values():
+            delta = f"{stats.node_delta:+d}" if self.profile else "-"
+            lines.append(f"{stats.name:<10} {stats.runs:>8} {stats.changes:>8} "
+                         f"{stats.seconds * 1000:>10.3f} {delta:>10}")
+        lines.append(f"迭代轮数: {self.iterations}")
+        return "\n".join(lines)
 
 
-def _simplify_mul(mul_node: Mul) -> Node:
-    """化简乘法"""
-    factors: List[Node] = []
-    constant = 1.0
-    
-    for factor in mul_node.factors:
-        simplified = simplify(factor)
-        
-        if isinstance(simplified, Number):
-            if simplified.value == 0:
+def _flatten_add(node: Add) -> Node:
+    """展开：去掉只有零个或一个项的加法（嵌套的同类节点在构造时已展开）"""
+    if len(node.terms) <= 1:
+        return node.terms[0] if node.terms else Number(0)
+    return node
+
+
+def _flatten_mul(node: Mul) -> Node:
+    """展开：去掉只有零个或一个因子的乘法"""
+    if len(node.factors) <= 1:
+        return node.factors[0] if node.factors else Number(1)
+    return node
+
+
+def _fold_add(node: Add) -> Node:
+    """常数折叠：合并数值项，消去 0"""
+    numbers = [term for term in node.terms if isinstance(term, Number)]
+    if len(numbers) > 1 or (numbers and abs(numbers[0].value) < 1e-10):
+        rest = [term for term in node.terms if not isinstance(term, Number)]
+        constant = sum(term.value for term in numbers)
+        if abs(constant) > 1e-10:
+            rest.append(Number(constant))
+        return _join(Add, rest, Number(0))
+    return node
+
+
+def _fold_mul(node: Mul) -> Node:
+    """常数折叠：合并数值因子，消去 1，含 0 因子的乘积为 0"""
+    numbers = [factor for factor in node.factors if isinstance(factor, Number)]
+    if any(factor.value == 0 for factor in numbers):
+        return Number(0)
+    if len(numbers) > 1 or (numbers and abs(numbers[0].value - 1.0) < 1e-10):
+        rest = [factor for factor in node.factors if not isinstance(factor, Number)]
+        constant = math.prod(factor.value for factor in numbers)
+        if abs(constant - 1.0) > 1e-10:
+            rest.insert(0, Number(constant))
+        return _join(Mul, rest, Number(1))
+    return node
+
+
+def _fold_pow(node: Pow) -> Node:
+    """常数折叠：x^0、x^1、1^x、0^x 和常数的幂"""
+    base, exponent = node.base, node.exponent
+    if isinstance(exponent, Number):
+        # x^0 = 1, x^1 = x
+        if abs(exponent.value) < 1e-10:
+            return Number(1)
+        if abs(exponent.value - 1.0) < 1e-10:
+            return base
+    if isinstance(base, Number):
+        # 1^x = 1, 0^x = 0 (x > 0)
+        if abs(base.value - 1.0) < 1e-10:
+            return Number(1)
+        if abs(base.value) < 1e-10:
+            if isinstance(exponent, Number) and exponent.value > 0:
                 return Number(0)
-            constant *= simplified.value
+        elif isinstance(exponent, Number) and math.isfinite(exponent.value):
+            # 只折叠实数结果：负底数要求整数指数
+            if base.value > 0 or exponent.value == int(exponent.value):
+                try:
+                    value = base.value ** exponent.value
+                except OverflowError:
+                    return node
+                if math.isfinite(value):
+                    return Number(value)
+    return node
+
+
+def _fold_function(node: Function) -> Node:
+    """常数折叠：只折叠结果为整数的函数值（sin(0)、exp(0)、log(1)、sqrt(4) 等），避免引入舍入"""
+    if not isinstance(node.arg, Number):
+        return node
+    try:
+        value = node.eval({})
+    except (ValueError, ArithmeticError):
+        return node
+    if isinstance(value, float) and math.isfinite(value) and value == int(value):
+        return Number(value)
+    return node
+
+
+def _collect_add(node: Add) -> Node:
+    """合并同类项：非数值部分相同的项系数相加"""
+    groups: Dict[Node, List[float]] = {}
+    distributed = False
+    for term in node.terms:
+        if isinstance(term, Number):
+            continue
+        coefficient, base = _split_coefficient(term)
+        if isinstance(base, Add):
+            # 数值系数乘以和式：展开后与其余项一起合并，如 3*x - (x + 2*x)
+            distributed = True
+            for inner in base.terms:
+                inner_coefficient, inner_base = _split_coefficient(inner)
+                groups.setdefault(inner_base, []).append(coefficient * inner_coefficient)
         else:
-            factors.append(simplified)
-    
-    # 展开乘法（如果可能）
-    if len(factors) == 0:
-        return Number(constant)
-    elif len(factors) == 1:
-        if abs(constant - 1.0) < 1e-10:
-            return factors[0]
-        return Mul(Number(constant), factors[0])
-    
-    if abs(constant - 1.0) > 1e-10:
-        factors.insert(0, Number(constant))
+            groups.setdefault(base, []).append(coefficient)
+    if not distributed and all(len(coefficients) == 1 for coefficients in groups.values()):
+        return node
     
-    return Mul(*factors)
+    terms: List[Node] = []
+    constant = 0.0
+    for base, coefficients in groups.items():
+        coefficient = sum(coefficients)
+        if isinstance(base, Number):
+            constant += coefficient * base.value
+        elif abs(coefficient) < 1e-10:
+            continue
+        else:
+            terms.append(base if abs(coefficient - 1.0) < 1e-10 else Mul(Number(coefficient), base))
+    terms.extend(term for term in node.terms if isinstance(term, Number))
+    if constant:
+        terms.append(Number(constant))
+    return _join(Add, terms, Number(0))
 
 
-def _simplify_pow(pow_node: Pow) -> Node:
-    """化简幂次"""
-    base = simplify(pow_node.base)
-    exponent = simplify(pow_node.exponent)
-    
-    # x^0 = 1
-    if isinstance(exponent, Number) and abs(exponent.value) < 1e-10:
-        return Number(1)
-    
-    # x^1 = x
-    if isinstance(exponent, Number) and abs(exponent.value - 1.0) < 1e-10:
-        return base
-    
-    # 0^x = 0 (x > 0)
-    if isinstance(base, Number) and abs(base.value) < 1e-10:
-        if isinstance(exponent, Number) and exponent.value > 0:
-            return Number(0)
-    
-    # 1^x = 1
-    if isinstance(base, Number) and abs(base.value - 1.0) < 1e-10:
-        return Number(1)
-    
-    # (a^b)^c = a^(b*c)
-    if isinstance(base, Pow):
-        new_exp = simplify(Mul(base.exponent, exponent))
-        return Pow(base.base, new_exp)
+def _powers_mul(node: Mul) -> Node:
+    """合并幂次：同底数的因子指数相加（x*x = x^2）"""
+    groups: Dict[Node, List[Node]] = {}
+    for factor in node.factors:
+        if isinstance(factor, Number):
+            continue
+        if isinstance(factor, Pow):
+            groups.setdefault(factor.base, []).append(factor.exponent)
+        else:
+            groups.setdefault(factor, []).append(Number(1))
+    if all(len(exponents) == 1 for exponents in groups.values()):
+        return node
     
-    return Pow(base, exponent)
+    factors: List[Node] = [factor for factor in node.factors if isinstance(factor, Number)]
+    for base, exponents in groups.items():
+        if len(exponents) == 1:
+            exponent = exponents[0]
+        elif all(isinstance(exponent, Number) for exponent in exponents):
+            exponent = Number(sum(exponent.value for exponent in exponents))
+        else:
+            exponent = Add(*exponents)
+        if isinstance(exponent, Number) and abs(exponent.value) < 1e-10:
+            continue
+        if isinstance(exponent, Number) and abs(exponent.value - 1.0) < 1e-10:
+            factors.append(base)
+        else:
+            factors.append(Pow(base, exponent))
+    return _join(Mul, factors, Number(1))
 
 
-def _get_term_key(term: Node) -> str:
-    """获取项的键用于合并同类项"""
-    if isinstance(term, Mul):
-        # 提取非常数因子
-        non_const = [f for f in term.factors if not isinstance(f, Number)]
-        if non_const:
-            return str(sorted([str(f) for f in non_const]))
-        return "constant"
-    elif isinstance(term, Pow):
-        return str(term)
-    elif isinstance(term, Symbol):
-        return str(term)
-    elif isinstance(term, Function):
-        return str(term)
+def _powers_pow(node: Pow) -> Node:
+    """
+    合并幂次：(a^b)^c = a^(b*c)
+    
+    只在 c 为整数，或 b 为整数且 a 可证明非负时合并；否则（如 (x^2)^0.5 = |x|）保持原样
+    """
+    if not isinstance(node.base, Pow):
+        return node
+    inner = node.base
+    if not (_is_integer(node.exponent)
+            or (_is_integer(inner.exponent) and _is_nonnegative(inner.base))):
+        return node
+    if isinstance(inner.exponent, Number) and isinstance(node.exponent, Number):
+        exponent: Node = Number(inner.exponent.value * node.exponent.value)
     else:
-        return "constant"
+        exponent = Mul(inner.exponent, node.exponent)
+    return Pow(inner.base, exponent)
 
 
-def _combine_terms(term1: Node, term2: Node) -> Node:
-    """合并两个同类项"""
-    # 提取系数
-    coef1 = _extract_coefficient(term1)
-    coef2 = _extract_coefficient(term2)
-    
-    # 提取非系数部分
-    base1 = _extract_base(term1)
-    base2 = _extract_base(term2)
-    
-    if base1 == base2:
-        new_coef = coef1 + coef2
-        if abs(new_coef) < 1e-10:
-            return Number(0)
-        if abs(new_coef - 1.0) < 1e-10:
-            return base1
-        return Mul(Number(new_coef), base1)
+def _is_integer(node: Node) -> bool:
+    return isinstance(node, Number) and math.isfinite(node.value) and node.value == int(node.value)
+
+
+def _is_nonnegative(node: Node) -> bool:
+    """能否判定表达式对所有实数取值非负（保守判断：非负常数、偶数次幂、exp、sqrt 及其和与积）"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, Number):
+            if not current.value >= 0:
+                return False
+        elif isinstance(current, (Add, Mul)):
+            stack.extend(children(current))
+        elif isinstance(current, Pow) and isinstance(current.exponent, Number):
+            if not (_is_integer(current.exponent) and int(current.exponent.value) % 2 == 0):
+                stack.append(current.base)
+        elif not (isinstance(current, Function) and current.name in ('exp', 'sqrt')):
+            return False
+    return True
+
+
+def _rewrite_add(node: Add) -> Node:
+    """应用重写规则系统的默认规则（如 sin(x)^2 + cos(x)^2 = 1）"""
+    for pattern, replacement in _default_rules().items():
+        matched = _match_rule(node, pattern, replacement)
+        if matched is not None:
+            return matched
+    return node
+
+
+def _has_denominator(node: Node) -> bool:
+    """节点或其直接子节点是否为以非常数为底的负常量次幂（即含分母）"""
+    items = node.terms if isinstance(node, Add) else (node,)
+    for item in items:
+        for factor in (item.factors if isinstance(item, Mul) else (item,)):
+            if (isinstance(factor, Pow) and isinstance(factor.exponent, Number)
+                    and factor.exponent.value < 0 and not isinstance(factor.base, Number)):
+                return True
+    return False
+
+
+def _cancel_rational(node: Node) -> Node:
+    """
+    有理式通分并约去分子分母的公因式，只在节点数减少时采用（保证不动点迭代收敛）
     
-    return Add(term1, term2)
+    约分后分子分母是展开的；乘积（如 (x+1)^12/(x+1)^10）展开后往往更大，
+    此时再比较因式分解的形式
+    """
+    if not _has_denominator(node):
+        return node
+    from .factor import cancel, factor
+    best = node
+    result = cancel(node)
+    if node_size(result) < node_size(best):
+        best = result
+    if isinstance(node, Mul) and best is node:
+        try:
+            result = factor(node)
+        except ValueError:
+            return node
+        if node_size(result) < node_size(best):
+            best = result
+    return best
 
 
-def _extract_coefficient(term: Node) -> float:
-    """提取项的系数"""
-    if isinstance(term, Number):
-        return term.value
-    elif isinstance(term, Mul):
+def _split_coefficient(term: Node) -> Tuple[float, Node]:
+    """把项拆成数值系数和非数值部分"""
+    if isinstance(term, Mul):
+        coefficient = 1.0
+        rest = []
         for factor in term.factors:
             if isinstance(factor, Number):
-                return factor.value
-        return 1.0
-    else:
-        return 1.0
-
-
-def _extract_base(term: Node) -> Node:
-    """提取项的非系数部分"""
-    if isinstance(term, Number):
-        return Number(1)
-    elif isinstance(term, Mul):
-        non_const = [f for f in term.factors if not isinstance(f, Number)]
-        if non_const:
-            if len(non_const) == 1:
-                return non_const[0]
-            return Mul(*non_const)
-        return Number(1)
-    else:
-        return term
+                coefficient *= factor.value
+            else:
+                rest.append(factor)
+        if len(rest) == len(term.factors):
+            return 1.0, term
+        return coefficient, _join(Mul, rest, Number(1))
+    return 1.0, term
+
+
+def _join(cls: type, items: List[Node], empty: Node) -> Node:
+    """由操作数构造 Add/Mul，零个或一个操作数时不建节点"""
+    if not items:
+        return empty
+    if len(items) == 1:
+        return items[0]
+    return cls(*items)
+
+
+# 可用的化简遍：遍名 -> 作用于单个节点的规则（子节点已处理），
+# 一般为按节点类型分派的规则表，表中没有的类型由 transform 直接跳过
+PASSES: Dict[str, Callable[[Node], Node]] = {
+    'flatten': Dispatcher({Add: _flatten_add, Mul: _flatten_mul}),
+    'fold': Dispatcher({Add: _fold_add, Mul: _fold_mul, Pow: _fold_pow, Function: _fold_function}),
+    'collect': Dispatcher({Add: _collect_add}),
+    'powers': Dispatcher({Mul: _powers_mul, Pow: _powers_pow}),
+    'rewrite': Dispatcher({Add: _rewrite_add}),
+    # 有理式约分需要多项式展开和最大公因式，代价较高，不在默认遍中：simplify(node, DEFAULT_PASSES + ('cancel',))
+    'cancel': Dispatcher({Add: _cancel_rational, Mul: _cancel_rational}),
+}
+
+# 默认执行的遍及其顺序
+DEFAULT_PASSES: Tuple[str, ...] = ('flatten', 'fold', 'collect', 'powers', 'rewrite')
@@ -2,46 +2,206 @@
 求解器模块：求解方程
 """
 
-from typing import List, Optional
-from .ast import Node, Number, Symbol, Add, Mul, Pow
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .ast import Node, Number, Symbol, Add, Mul, Pow, free_symbols, polynomial_degree
 from .simplify import simplify
+from .polynomial import poly_coefficients, poly_coefficient_nodes, real_roots
+from .codegen import compile_function
+from .nsolve import nsolve, DEFAULT_INTERVAL
 
+try:
+    import numpy as np
+except ImportError:  # numpy 可选，仅 SolveTemplate 需要
+    np = None
 
-def solve(equation: Node, var: Symbol) -> List[Node]:
+
+def solve(equation: Node, var: Symbol, numeric: bool = False,
+          interval: Tuple[float, float] = DEFAULT_INTERVAL) -> List[Node]:
     """
     求解方程 equation = 0
     
     Args:
         equation: 方程表达式（已移项，等于0）
         var: 要求解的变量
+        numeric: 找不到闭式解时，是否在 interval 内数值求全部实根
+        interval: 数值求根的区间
         
     Returns:
         解的列表
     """
-    from .rewrite import rewrite
-    
     # 化简方程
     equation = simplify(equation)
     
-    # 尝试线性方程: ax + b = 0
-    solution = _solve_linear(equation, var)
-    if solution is not None:
-        return [solution]
+    # 数值系数多项式：一次性提取系数（未展开的乘积也可），直接求全部实根
+    coeffs = poly_coefficients(equation, var)
+    if coeffs is not None and len(coeffs) >= 2:
+        return _solve_polynomial(coeffs)
     
-    # 尝试二次方程: ax^2 + bx + c = 0
-    solutions = _solve_quadratic(equation, var)
-    if solutions:
-        return solutions
+    # 线性/二次公式只用于系数含其他符号的 var 的二次以内多项式
+    degree = polynomial_degree(equation, var)
+    if degree is not None and degree <= 2:
+        # 尝试线性方程: ax + b = 0
+        solution = _solve_linear(equation, var)
+        if solution is not None:
+            return [solution]
+        
+        # 尝试二次方程: ax^2 + bx + c = 0
+        solutions = _solve_quadratic(equation, var)
+        if solutions:
+            return solutions
     
-    # 尝试简单多项式
-    solutions = _solve_polynomial(equation, var)
-    if solutions:
-        return solutions
+    # 数值求根（可选）
+    if numeric:
+        return [Number(root) for root in nsolve(equation, var, interval)]
     
     # 无法求解
     return []
 
 
+class SolveTemplate:
+    """
+    参数化方程的求解模板
+    
+    构造时一次性化简方程、提取关于 var 的符号系数并把每个系数编译为
+    numpy 向量化函数；之后 solve() 对整批参数值只做数组运算。
+    一到三次方程使用向量化的求根公式，更高次逐行调用 real_roots。
+    
+    Examples:
+        >>> template = SolveTemplate(parse("a*x^2 + b*x + c"), Symbol('x'), ['a', 'b', 'c'])
+        >>> template.solve({'a': [1, 1], 'b': [0, -3], 'c': [-4, 2]})
+        array([[-2.,  2.],
+               [ 1.,  2.]])
+    """
+    
+    def __init__(self, equation: Node, var: Symbol, params: Sequence[str]):
+        """
+        Args:
+            equation: 方程表达式（已移项，等于0），系数可含参数符号
+            var: 要求解的变量
+            params: 参数名列表
+        """
+        if np is None:
+            raise ImportError("SolveTemplate 需要安装 numpy")
+        
+        coeffs = poly_coefficient_nodes(simplify(equation), var)
+        if coeffs is None:
+            raise ValueError(f"方程不是 {var} 的多项式")
+        while len(coeffs) > 1 and simplify(coeffs[-1]) == Number(0):
+            coeffs.pop()
+        if len(coeffs) < 2:
+            raise ValueError(f"方程不含 {var}")
+        
+        self.var = var
+        self.params = list(params)
+        self.degree = len(coeffs) - 1
+        self.coefficients = [simplify(c) for c in coeffs]
+        self._functions = [compile_function(c, self.params, 'numpy') for c in self.coefficients]
+    
+    def coefficient_arrays(self, values: Dict[str, Any]) -> List[Any]:
+        """计算每组参数下的系数数组（从常数项到最高次项）"""
+        missing = [name for name in self.params if name not in values]
+        if missing:
+            raise ValueError(f"缺少参数: {', '.join(missing)}")
+        arrays = np.broadcast_arrays(*[np.asarray(values[name], dtype=float) for name in self.params])
+        shape = arrays[0].shape if arrays else ()
+        with np.errstate(all='ignore'):
+            return [np.broadcast_to(np.asarray(f(*arrays), dtype=float), shape).ravel()
+                    for f in self._functions]
+    
+    def solve(self, values: Dict[str, Any]) -> Any:
+        """
+        批量求解
+        
+        Args:
+            values: 参数名 -> 数组（各数组按 numpy 规则广播）
+            
+        Returns:
+            形状为 (参数组数, degree) 的数组，每行是升序的不同实根，不足处填 NaN
+        """
+        coeffs = self.coefficient_arrays(values)
+        with np.errstate(all='ignore'):
+            if self.degree <= 3:
+                roots = _vector_real_roots(coeffs)
+            else:
+                roots = np.full((coeffs[0].size, self.degree), np.nan)
+                for i, row in enumerate(np.stack(coeffs, axis=1)):
+                    found = real_roots(list(row))
+                    roots[i, :len(found)] = found
+        return _dedupe_rows(roots)
+
+
+def _vector_real_roots(coeffs: List[Any]) -> Any:
+    """向量化的一到三次方程实根（系数从常数项到最高次项），首项为0的行按低次处理"""
+    degree = len(coeffs) - 1
+    n = coeffs[0].size
+    if degree == 0:
+        return np.empty((n, 0))
+    
+    lead = coeffs[-1]
+    if degree == 1:
+        roots = (-coeffs[0] / lead)[:, None]
+    elif degree == 2:
+        c, b, a = coeffs
+        discriminant = b * b - 4 * a * c
+        sqrt_disc = np.sqrt(np.where(discriminant >= 0, discriminant, np.nan))
+        # 数值稳定的求根公式
+        q = -0.5 * (b + np.copysign(sqrt_disc, b))
+        roots = np.stack([q / a, np.where(q != 0, c / q, 0.0)], axis=1)
+    else:
+        roots = _vector_cubic(*coeffs)
+    
+    # 首项系数为0的行退化为低次方程
+    degenerate = lead == 0
+    if degenerate.any():
+        lower = _vector_real_roots(coeffs[:-1])
+        lower = np.concatenate([lower, np.full((n, 1), np.nan)], axis=1)
+        roots = np.where(degenerate[:, None], lower, roots)
+    return roots
+
+
+def _vector_cubic(d: Any, c: Any, b: Any, a: Any) -> Any:
+    """向量化的三次方程 a x^3 + b x^2 + c x + d = 0 实根（三角法/卡尔丹公式）"""
+    # 化为 t^3 + p t + q = 0，x = t - b/(3a)
+    shift = b / (3 * a)
+    p = (3 * a * c - b * b) / (3 * a * a)
+    q = (2 * b ** 3 - 9 * a * b * c + 27 * a * a * d) / (27 * a ** 3)
+    discriminant = (q / 2) ** 2 + (p / 3) ** 3
+    
+    # 一个实根：卡尔丹公式
+    sqrt_disc = np.sqrt(np.maximum(discriminant, 0))
+    single = np.cbrt(-q / 2 + sqrt_disc) + np.cbrt(-q / 2 - sqrt_disc)
+    
+    # 三个实根：三角法（p < 0）
+    negative_p = np.where(p < 0, p, -1.0)
+    m = 2 * np.sqrt(-negative_p / 3)
+    theta = np.arccos(np.clip(3 * q / (negative_p * m), -1.0, 1.0)) / 3
+    triple = np.stack([m * np.cos(theta - 2 * np.pi * k / 3) for k in range(3)], axis=1)
+    
+    nan = np.full_like(single, np.nan)
+    one_root = np.stack([single, nan, nan], axis=1)
+    roots = np.where(((discriminant <= 0) & (p < 0))[:, None], triple, one_root) - shift[:, None]
+    
+    # 牛顿法精化（补偿卡尔丹公式的相消误差），只接受小步长
+    a, b, c, d = a[:, None], b[:, None], c[:, None], d[:, None]
+    for _ in range(2):
+        value = ((a * roots + b) * roots + c) * roots + d
+        slope = (3 * a * roots + 2 * b) * roots + c
+        step = np.where(slope != 0, value / slope, 0.0)
+        roots = roots - np.where(np.abs(step) < 1e-3 * np.maximum(1, np.abs(roots)), step, 0.0)
+    return roots
+
+
+def _dedupe_rows(roots: Any) -> Any:
+    """每行升序排列，数值上重合的根只保留一个（NaN 排在最后）"""
+    roots = np.sort(roots, axis=1)
+    if roots.shape[1] > 1:
+        scale = np.maximum(1.0, np.abs(roots[:, 1:]))
+        duplicate = np.abs(np.diff(roots, axis=1)) <= 1e-9 * scale
+        roots[:, 1:][duplicate] = np.nan
+        roots = np.sort(roots, axis=1)
+    return roots
+
+
 def _solve_linear(equation: Node, var: Symbol) -> Optional[Node]:
     """求解线性方程 ax + b = 0"""
     # 将方程转换为 Add 形式
@@ -68,12 +228,14 @@ def _solve_linear(equation: Node, var: Symbol) -> Optional[Node]:
         coef = _extract_var_coefficient(term, var)
         if coef is not None:
             var_coef = Add(var_coef, coef)
+        elif _extract_power_coefficient(term, var, 2) is not None:
+            return None  # 含二次项，交给 _solve_quadratic
         else:
             # 常数项（取负，因为移项）
             const_val = _extract_constant(term)
             constant = Add(constant, Mul(Number(-1), const_val))
     
-    # ax + b = 0 => x = -b/a
+    # ax + b = 0 => x = -b/a（constant 已是 -b）
     if isinstance(var_coef, Number) and abs(var_coef.value) < 1e-10:
         # 系数为0
         if isinstance(constant, Number) and abs(constant.value) < 1e-10:
@@ -84,18 +246,16 @@ def _solve_linear(equation: Node, var: Symbol) -> Optional[Node]:
     if isinstance(var_coef, Number) and isinstance(constant, Number):
         if abs(var_coef.value) < 1e-10:
             return None
-        solution = Number(-constant.value / var_coef.value)
+        solution = Number(constant.value / var_coef.value)
         return simplify(solution)
     
     # 符号计算
-    solution = Mul(Number(-1), Mul(constant, Pow(var_coef, Number(-1))))
+    solution = Mul(constant, Pow(var_coef, Number(-1)))
     return simplify(solution)
 
 
 def _solve_quadratic(equation: Node, var: Symbol) -> List[Node]:
     """求解二次方程 ax^2 + bx + c = 0"""
-    from .simplify import simplify
-    
     if not isinstance(equation, Add):
         return []
     
@@ -151,11 +311,9 @@ def _solve_quadratic(equation: Node, var: Symbol) -> List[Node]:
     return []
 
 
-def _solve_polynomial(equation: Node, var: Symbol) -> List[Node]:
-    """求解简单多项式（尝试因式分解）"""
-    # 这里只实现基础功能
-    # 实际应用中需要更复杂的算法
-    return []
+def _solve_polynomial(coeffs: List[float]) -> List[Node]:
+    """求解数值系数多项式（有理根精确求出，其余用数值方法）"""
+    return [Number(root) for root in real_roots(coeffs)]
 
 
 def _extract_var_coefficient(term: Node, var: Symbol) -> Optional[Node]:
@@ -234,23 +392,8 @@ def _extract_power_coefficient(term: Node, var: Symbol, power: int) -> Optional[
 
 def _extract_constant(term: Node) -> Node:
     """提取常数项（不包含变量的项）"""
-    from .ast import Symbol, Pow
-    
-    # 检查项是否包含变量
-    def has_variable(node: Node) -> bool:
-        if isinstance(node, Symbol):
-            return True
-        elif isinstance(node, Pow):
-            return has_variable(node.base)
-        elif isinstance(node, (Add, Mul)):
-            children = node.terms if isinstance(node, Add) else node.factors
-            return any(has_variable(child) for child in children)
-        elif hasattr(node, 'arg'):  # Function
-            return has_variable(node.arg)
-        return False
-    
     # 如果包含变量，返回 None（通过返回 Number(0) 表示不是常数）
-    if has_variable(term):
+    if free_symbols(term):
         return Number(0)
     
     # 提取数值
@@ -0,0 +1,307 @@
+"""
+方程组求解模块
+线性方程组：直接从AST构造稀疏系数矩阵，用稀疏高斯消元求解
+"""
+
+import heapq
+from fractions import Fraction
+from typing import Dict, List, Optional, Sequence, Union
+
+from .ast import Node, Number, Symbol, Add, Mul, Pow, Function, children
+
+
+Scalar = Union[float, Fraction]
+
+# 浮点模式下的主元阈值：候选主元不小于列中最大值的该比例
+PIVOT_THRESHOLD = 0.1
+
+
+def solve_linear_system(equations: Sequence[Node], variables: Sequence[Union[str, Symbol]],
+                        exact: bool = True) -> Dict[str, Node]:
+    """
+    求解线性方程组（每个方程均为 expr = 0）
+    
+    Args:
+        equations: 方程表达式列表
+        variables: 未知量（符号或符号名）列表
+        exact: True 时用有理数精确消元，False 时用浮点消元（阈值主元）
+        
+    Returns:
+        未知量名 -> 解。方程组欠定时，主元变量用自由变量表示，自由变量映射到自身；
+        方程组无解时返回空字典
+        
+    Examples:
+        >>> solution = solve_linear_system([parse("x + y - 3"), parse("x - y - 1")], ['x', 'y'])
+        >>> {name: str(value) for name, value in solution.items()}
+        {'x': '2', 'y': '1'}
+    """
+    names = [v.name if isinstance(v, Symbol) else v for v in variables]
+    columns = {name: i for i, name in enumerate(names)}
+    zero: Scalar = Fraction(0) if exact else 0.0
+    
+    rows: List[Dict[int, Scalar]] = []
+    rhs: List[Scalar] = []
+    for equation in equations:
+        form = linear_form(equation, columns, exact)
+        if form is None:
+            raise ValueError(f"方程不是 {', '.join(names)} 的线性方程: {equation}")
+        constant = form.pop(-1, zero)
+        rows.append(form)
+        rhs.append(-constant)
+    
+    solution = _sparse_solve(rows, rhs, len(names), exact)
+    if solution is None:
+        return {}
+    
+    return {names[col]: _form_to_node(form, names) for col, form in enumerate(solution)}
+
+
+def linear_form(node: Node, columns: Dict[str, int], exact: bool = True) -> Optional[Dict[int, Scalar]]:
+    """
+    把表达式展开为线性形式 {列号: 系数}，常数项的列号为 -1
+    
+    Args:
+        node: AST节点
+        columns: 未知量名 -> 列号
+        exact: True 时系数为 Fraction，否则为 float
+        
+    Returns:
+        线性形式；表达式不是未知量的线性函数（或含其他符号）时返回 None
+        
+    Raises:
+        ValueError: 精确模式下出现无理常数（如 sin(1)、2^(1/2)）
+    """
+    convert = _to_fraction if exact else float
+    results: Dict[int, Dict[int, Scalar]] = {}
+    stack = [(node, False)]
+    
+    while stack:
+        current, ready = stack.pop()
+        if id(current) in results:
+            continue
+        kids = children(current)
+        if kids and not ready:
+            stack.append((current, True))
+            stack.extend((kid, False) for kid in kids)
+            continue
+        
+        form = _node_form(current, columns, convert, results)
+        if form is None:
+            return None
+        results[id(current)] = form
+    
+    return results[id(node)]
+
+
+def _node_form(node: Node, columns: Dict[str, int], convert,
+               results: Dict[int, Dict[int, Scalar]]) -> Optional[Dict[int, Scalar]]:
+    """单个节点的线性形式，子节点结果已在 results 中"""
+    if isinstance(node, Number):
+        return {-1: convert(node.value)}
+    
+    if isinstance(node, Symbol):
+        if node.name in columns:
+            return {columns[node.name]: convert(1)}
+        return None
+    
+    if isinstance(node, Add):
+        total: Dict[int, Scalar] = {}
+        for term in node.terms:
+            for col, coef in results[id(term)].items():
+                total[col] = total.get(col, 0) + coef
+        return total
+    
+    if isinstance(node, Mul):
+        # 至多一个因子含未知量
+        product: Dict[int, Scalar] = {-1: convert(1)}
+        for factor in node.factors:
+            form = results[id(factor)]
+            if _is_constant(form):
+                scale = form.get(-1, 0)
+                product = {col: coef * scale for col, coef in product.items()}
+            elif _is_constant(product):
+                scale = product.get(-1, 0)
+                product = {col: coef * scale for col, coef in form.items()}
+            else:
+                return None
+        return product
+    
+    if isinstance(node, (Pow, Function)):
+        forms = [results[id(kid)] for kid in children(node)]
+        if all(_is_constant(form) for form in forms):
+            if convert is _to_fraction:
+                # 精确模式：整数次幂和有理数的有理根精确计算，其余常数不做舍入
+                value = _exact_constant(node, [form.get(-1, Fraction(0)) for form in forms])
+                if value is None:
+                    raise ValueError(f"精确消元中常数 {node} 不是有理数，请使用 exact=False")
+                return {-1: value}
+            # 常数子表达式按浮点求值
+            try:
+                value = node.eval({})
+            except (ValueError, ArithmeticError, TypeError):
+                return None
+            if isinstance(value, complex):
+                return None
+            return {-1: convert(value)}
+        if isinstance(node, Pow) and _is_constant(forms[1]) and forms[1].get(-1, 0) == 1:
+            return forms[0]
+        return None
+    
+    return None
+
+
+def _exact_constant(node: Node, args: List[Fraction]) -> Optional[Fraction]:
+    """
+    常数的幂或函数值的精确有理值
+    
+    整数次幂直接计算；分数次幂 a^(p/q)（以及 sqrt）先按浮点求值再还原为有理数，
+    仅在 r^q == a^p 精确成立时采用。其余函数值或无理数结果返回 None。
+    """
+    if isinstance(node, Pow):
+        base, exponent = args
+    elif isinstance(node, Function) and node.name == 'sqrt':
+        base, exponent = args[0], Fraction(1, 2)
+    else:
+        return None
+    if not base and exponent < 0:
+        return None
+    if exponent.denominator == 1:
+        return base ** exponent.numerator
+    if base < 0:
+        return None
+    try:
+        candidate = Fraction(float(base) ** float(exponent)).limit_denominator(10 ** 12)
+    except (ArithmeticError, ValueError):
+        return None
+    if candidate ** exponent.denominator == base ** exponent.numerator:
+        return candidate
+    return None
+
+
+def _is_constant(form: Dict[int, Scalar]) -> bool:
+    return all(col == -1 or coef == 0 for col, coef in form.items())
+
+
+def _to_fraction(value: float) -> Fraction:
+    """按十进制表示转为有理数（0.1 -> 1/10）"""
+    if isinstance(value, int):
+        return Fraction(value)
+    return Fraction(repr(float(value)))
+
+
+def _sparse_solve(rows: List[Dict[int, Scalar]], rhs: List[Scalar], n_cols: int,
+                  exact: bool) -> Optional[List[Dict[int, Scalar]]]:
+    """
+    稀疏高斯消元
+    
+    每步选非零元最少的列（Markowitz 式的近似），在该列中选最短的行作主元；
+    浮点模式下只在不小于列最大值 PIVOT_THRESHOLD 倍的元素中挑选。
+    
+    Returns:
+        每个未知量的解（线性形式：自由变量列号 -> 系数，常数项列号 -1）；无解时返回 None
+    """
+    rows = [{col: coef for col, coef in row.items() if coef != 0} for row in rows]
+    rhs = list(rhs)
+    scale = max((abs(coef) for row in rows for coef in row.values()), default=1.0) or 1.0
+    tol = 0 if exact else 1e-12 * scale
+    
+    # 列 -> 含该列的未消去行
+    col_rows: List[set] = [set() for _ in range(n_cols)]
+    for r, row in enumerate(rows):
+        for col in row:
+            col_rows[col].add(r)
+    
+    heap = [(len(col_rows[col]), col) for col in range(n_cols) if col_rows[col]]
+    heapq.heapify(heap)
+    done_cols = set()
+    pivots: List[tuple] = []  # (主元行号, 主元列号)
+    
+    while heap:
+        count, col = heapq.heappop(heap)
+        if col in done_cols:
+            continue
+        if count != len(col_rows[col]):
+            if col_rows[col]:
+                heapq.heappush(heap, (len(col_rows[col]), col))
+            continue
+        candidates = col_rows[col]
+        if not candidates:
+            continue
+        
+        if exact:
+            pivot = min(candidates, key=lambda r: (len(rows[r]), r))
+        else:
+            largest = max(abs(rows[r][col]) for r in candidates)
+            pivot = min((r for r in candidates if abs(rows[r][col]) >= PIVOT_THRESHOLD * largest),
+                        key=lambda r: (len(rows[r]), r))
+        
+        done_cols.add(col)
+        pivot_row = rows[pivot]
+        pivot_value = pivot_row[col]
+        for other_col in pivot_row:
+            col_rows[other_col].discard(pivot)
+        
+        for r in list(candidates):
+            row = rows[r]
+            factor = row[col] / pivot_value
+            for other_col, coef in pivot_row.items():
+                new = row.get(other_col, 0) - factor * coef
+                if other_col == col or abs(new) <= tol:
+                    if other_col in row:
+                        del row[other_col]
+                        col_rows[other_col].discard(r)
+                else:
+                    if other_col not in row:
+                        col_rows[other_col].add(r)
+                    row[other_col] = new
+            rhs[r] -= factor * rhs[pivot]
+            for other_col in pivot_row:
+                if other_col not in done_cols and col_rows[other_col]:
+                    heapq.heappush(heap, (len(col_rows[other_col]), other_col))
+        
+        pivots.append((pivot, col))
+    
+    # 未作主元的行已全部消为0，右端非零则无解
+    pivot_rows = {r for r, _ in pivots}
+    residual_tol = 0 if exact else 1e-9 * max(1.0, max((abs(v) for v in rhs), default=0.0))
+    for r in range(len(rows)):
+        if r not in pivot_rows and abs(rhs[r]) > residual_tol:
+            return None
+    
+    # 回代：自由变量映射到自身
+    one: Scalar = Fraction(1) if exact else 1.0
+    solution: List[Optional[Dict[int, Scalar]]] = [None] * n_cols
+    for col in range(n_cols):
+        if col not in done_cols:
+            solution[col] = {col: one}
+    
+    for r, col in reversed(pivots):
+        row = rows[r]
+        pivot_value = row[col]
+        form: Dict[int, Scalar] = {-1: rhs[r] / pivot_value}
+        for other_col, coef in row.items():
+            if other_col == col:
+                continue
+            for key, value in solution[other_col].items():
+                form[key] = form.get(key, 0) - coef / pivot_value * value
+        solution[col] = {key: value for key, value in form.items() if value != 0 or key == -1}
+    
+    return solution
+
+
+def _form_to_node(form: Dict[int, Scalar], names: List[str]) -> Node:
+    """线性形式转为AST（常数 + 系数*自由变量）"""
+    terms: List[Node] = []
+    for col, coef in sorted(form.items()):
+        if col == -1:
+            continue
+        symbol = Symbol(names[col])
+        terms.append(symbol if coef == 1 else Mul(Number(float(coef)), symbol))
+    constant = float(form.get(-1, 0))
+    if not terms:
+        return Number(constant)
+    if constant != 0:
+        terms.append(Number(constant))
+    if len(terms) == 1:
+        return terms[0]
+    return Add(*terms)
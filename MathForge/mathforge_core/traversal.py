@@ -0,0 +1,158 @@
+"""
+通用树遍历框架
+按节点类型分派的函数表（Dispatcher），以及基于显式栈的后序遍历：
+transform 自底向上改写树并原样复用未改变的子树，fold 自底向上归约出任意值。
+两者都不受递归深度限制，共享的子树只处理一次
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from .ast import Node, children, intern, rebuild
+
+
+class Dispatcher:
+    """
+    按节点类型分派的函数表
+    
+    表中的键可以是基类（如 Function），查找沿 MRO 解析并按具体类型缓存，
+    因此每种类型只解析一次，之后的分派是一次字典查找。
+    
+    Examples:
+        >>> depth = Dispatcher({Add: lambda node, results: 1 + max(results)},
+        ...                    default=lambda node, results: 1 + max(results, default=0))
+        >>> fold(parse("x + sin(x)"), depth)
+        3
+    """
+    
+    def __init__(self, table: Dict[type, Callable[..., Any]],
+                 default: Optional[Callable[..., Any]] = None):
+        """
+        Args:
+            table: 节点类型 -> 处理函数
+            default: 表中找不到类型时的处理函数；为 None 时该类型没有处理函数
+        """
+        self.table = dict(table)
+        self.default = default
+        self._resolved: Dict[type, Optional[Callable[..., Any]]] = {}
+    
+    def lookup(self, cls: type) -> Optional[Callable[..., Any]]:
+        """类型 cls 的处理函数（没有时返回 None）"""
+        try:
+            return self._resolved[cls]
+        except KeyError:
+            pass
+        handler = self.default
+        for base in cls.__mro__:
+            if base in self.table:
+                handler = self.table[base]
+                break
+        self._resolved[cls] = handler
+        return handler
+    
+    def __call__(self, node: Node, *args: Any) -> Any:
+        handler = self._resolved.get(type(node)) or self.lookup(type(node))
+        if handler is None:
+            raise TypeError(f"没有 {type(node).__name__} 节点的处理函数")
+        return handler(node, *args)
+
+
+def _structure_key(node: Node) -> Any:
+    """按结构记忆化的键（驻留编号，带驻留表的代号）"""
+    intern(node)
+    return node._intern
+
+
+def transform(node: Node, rule: Callable[..., Node], *args: Any,
+              memo: Optional[Dict[Any, Node]] = None) -> Node:
+    """
+    自底向上对每个节点应用 rule（后序，显式栈）
+    
+    子节点都未改变时把原节点交给 rule，因此 rule 不做修改时整棵树原样返回；
+    某个子节点改变时只重建它到根的路径上的节点。rule 是 Dispatcher 时，
+    表中没有处理函数的类型直接跳过。
+    
+    Args:
+        node: 根节点
+        rule: rule(节点, *args) -> 新节点，调用时该节点的子节点已处理完
+        *args: 传给 rule 的额外参数
+        memo: 可选的跨调用缓存；给出时结构相同的子树（不论是否同一对象）
+            只处理一次，结果写入 memo。调用者须保证 rule 与 args 不变
+            
+    Returns:
+        改写后的根节点
+    """
+    done: Dict[Any, Node] = {} if memo is None else memo
+    key_of = id if memo is None else _structure_key
+    resolve = rule.lookup if isinstance(rule, Dispatcher) else None
+    stack: List[Any] = [node]
+    while stack:
+        current = stack.pop()
+        if current.__class__ is tuple:
+            # 子节点都已处理：有子节点改变时重建
+            current, kids = current
+            new_kids = [done[key_of(kid)] for kid in kids]
+            for new, old in zip(new_kids, kids):
+                if new is not old:
+                    updated = rebuild(current, new_kids)
+                    break
+            else:
+                updated = current
+        else:
+            key = key_of(current)
+            if key in done:
+                continue
+            kids = children(current)
+            if kids:
+                stack.append((current, kids))
+                stack.extend(kids)
+                continue
+            updated = current
+        handler = rule if resolve is None else resolve(type(updated))
+        done[key_of(current)] = updated if handler is None else handler(updated, *args)
+    return done[key_of(node)]
+
+
+def fold(node: Node, combine: Callable[..., Any], *args: Any,
+         memo: Optional[Dict[Any, Any]] = None) -> Any:
+    """
+    自底向上把树归约为一个值（后序，显式栈）
+    
+    Args:
+        node: 根节点
+        combine: combine(节点, 子节点结果列表, *args) -> 该节点的结果；
+            子节点结果的顺序与 children(节点) 相同，叶子的列表为空
+        *args: 传给 combine 的额外参数
+        memo: 可选的跨调用缓存，语义同 transform
+        
+    Returns:
+        根节点的结果
+        
+    Examples:
+        >>> fold(parse("x*y + 1"), lambda node, results: 1 + sum(results))
+        5
+    """
+    done: Dict[Any, Any] = {} if memo is None else memo
+    key_of = id if memo is None else _structure_key
+    resolve = combine.lookup if isinstance(combine, Dispatcher) else None
+    stack: List[Any] = [node]
+    while stack:
+        current = stack.pop()
+        if current.__class__ is tuple:
+            # 子节点都已处理
+            current, kids = current
+            results = [done[key_of(kid)] for kid in kids]
+        else:
+            key = key_of(current)
+            if key in done:
+                continue
+            kids = children(current)
+            if kids:
+                stack.append((current, kids))
+                stack.extend(kids)
+                continue
+            results = []
+        handler = resolve(type(current)) if resolve is not None else combine
+        if handler is None:
+            handler = combine  # Dispatcher.__call__ 报告缺少处理函数
+        done[key_of(current)] = handler(current, results, *args)
+    return done[key_of(node)]